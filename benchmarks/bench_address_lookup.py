@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: address lookup latency as the dataset grows
+Compares the old boolean-mask scan over the DataFrame with the hashed
+AddressIndex + contiguous feature matrix used by src/app.py.
+
+Usage: python benchmarks/bench_address_lookup.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from address_index import AddressIndex, build_feature_matrix
+
+
+def make_table(n_rows, n_features, seed=42):
+    """Synthetic table with the same shape as cleaned_data.csv"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        rng.random((n_rows, n_features)),
+        columns=[f'feature_{i}' for i in range(n_features)]
+    )
+    df['full_address'] = [f'0x{i:040x}' for i in range(n_rows)]
+    return df
+
+
+def time_per_call(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Address lookup benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--features', type=int, default=45)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--scan-queries', type=int, default=20,
+                        help='Queries for the (slow) mask scan baseline')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'mask scan (us)':>16} {'index build (s)':>16} {'index lookup (us)':>18}")
+    for n_rows in args.sizes:
+        df = make_table(n_rows, args.features)
+        feature_columns = [c for c in df.columns if c != 'full_address']
+        rng = np.random.default_rng(0)
+        queries = df['full_address'].to_numpy()[rng.integers(0, n_rows, args.queries)]
+
+        def mask_scan(address):
+            return df[df['full_address'] == address][feature_columns].values[0]
+
+        start = time.perf_counter()
+        index = AddressIndex(df['full_address'].tolist())
+        matrix = build_feature_matrix(df, feature_columns)
+        build_time = time.perf_counter() - start
+
+        def indexed(address):
+            row = index.get(address)
+            return matrix[row:row + 1]
+
+        scan_us = time_per_call(mask_scan, queries[:args.scan_queries]) * 1e6
+        index_us = time_per_call(indexed, queries) * 1e6
+        print(f"{n_rows:>10} {scan_us:>16.1f} {build_time:>16.2f} {index_us:>18.2f}")
+
+
+if __name__ == '__main__':
+    main()
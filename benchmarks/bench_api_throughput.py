@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /predict throughput and memory vs number of API worker processes
+Starts src/serve.py with each worker count, drives it from several client
+processes and reports requests/second plus total RSS and PSS (proportional
+set size, which splits shared pages between processes) of the server tree.
+
+Usage: python benchmarks/bench_api_throughput.py [--workers 1 2 4] [--model path.joblib]
+Linux only (reads /proc for memory figures).
+"""
+
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.append(os.path.join(base_dir, 'src'))
+
+
+def process_tree(pid):
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as handle:
+            pids += [int(child) for child in handle.read().split()]
+    except OSError:
+        pass
+    return pids
+
+
+def memory_kb(pid, field):
+    """Read a memory field (Rss or Pss) from smaps_rollup"""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as handle:
+            for line in handle:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def wait_for_health(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f'{url}/health', timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            time.sleep(0.2)
+    return False
+
+
+def client(args):
+    url, addresses, n_requests = args
+    session = requests.Session()
+    errors = 0
+    for i in range(n_requests):
+        response = session.post(f'{url}/predict', json={'address': addresses[i % len(addresses)]})
+        errors += response.status_code != 200
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API throughput vs worker processes')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent client processes')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per client')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--model', help='MODEL_PATH for the API')
+    args = parser.parse_args()
+
+    from feature_store import FeatureStore
+    store = FeatureStore.from_csv(os.path.join(base_dir, 'data', 'cleaned_data.csv'))
+    addresses = [store.address_at(row) for row in range(0, len(store), 7)]
+
+    env = dict(os.environ)
+    if args.model:
+        env['MODEL_PATH'] = os.path.abspath(args.model)
+
+    url = f'http://127.0.0.1:{args.port}'
+    print(f"{'workers':>8} {'req/s':>10} {'errors':>8} {'RSS total (MB)':>16} {'PSS total (MB)':>16}")
+    for workers in args.workers:
+        server = subprocess.Popen(
+            [sys.executable, 'serve.py', '--workers', str(workers), '--port', str(args.port)],
+            cwd=os.path.join(base_dir, 'src'), env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            if not wait_for_health(url):
+                print(f"{workers:>8} server did not start")
+                continue
+
+            jobs = [(url, addresses[i::args.clients], args.requests) for i in range(args.clients)]
+            with multiprocessing.Pool(args.clients) as pool:
+                start = time.perf_counter()
+                errors = sum(pool.map(client, jobs))
+                elapsed = time.perf_counter() - start
+
+            pids = process_tree(server.pid)
+            rss = sum(memory_kb(pid, 'Rss') for pid in pids) / 1024
+            pss = sum(memory_kb(pid, 'Pss') for pid in pids) / 1024
+            throughput = args.clients * args.requests / elapsed
+            print(f"{workers:>8} {throughput:>10.0f} {errors:>8} {rss:>16.1f} {pss:>16.1f}")
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: FraudDetectionOracle vs AsyncFraudDetectionOracle throughput
+Scores and writes the same dataset addresses with the threaded oracle
+(process_addresses) and the asyncio pipeline, against a running ML API and a
+local node, and reports addresses per second end to end.
+
+Usage:
+    python src/app.py                      # ML API on :5000
+    npx hardhat node                       # or: anvil --block-time 2
+    npx hardhat compile
+    python benchmarks/bench_async_oracle.py --count 500 --interval-mining 2000
+
+Writes to unchanged assessments are not skipped here, so both oracles send
+one transaction per address.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import pandas as pd
+from web3 import Web3
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.append(os.path.join(base_dir, 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+from bench_onchain_writes import DEFAULT_KEY, deploy_contract, make_oracle  # noqa: E402
+from oracle_async import AsyncFraudDetectionOracle  # noqa: E402
+
+
+def run_sync(api_url, w3, contract_address, private_key, addresses, batch_size, max_pending):
+    oracle = make_oracle(w3, contract_address, private_key, max_pending)
+    oracle.api_url = api_url
+    oracle.batch_size = batch_size
+    oracle.mirror = None
+    started = time.perf_counter()
+    results = oracle.process_addresses(addresses)
+    elapsed = time.perf_counter() - started
+    oracle.submitter.close()
+    return elapsed, sum(1 for r in results if r.get("blockchain_updated"))
+
+
+async def run_async(api_url, w3, rpc_url, contract_address, private_key, addresses, batch_size, max_pending):
+    writer = make_oracle(w3, contract_address, private_key, max_pending)
+    writer.api_url = api_url
+    oracle = AsyncFraudDetectionOracle(api_url, rpc_url, contract_address, private_key,
+                                       batch_size=batch_size, max_pending=max_pending, writer=writer)
+    oracle.mirror = None
+    started = time.perf_counter()
+    results = await oracle.process_addresses(addresses)
+    elapsed = time.perf_counter() - started
+    await oracle.close()
+    return elapsed, sum(1 for r in results if r.get("blockchain_updated"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Threaded vs asyncio oracle throughput')
+    parser.add_argument('--api-url', default=os.getenv('ML_API_URL', 'http://localhost:5000'))
+    parser.add_argument('--rpc-url', default=os.getenv('RPC_URL', 'http://127.0.0.1:8545'))
+    parser.add_argument('--count', type=int, default=500, help='Addresses per oracle')
+    parser.add_argument('--batch-size', type=int, default=100, help='Addresses per /batch_predict call')
+    parser.add_argument('--max-pending', type=int, default=64, help='Unconfirmed transactions in flight')
+    parser.add_argument('--interval-mining', type=int, metavar='MS',
+                        help='Mine a block every MS milliseconds instead of on every transaction')
+    args = parser.parse_args()
+
+    w3 = Web3(Web3.HTTPProvider(args.rpc_url))
+    private_key = os.getenv('PRIVATE_KEY', DEFAULT_KEY)
+    if args.interval_mining:
+        w3.provider.make_request('evm_setAutomine', [False])
+        w3.provider.make_request('evm_setIntervalMining', [args.interval_mining])
+    contract_address = os.getenv('CONTRACT_ADDRESS') or deploy_contract(w3, private_key)
+
+    dataset = pd.read_csv(os.path.join(base_dir, 'data', 'cleaned_data.csv'), usecols=['full_address'])
+    addresses = dataset['full_address'].iloc[:2 * args.count].tolist()
+    sync_addresses, async_addresses = addresses[:args.count], addresses[args.count:]
+
+    print(f"{'oracle':>8} {'addresses':>10} {'written':>8} {'seconds':>9} {'addr/s':>8}")
+    sync_time, sync_written = run_sync(args.api_url, w3, contract_address, private_key,
+                                       sync_addresses, args.batch_size, args.max_pending)
+    print(f"{'threaded':>8} {len(sync_addresses):>10} {sync_written:>8} {sync_time:>9.2f} "
+          f"{len(sync_addresses) / sync_time:>8.1f}")
+    async_time, async_written = asyncio.run(run_async(args.api_url, w3, args.rpc_url, contract_address, private_key,
+                                                      async_addresses, args.batch_size, args.max_pending))
+    print(f"{'asyncio':>8} {len(async_addresses):>10} {async_written:>8} {async_time:>9.2f} "
+          f"{len(async_addresses) / async_time:>8.1f}")
+    print(f"Speedup: {sync_time / len(sync_addresses) / (async_time / len(async_addresses)):.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: gas per assessment, single updates vs batchUpdateFraudAssessments
+Deploys FraudDetectionContractV2 on a local node and writes assessments one
+per transaction and in batches of 10, 50 and 200, for wallets seen for the
+first time and for wallets that already have an assessment (a rescore).
+
+Usage:
+    npx hardhat node
+    npx hardhat compile
+    python benchmarks/bench_batch_gas.py [--sizes 10 50 200] [--singles 20]
+"""
+
+import argparse
+import os
+import sys
+
+from web3 import Web3
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.append(os.path.join(base_dir, 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+from bench_onchain_writes import DEFAULT_KEY, deploy_contract, make_oracle  # noqa: E402
+
+
+def send(oracle, call):
+    """Send one transaction with the node's gas estimate; returns gas used, or None if it cannot fit a block"""
+    w3 = oracle.w3
+    account = w3.eth.account.from_key(oracle.private_key)
+    try:
+        gas = call.estimate_gas({'from': account.address})
+    except Exception:
+        return None
+    if gas > w3.eth.get_block('latest').gasLimit:
+        return None
+    tx = call.build_transaction({
+        'from': account.address,
+        'gas': gas,
+        'gasPrice': w3.eth.gas_price,
+        'nonce': w3.eth.get_transaction_count(account.address, 'pending'),
+    })
+    tx_hash = w3.eth.send_raw_transaction(account.sign_transaction(tx).raw_transaction)
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    return receipt.gasUsed if receipt.status == 1 else None
+
+
+def wallets(tag, count):
+    return [Web3.to_checksum_address(f"0x{tag:04x}{i + 1:036x}") for i in range(count)]
+
+
+def single_gas(oracle, addresses):
+    used = [send(oracle, oracle._assessment_call(address, 1, 0.9)) for address in addresses]
+    return sum(used) / len(used)
+
+
+def batch_gas(oracle, addresses):
+    call = oracle.contract.functions.batchUpdateFraudAssessments(
+        addresses, [oracle._assessment_fields(1, 0.9)] * len(addresses)
+    )
+    used = send(oracle, call)
+    return None if used is None else used / len(addresses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gas per assessment for single and batched updates')
+    parser.add_argument('--rpc-url', default=os.getenv('RPC_URL', 'http://127.0.0.1:8545'))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200], help='Batch sizes')
+    parser.add_argument('--singles', type=int, default=20, help='Single updates to average over')
+    args = parser.parse_args()
+
+    w3 = Web3(Web3.HTTPProvider(args.rpc_url))
+    private_key = os.getenv('PRIVATE_KEY', DEFAULT_KEY)
+    contract_address = os.getenv('CONTRACT_ADDRESS') or deploy_contract(w3, private_key)
+    oracle = make_oracle(w3, contract_address, private_key, max_pending=1)
+
+    runs = [('single', lambda addresses: single_gas(oracle, addresses), args.singles)]
+    runs += [(f'batch {size}', lambda addresses: batch_gas(oracle, addresses), size) for size in args.sizes]
+
+    print(f"{'mode':>10} {'new wallet':>12} {'rescore':>10} {'vs single':>10}")
+    baseline = None
+    for tag, (label, measure, count) in enumerate(runs, start=1):
+        addresses = wallets(tag, count)
+        first = measure(addresses)    # Storage slots written for the first time
+        again = measure(addresses)    # The same wallets rescored
+        if first is None:
+            print(f"{label:>10} {'over block gas limit':>34}")
+            continue
+        baseline = baseline or first
+        print(f"{label:>10} {first:>12,.0f} {again:>10,.0f} {baseline / first:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled flat-array forest vs sklearn predict_proba
+Trains a RandomForest with the same settings as model_training.py on
+data/cleaned_data.csv (or loads --model) and times both engines.
+
+Usage: python benchmarks/bench_forest_inference.py [--model results/tuned_fraud_detection_model.joblib]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forest_inference import CompiledForest
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+
+def load_features(data_path):
+    df = pd.read_csv(data_path)
+    X = df.drop(columns=['full_address', 'is_fraud']).select_dtypes(include='number')
+    return X.to_numpy(dtype=np.float64), df['is_fraud'].to_numpy()
+
+
+def best_time(fn, X, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Forest inference benchmark')
+    parser.add_argument('--data', default=os.path.join(base_dir, 'data', 'cleaned_data.csv'))
+    parser.add_argument('--model', help='Fitted model .joblib (trained on --data if omitted)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100, 10_000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    X, y = load_features(args.data)
+    if args.model:
+        model = joblib.load(args.model)
+    else:
+        print("Training RandomForestClassifier(n_estimators=100)...")
+        model = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced', n_jobs=-1)
+        model.fit(X, y)
+        model.set_params(n_jobs=None)
+
+    start = time.perf_counter()
+    compiled = CompiledForest.from_model(model)
+    print(f"Compiled {compiled.n_trees} trees / {compiled.n_nodes} nodes "
+          f"(max depth {compiled.max_depth}) in {time.perf_counter() - start:.3f}s")
+
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>8} {'sklearn (ms)':>14} {'compiled (ms)':>14} {'speedup':>9} {'identical':>10}")
+    for batch_size in args.batch_sizes:
+        batch = X[rng.integers(0, len(X), batch_size)]
+        identical = np.array_equal(model.predict_proba(batch), compiled.predict_proba(batch))
+        sklearn_ms = best_time(model.predict_proba, batch, args.repeats) * 1e3
+        compiled_ms = best_time(compiled.predict_proba, batch, args.repeats) * 1e3
+        print(f"{batch_size:>8} {sklearn_ms:>14.2f} {compiled_ms:>14.2f} "
+              f"{sklearn_ms / compiled_ms:>8.1f}x {str(identical):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Load test: /predict errors and latency while the model is hot-reloaded
+Starts src/serve.py, drives /predict from several client threads, sends
+SIGHUP to the server part-way through (every worker reloads its model) and
+reports errors and latency percentiles before, during and after the reload.
+
+Usage: python benchmarks/bench_hot_reload.py [--workers 2] [--duration 10] [--model path.joblib]
+POSIX only (uses SIGHUP).
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.append(os.path.join(base_dir, 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+from bench_api_throughput import wait_for_health  # noqa: E402
+
+
+def client(url, addresses, stop, samples):
+    session = requests.Session()
+    i = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            ok = session.post(f'{url}/predict', json={'address': addresses[i % len(addresses)]},
+                              timeout=10).status_code == 200
+        except requests.RequestException:
+            ok = False
+        samples.append((started, time.perf_counter() - started, ok))
+        i += 1
+
+
+def summarize(label, samples):
+    if not samples:
+        print(f"{label:>8} {'no requests':>10}")
+        return
+    latencies = np.array([latency for _, latency, _ in samples]) * 1000
+    errors = sum(not ok for _, _, ok in samples)
+    print(f"{label:>8} {len(samples):>10} {errors:>8} {np.percentile(latencies, 50):>10.2f} "
+          f"{np.percentile(latencies, 99):>10.2f} {latencies.max():>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Errors and latency during a hot model reload')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent client threads')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load')
+    parser.add_argument('--reload-at', type=float, default=0.4, help='Fraction of the run at which to reload')
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--model', help='MODEL_PATH for the API')
+    args = parser.parse_args()
+
+    from feature_store import FeatureStore
+    store = FeatureStore.from_csv(os.path.join(base_dir, 'data', 'cleaned_data.csv'))
+    addresses = [store.address_at(row) for row in range(0, len(store), 7)]
+
+    env = dict(os.environ)
+    if args.model:
+        env['MODEL_PATH'] = os.path.abspath(args.model)
+
+    url = f'http://127.0.0.1:{args.port}'
+    server = subprocess.Popen(
+        [sys.executable, 'serve.py', '--workers', str(args.workers), '--port', str(args.port)],
+        cwd=os.path.join(base_dir, 'src'), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_for_health(url):
+            print("server did not start")
+            return 1
+
+        stop = threading.Event()
+        samples = []
+        threads = [threading.Thread(target=client, args=(url, addresses[i::args.clients], stop, samples))
+                   for i in range(args.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        time.sleep(args.duration * args.reload_at)
+        reload_started = time.perf_counter()
+        server.send_signal(signal.SIGHUP)
+
+        # The reload window ends once a worker reports it; with several workers
+        # the others finish at about the same time
+        reload_finished = None
+        while time.perf_counter() - start < args.duration:
+            if reload_finished is None:
+                try:
+                    status = requests.get(f'{url}/reload', timeout=1).json()
+                    if status['reloads'] > 0 and status['status'] != 'reloading':
+                        reload_finished = time.perf_counter()
+                except requests.RequestException:
+                    pass
+            time.sleep(0.05)
+
+        stop.set()
+        for thread in threads:
+            thread.join()
+        reload_finished = reload_finished or time.perf_counter()
+
+        print(f"{args.workers} workers, {args.clients} clients, reload took "
+              f"{reload_finished - reload_started:.2f}s")
+        print(f"{'phase':>8} {'requests':>10} {'errors':>8} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}")
+        summarize('before', [s for s in samples if s[0] < reload_started])
+        summarize('during', [s for s in samples if reload_started <= s[0] < reload_finished])
+        summarize('after', [s for s in samples if s[0] >= reload_finished])
+        summarize('total', samples)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: oracle assessment writes per minute on a local node
+Writes the same assessments twice: one at a time as the oracle used to (node
+lookups for nonce and gas price, then wait for the receipt before the next
+write), and pipelined through tx_submitter.TransactionSubmitter.
+
+Usage:
+    npx hardhat node                       # or: anvil --block-time 2
+    npx hardhat compile                    # for the contract artifact
+    python benchmarks/bench_onchain_writes.py --count 200 --interval-mining 2000
+
+Deploys FraudDetectionContractV2 from the Hardhat artifact unless
+CONTRACT_ADDRESS is set. --interval-mining switches the node from mining every
+transaction immediately to mining a block every N ms, like a real chain.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from web3 import Web3
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.append(os.path.join(base_dir, 'src'))
+
+from oracle_service import FraudDetectionOracle  # noqa: E402
+from tx_submitter import TransactionSubmitter  # noqa: E402
+
+# Hardhat/anvil's first default account
+DEFAULT_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+ARTIFACT = os.path.join(base_dir, 'artifacts', 'contracts', 'FraudDetectionContractV2.sol',
+                        'FraudDetectionContractV2.json')
+
+
+def deploy_contract(w3, private_key):
+    with open(ARTIFACT) as f:
+        artifact = json.load(f)
+    account = w3.eth.account.from_key(private_key)
+    contract = w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bytecode'])
+    tx = contract.constructor(account.address).build_transaction({
+        'from': account.address,
+        'nonce': w3.eth.get_transaction_count(account.address, 'pending'),
+        'gasPrice': w3.eth.gas_price,
+    })
+    tx_hash = w3.eth.send_raw_transaction(account.sign_transaction(tx).raw_transaction)
+    return w3.eth.wait_for_transaction_receipt(tx_hash).contractAddress
+
+
+def make_oracle(w3, contract_address, private_key, max_pending):
+    oracle = FraudDetectionOracle(rpc_url='http://unused', contract_address=contract_address,
+                                  private_key=private_key)
+    oracle.w3 = w3
+    oracle.contract = w3.eth.contract(address=oracle.contract_address, abi=oracle.contract_abi)
+    oracle._submitter = TransactionSubmitter(w3, private_key, max_pending=max_pending, poll_interval=0.2)
+    return oracle
+
+
+def sequential_writes(oracle, addresses):
+    """The pre-pipelining write path: two node lookups and a receipt wait per assessment"""
+    account = oracle.w3.eth.account.from_key(oracle.private_key)
+    ok = 0
+    for i, address in enumerate(addresses):
+        tx = oracle._assessment_call(address, i % 2, 0.9).build_transaction({
+            'from': account.address,
+            'gas': 200000,
+            'gasPrice': oracle.w3.eth.gas_price,
+            'nonce': oracle.w3.eth.get_transaction_count(account.address),
+        })
+        tx_hash = oracle.w3.eth.send_raw_transaction(account.sign_transaction(tx).raw_transaction)
+        ok += oracle.w3.eth.wait_for_transaction_receipt(tx_hash, poll_latency=0.1).status == 1
+    return ok
+
+
+def pipelined_writes(oracle, addresses):
+    futures = [(address, i % 2, oracle.submit_blockchain_prediction(address, i % 2, 0.9))
+               for i, address in enumerate(addresses)]
+    return sum(oracle._wait_for_update(address, prediction, 0.9, future)
+               for address, prediction, future in futures)
+
+
+def run(w3, contract_address, private_key, count, max_pending=64):
+    oracle = make_oracle(w3, contract_address, private_key, max_pending)
+    print(f"{'mode':>10} {'writes':>8} {'ok':>6} {'seconds':>9} {'blocks':>7} {'per min':>9}")
+    results = {}
+    for mode, write in (('sequential', sequential_writes), ('pipelined', pipelined_writes)):
+        addresses = [Web3.to_checksum_address(f"0x{mode == 'pipelined':02x}{i + 1:038x}") for i in range(count)]
+        start_block = w3.eth.block_number
+        started = time.perf_counter()
+        ok = write(oracle, addresses)
+        elapsed = time.perf_counter() - started
+        per_minute = count / elapsed * 60
+        results[mode] = per_minute
+        print(f"{mode:>10} {count:>8} {ok:>6} {elapsed:>9.2f} {w3.eth.block_number - start_block:>7} {per_minute:>9.0f}")
+    print(f"Speedup: {results['pipelined'] / results['sequential']:.1f}x")
+    oracle.submitter.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sequential vs pipelined oracle writes')
+    parser.add_argument('--rpc-url', default=os.getenv('RPC_URL', 'http://127.0.0.1:8545'))
+    parser.add_argument('--count', type=int, default=200, help='Assessments written per mode')
+    parser.add_argument('--max-pending', type=int, default=64, help='Transactions in flight when pipelined')
+    parser.add_argument('--interval-mining', type=int, metavar='MS',
+                        help='Mine a block every MS milliseconds instead of on every transaction')
+    args = parser.parse_args()
+
+    w3 = Web3(Web3.HTTPProvider(args.rpc_url))
+    private_key = os.getenv('PRIVATE_KEY', DEFAULT_KEY)
+    if args.interval_mining:
+        w3.provider.make_request('evm_setAutomine', [False])
+        w3.provider.make_request('evm_setIntervalMining', [args.interval_mining])
+    contract_address = os.getenv('CONTRACT_ADDRESS') or deploy_contract(w3, private_key)
+    run(w3, contract_address, private_key, args.count, args.max_pending)
+
+
+if __name__ == '__main__':
+    main()
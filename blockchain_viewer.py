@@ -4,11 +4,18 @@ Blockchain Viewer for Fraud Detection System
 This script allows you to view fraud assessments stored on the blockchain
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
 from web3 import Web3
 
+sys.path.append(str(Path(__file__).resolve().parent / 'src'))
+from bulk_reads import read_assessments  # noqa: E402
+from event_indexer import EventIndex, default_index_path  # noqa: E402
+from assessment_export import FORMATS, export_assessments  # noqa: E402
+from web3_client import get_client  # noqa: E402
+
 # Set environment variables
 os.environ['CONTRACT_ADDRESS'] = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
 os.environ['RPC_URL'] = "http://localhost:8545"
@@ -27,13 +34,19 @@ def print_success(message):
 def print_error(message):
     print(f"ERROR: {message}")
 
-def connect_to_blockchain():
+# RPC URLs whose connection has been checked; later calls reuse the shared client without a round trip
+_connected_urls = set()
+
+def connect_to_blockchain(rpc_url="http://localhost:8545"):
     """Connect to the local blockchain"""
     try:
-        w3 = Web3(Web3.HTTPProvider("http://localhost:8545"))
+        w3 = get_client(rpc_url).w3
+        if rpc_url in _connected_urls:
+            return w3
         if w3.is_connected():
             print_success("Connected to local blockchain")
             print_info(f"Current block: {w3.eth.block_number}")
+            _connected_urls.add(rpc_url)
             return w3
         else:
             print_error("Failed to connect to blockchain")
@@ -42,13 +55,12 @@ def connect_to_blockchain():
         print_error(f"Connection error: {e}")
         return None
 
-def get_contract():
+def get_contract(rpc_url="http://localhost:8545", contract_address="0x5FbDB2315678afecb367f032d93F642f64180aa3"):
     """Get the smart contract instance"""
-    w3 = connect_to_blockchain()
+    w3 = connect_to_blockchain(rpc_url)
     if not w3:
         return None
     
-    contract_address = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
     checksum_address = Web3.to_checksum_address(contract_address)
     
     # Contract ABI for reading data
@@ -84,7 +96,8 @@ def get_contract():
         }
     ]
     
-    contract = w3.eth.contract(address=checksum_address, abi=contract_abi)
+    # Cached per address and ABI by the shared client
+    contract = get_client(rpc_url).contract(checksum_address, contract_abi)
     return contract
 
 def view_address_assessment(address):
@@ -136,28 +149,90 @@ def view_multiple_addresses():
     
     print_header("Multiple Address Assessments")
     
+    # Batched eth_calls: one RPC round trip for the whole list instead of one per address
+    assessments = read_assessments(contract.w3, contract, test_addresses)
+    
     for i, address in enumerate(test_addresses, 1):
         print(f"\nAddress {i}: {address}")
         print("-" * 40)
         
-        try:
-            checksum_address = Web3.to_checksum_address(address)
-            assessment = contract.functions.getFraudAssessment(checksum_address).call()
+        assessment = assessments[address]
+        if assessment is None:
+            print("   ERROR: Could not read assessment")
+        elif assessment["hasMLPrediction"]:
+            fraud_status = "FRAUDULENT" if assessment["mlIsFraudulent"] else "LEGITIMATE"
+            confidence = f"{assessment['mlConfidence']}%"
+            risk = assessment["overallRisk"]
+            risk_level = "Low" if risk < 3000 else "Medium" if risk < 7000 else "High"
             
-            if assessment[0]:  # Has ML prediction
-                fraud_status = "FRAUDULENT" if assessment[1] else "LEGITIMATE"
-                confidence = f"{assessment[2]}%"
-                risk_level = "Low" if assessment[6] < 3000 else "Medium" if assessment[6] < 7000 else "High"
-                
-                print(f"   Status: {fraud_status}")
-                print(f"   Confidence: {confidence}")
-                print(f"   Risk Level: {risk_level}")
-                print(f"   Reputation: {assessment[4]/100:.1f}%")
-            else:
-                print("   No assessment available")
-                
-        except Exception as e:
-            print(f"   ERROR: {e}")
+            print(f"   Status: {fraud_status}")
+            print(f"   Confidence: {confidence}")
+            print(f"   Risk Level: {risk_level}")
+            print(f"   Reputation: {assessment['reputationScore']/100:.1f}%")
+        else:
+            print("   No assessment available")
+
+def open_event_index():
+    """Bring the local event index up to date and return it (None if it cannot be synced)"""
+    contract = get_contract()
+    if not contract:
+        return None
+    
+    index = EventIndex(contract.w3, contract.address, os.getenv('EVENT_INDEX_PATH', default_index_path))
+    try:
+        new_events = index.sync()
+    except Exception as e:
+        index.close()
+        print_error(f"Could not update the event index: {e}")
+        return None
+    print_info(f"Event index: {len(index)} wallets, {new_events} new events")
+    return index
+
+def ask_number(prompt, default):
+    """A non-negative whole number typed by the user, default if left empty, None if invalid"""
+    value = input(prompt).strip()
+    if not value:
+        return default
+    if not value.isdigit():
+        print_error(f"'{value}' is not a whole number")
+        return None
+    return int(value)
+
+def print_indexed_assessments(assessments):
+    for assessment in assessments:
+        fraud_status = "FRAUDULENT" if assessment["mlIsFraudulent"] else "LEGITIMATE"
+        print(f"   {assessment['walletAddress']}  block {assessment['blockNumber']}  "
+              f"risk {assessment['overallRisk']}  {fraud_status} ({assessment['mlConfidence']}%)")
+
+def view_high_risk_wallets():
+    """List wallets whose latest indexed risk is high, from the local event index"""
+    min_risk = ask_number("Minimum overall risk (default 7000): ", 7000)
+    if min_risk is None:
+        return
+    index = open_event_index()
+    if not index:
+        return
+    
+    with index:
+        wallets = index.high_risk_wallets(min_risk)
+        print_header(f"Wallets with Overall Risk >= {min_risk}")
+        print_indexed_assessments(wallets)
+        print_info(f"{len(wallets)} wallets")
+
+def view_changes_since():
+    """List assessment changes since a block, from the local event index"""
+    block = ask_number("Changes since block (default 0): ", 0)
+    if block is None:
+        return
+    index = open_event_index()
+    if not index:
+        return
+    
+    with index:
+        changes = index.changes_since(block)
+        print_header(f"Assessment Changes Since Block {block}")
+        print_indexed_assessments(changes)
+        print_info(f"{len(changes)} changes")
 
 def interactive_mode():
     """Interactive mode to check any address"""
@@ -199,8 +274,35 @@ def interactive_mode():
         except Exception as e:
             print_error(f"Error: {e}")
 
-def main():
+def export_mode(args):
+    """Non-interactive export of every address in a file"""
+    # One connection and contract handle shared by all reads
+    contract = get_contract(args.rpc_url, args.contract)
+    if not contract:
+        return 1
+    
+    print_header(f"Exporting Assessments for {args.export}")
+    summary = export_assessments(contract.w3, contract, args.export, args.output, output_format=args.format,
+                                 concurrency=args.concurrency, chunk_size=args.chunk_size)
+    return 0 if summary["rows"] else 1
+
+def main(argv=None):
     """Main function"""
+    parser = argparse.ArgumentParser(description='View fraud assessments stored on the blockchain')
+    parser.add_argument('--export', metavar='FILE', help='Export assessments for every address in FILE and exit')
+    parser.add_argument('--output', help='Export file (.csv or .jsonl)')
+    parser.add_argument('--format', choices=FORMATS, help='Export format (default: from extension)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Batched reads in flight at once')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Addresses per batched read')
+    parser.add_argument('--rpc-url', default=os.environ['RPC_URL'])
+    parser.add_argument('--contract', default=os.environ['CONTRACT_ADDRESS'], help='Contract address')
+    args = parser.parse_args(argv)
+    
+    if args.export:
+        if not args.output:
+            parser.error('--export needs --output')
+        return export_mode(args)
+    
     print_header("Blockchain Viewer for Fraud Detection System")
     
     # Check if blockchain is running
@@ -217,11 +319,13 @@ def main():
     print("\nChoose an option:")
     print("1. View test addresses")
     print("2. Interactive mode (check any address)")
-    print("3. Exit")
+    print("3. High-risk wallets (local event index)")
+    print("4. Changes since a block (local event index)")
+    print("5. Exit")
     
     while True:
         try:
-            choice = input("\nEnter your choice (1-3): ").strip()
+            choice = input("\nEnter your choice (1-5): ").strip()
             
             if choice == '1':
                 view_multiple_addresses()
@@ -229,14 +333,20 @@ def main():
                 interactive_mode()
                 break
             elif choice == '3':
+                view_high_risk_wallets()
+            elif choice == '4':
+                view_changes_since()
+            elif choice == '5':
                 print_info("Goodbye!")
                 break
             else:
-                print_error("Invalid choice. Please enter 1, 2, or 3.")
+                print_error("Invalid choice. Please enter 1 to 5.")
                 
         except KeyboardInterrupt:
             print_info("\nGoodbye!")
             break
+        except Exception as e:
+            print_error(f"Error: {e}")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -45,6 +45,16 @@ contract FraudDetectionContractV2 {
         uint256 overallRisk;       // 0-10000 (basis points)
     }
     
+    // Assessment fields for one wallet in a batch update (the timestamp is set on chain)
+    struct AssessmentInput {
+        bool hasMLPrediction;
+        bool mlIsFraudulent;
+        uint256 mlConfidence;      // 0-10000 (basis points)
+        uint256 reputationScore;   // 0-10000 (basis points)
+        uint256 reportCount;
+        uint256 overallRisk;       // 0-10000 (basis points)
+    }
+    
     // Mappings
     mapping(address => FraudAssessment) public fraudAssessments;
     mapping(address => uint256) public reputationScores;
@@ -104,6 +114,56 @@ contract FraudDetectionContractV2 {
         uint256 reportCount,
         uint256 overallRisk
     ) external onlyOracle {
+        _updateFraudAssessment(
+            walletAddress,
+            hasMLPrediction,
+            mlIsFraudulent,
+            mlConfidence,
+            reputationScore,
+            reportCount,
+            overallRisk
+        );
+    }
+    
+    /**
+     * @dev Update many fraud assessments in one transaction, so the 21000 base
+     *      transaction cost is paid once per batch instead of once per wallet
+     * @param walletAddresses Addresses to assess
+     * @param assessments Assessment fields, one entry per address in the same order
+     */
+    function batchUpdateFraudAssessments(
+        address[] calldata walletAddresses,
+        AssessmentInput[] calldata assessments
+    ) external onlyOracle {
+        require(walletAddresses.length > 0, "Empty batch");
+        require(walletAddresses.length == assessments.length, "Array length mismatch");
+        
+        for (uint256 i = 0; i < walletAddresses.length; i++) {
+            AssessmentInput calldata assessment = assessments[i];
+            _updateFraudAssessment(
+                walletAddresses[i],
+                assessment.hasMLPrediction,
+                assessment.mlIsFraudulent,
+                assessment.mlConfidence,
+                assessment.reputationScore,
+                assessment.reportCount,
+                assessment.overallRisk
+            );
+        }
+    }
+    
+    /**
+     * @dev Validate and store one assessment, shared by the single and batch updates
+     */
+    function _updateFraudAssessment(
+        address walletAddress,
+        bool hasMLPrediction,
+        bool mlIsFraudulent,
+        uint256 mlConfidence,
+        uint256 reputationScore,
+        uint256 reportCount,
+        uint256 overallRisk
+    ) internal {
         require(walletAddress != address(0), "Invalid wallet address");
         require(mlConfidence <= MAX_CONFIDENCE, "Confidence exceeds maximum");
         require(reputationScore <= MAX_REPUTATION, "Reputation exceeds maximum");
@@ -0,0 +1,91 @@
+"""
+Address lookup index for the Fraud Detection API
+@description: Maps wallet addresses to row positions in the feature matrix so
+lookups are a hash probe instead of a full scan over the dataset
+"""
+
+import numpy as np
+
+
+class AddressIndex:
+    """Hashed address -> row position index built once at startup"""
+
+    def __init__(self, addresses):
+        positions = {}
+        for position, address in enumerate(addresses):
+            # Keep the first occurrence, same as the old df[mask].values[0] lookup
+            positions.setdefault(str(address).lower(), position)
+        self._positions = positions
+        self._size = len(addresses)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, address):
+        return self.get(address) is not None
+
+    def get(self, address):
+        """Return the row position for an address, or None if it is unknown"""
+        return self._positions.get(address.lower())
+
+    def get_many(self, addresses):
+        """Resolve many addresses in one pass; unknown addresses map to -1"""
+        positions = self._positions
+        return np.fromiter(
+            (positions.get(address.lower(), -1) for address in addresses),
+            dtype=np.int64,
+            count=len(addresses),
+        )
+
+
+def build_feature_matrix(df, feature_columns):
+    """Pack the scoring columns into one contiguous float64 matrix"""
+    return np.ascontiguousarray(df[feature_columns].to_numpy(dtype=np.float64))
+
+
+class SortedAddressIndex:
+    """
+    Address index backed by a sorted key array and binary search.
+
+    Both arrays can be memory-mapped from the feature store, so building the
+    index costs nothing at startup and worker processes share the pages.
+    """
+
+    def __init__(self, keys, rows, size=None):
+        self.keys = keys    # sorted, unique, lowercase ASCII bytes
+        self.rows = rows    # first row position for each key
+        self._size = len(rows) if size is None else size
+
+    @classmethod
+    def from_addresses(cls, addresses):
+        encoded = np.array([str(address).lower().encode('ascii') for address in addresses])
+        keys, rows = np.unique(encoded, return_index=True)
+        return cls(keys, rows.astype(np.int64), size=len(encoded))
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, address):
+        return self.get(address) is not None
+
+    def get(self, address):
+        """Return the row position for an address, or None if it is unknown"""
+        row = self.get_many([address])[0]
+        return int(row) if row >= 0 else None
+
+    def get_many(self, addresses):
+        """Resolve many addresses with one vectorized search; unknown addresses map to -1"""
+        result = np.full(len(addresses), -1, dtype=np.int64)
+        if len(addresses) == 0 or len(self.keys) == 0:
+            return result
+
+        queries = np.array([address.lower().encode('ascii', 'replace') for address in addresses])
+        # Anything wider than the stored keys cannot match (and would be truncated)
+        fits = np.char.str_len(queries) <= self.keys.dtype.itemsize
+        queries = queries.astype(self.keys.dtype)
+
+        positions = np.searchsorted(self.keys, queries)
+        positions[positions == len(self.keys)] = 0
+        matched = fits & (self.keys[positions] == queries)
+        result[matched] = self.rows[positions[matched]]
+        return result
@@ -0,0 +1,73 @@
+"""
+Streaming input parsing for the Fraud Detection API
+@description: Reads addresses one line at a time from a request body (plain
+lines or NDJSON) and groups them into fixed-size chunks, so large batches
+are scored without holding the whole list in memory
+"""
+
+import json
+
+MAX_LINE_BYTES = 1024
+
+
+def parse_address_line(line):
+    """
+    Return the address on one input line.
+
+    Accepts a bare address, a JSON string, or a JSON object with an
+    "address" field. Returns None for blank lines; raises ValueError if the
+    line holds something else.
+    """
+    text = line.strip()
+    if not text:
+        return None
+    if text[0] not in '{"':
+        return text
+
+    value = json.loads(text)
+    if isinstance(value, dict):
+        value = value.get('address')
+    if not isinstance(value, str) or not value:
+        raise ValueError("Expected an address or an object with an 'address' field")
+    return value
+
+
+def iter_address_lines(stream, max_line_bytes=MAX_LINE_BYTES):
+    """
+    Yield (address, error) for every non-blank line of a binary stream.
+
+    Exactly one of the pair is set. Lines longer than max_line_bytes are
+    skipped (reported as an error) without being read into memory in full.
+    """
+    while True:
+        line = stream.readline(max_line_bytes)
+        if not line:
+            return
+        if len(line) == max_line_bytes and not line.endswith(b'\n'):
+            # Discard the rest of the oversized line
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes)
+            yield None, f"Line longer than {max_line_bytes} bytes"
+            continue
+
+        try:
+            address = parse_address_line(line.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e:
+            yield None, f"Invalid line: {e}"
+            continue
+        if address is not None:
+            yield address, None
+
+
+def iter_chunks(items, chunk_size):
+    """Group an iterable into lists of at most chunk_size items"""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -5,37 +5,38 @@ Created on: August 19, 2025
 @description: Web API for machine learning model that detects fraudulent blockchain transactions
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import joblib
-import pandas as pd
+import json
 import os
-import numpy as np
+import shutil
+import signal
+import tempfile
+import threading
+import time
 from flask_cors import CORS
+from address_stream import iter_address_lines, iter_chunks
+from feature_input import decode_base64_float32, decode_float32, parse_feature_values
+from prediction_cache import PredictionCache
+from serving_state import default_model_paths, first_existing_path, load_state
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for blockchain integration
 
-def _first_existing_path(candidates):
-    for candidate in candidates:
-        if os.path.exists(candidate):
-            return candidate
-    return None
-
 # Resolve project base dir dynamically (fallback to current file's parent)
 base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 
-# Determine artifact paths robustly
-candidate_model_paths = [
-    os.path.join(base_dir, "results", "tuned_fraud_detection_model.joblib"),
-    os.path.join(base_dir, "results", "fraud_detection_model.joblib"),
-]
+# Determine artifact paths robustly (MODEL_PATH overrides the defaults)
+candidate_model_paths = default_model_paths(base_dir)
 
 # No scaler needed for our Random Forest model
 candidate_scaler_paths = []
 
-model_path = _first_existing_path(candidate_model_paths)
-scaler_path = _first_existing_path(candidate_scaler_paths)
+model_path = first_existing_path(candidate_model_paths)
+scaler_path = first_existing_path(candidate_scaler_paths)
 data_path = os.path.join(base_dir, "data", "cleaned_data.csv")
+# Memory-mapped binary copy of data_path, built with `python feature_store.py`
+feature_store_dir = os.getenv("FEATURE_STORE_DIR", os.path.join(base_dir, "data", "feature_store"))
 
 if not model_path:
     raise FileNotFoundError(
@@ -44,19 +45,122 @@ if not model_path:
 
 use_scaler = scaler_path is not None
 
-# Load model and optional scaler
-model = joblib.load(model_path)
+# Serving options (set via environment variables)
+# PRECOMPUTE_PREDICTIONS=1 scores the whole dataset once and serves lookups
+precompute_predictions = os.getenv("PRECOMPUTE_PREDICTIONS", "0") == "1"
+prediction_table_dir = os.getenv("PREDICTION_TABLE_DIR", os.path.join(base_dir, "results"))
+# INFERENCE_ENGINE=compiled evaluates the forest with flat numpy arrays; batches
+# larger than COMPILED_MAX_BATCH still go to sklearn, which is faster there
+inference_engine = os.getenv("INFERENCE_ENGINE", "sklearn")
+compiled_max_batch = int(os.getenv("COMPILED_MAX_BATCH", "512"))
+# COALESCE_REQUESTS=1 batches concurrent /predict calls into one model call
+coalesce_requests = os.getenv("COALESCE_REQUESTS", "0") == "1"
+coalesce_window_ms = float(os.getenv("COALESCE_WINDOW_MS", "2"))
+coalesce_max_batch = int(os.getenv("COALESCE_MAX_BATCH", "64"))
+# PREDICTION_CACHE_SIZE > 0 keeps that many hot /predict results in an LRU cache
+prediction_cache_size = int(os.getenv("PREDICTION_CACHE_SIZE", "0"))
+prediction_cache_ttl = float(os.getenv("PREDICTION_CACHE_TTL", "0")) or None
+# RELOAD_GRACE_SECONDS: how long a replaced model stays usable by in-flight requests
+reload_grace_seconds = float(os.getenv("RELOAD_GRACE_SECONDS", "30"))
+# /batch_predict/stream scores this many addresses per chunk; request bodies
+# are buffered in memory up to STREAM_SPOOL_MB and on disk beyond that
+stream_chunk_size = int(os.getenv("STREAM_CHUNK_SIZE", "4096"))
+stream_spool_bytes = int(float(os.getenv("STREAM_SPOOL_MB", "8")) * 1024 * 1024)
+# Largest batch /predict_features accepts in one request
+raw_features_max_rows = int(os.getenv("RAW_FEATURES_MAX_ROWS", "100000"))
+
+# Load optional scaler (the model is part of the serving state below)
 scaler = joblib.load(scaler_path) if use_scaler else None
 
-def transform_features(array_2d):
-    # Apply scaler if available; otherwise pass-through
-    if scaler is not None:
-        return scaler.transform(array_2d)
-    return array_2d
+serving_options = dict(
+    data_path=data_path,
+    feature_store_dir=feature_store_dir,
+    scaler=scaler,
+    inference_engine=inference_engine,
+    compiled_max_batch=compiled_max_batch,
+    precompute_predictions=precompute_predictions,
+    prediction_table_dir=prediction_table_dir,
+    coalesce_requests=coalesce_requests,
+    coalesce_window_ms=coalesce_window_ms,
+    coalesce_max_batch=coalesce_max_batch,
+)
+
+# Model, dataset and index live in one object. Handlers read `state` once per
+# request, so a reload only has to swap this single reference.
+state = load_state(model_path, **serving_options)
+try:
+    state.warm_up()
+except Exception as e:
+    print(f"Warning: warm-up predictions failed for {model_path}: {e}")
+
+# Optional cache of hot /predict results, keyed by address and model/dataset fingerprint
+prediction_cache = None
+if prediction_cache_size > 0:
+    prediction_cache = PredictionCache(max_size=prediction_cache_size, ttl_seconds=prediction_cache_ttl)
+
+# Hot reload bookkeeping; only one reload runs at a time
+_reload_lock = threading.Lock()
+reload_status = {
+    "status": "idle",
+    "model_path": model_path,
+    "model_fingerprint": state.model_fingerprint,
+    "reloads": 0,
+    "started_at": None,
+    "finished_at": None,
+    "error": None,
+}
+
+def _reload_holding_lock():
+    """Build a new state in the calling thread, warm it, then swap it in"""
+    global state
+    reload_status.update(status="reloading", started_at=time.time(), finished_at=None, error=None)
+    try:
+        new_model_path = first_existing_path(candidate_model_paths)
+        if not new_model_path:
+            raise FileNotFoundError("Model artifact not found. Expected one of: " + ", ".join(candidate_model_paths))
+        
+        new_state = load_state(new_model_path, **serving_options)
+        new_state.warm_up()
+        
+        old_state, state = state, new_state
+        if prediction_cache is not None:
+            prediction_cache.invalidate()
+        old_state.retire(reload_grace_seconds)
+        
+        reload_status.update(
+            status="ready",
+            model_path=new_model_path,
+            model_fingerprint=new_state.model_fingerprint,
+            reloads=reload_status["reloads"] + 1,
+        )
+        print(f"Reloaded model from {new_model_path}")
+        return True
+    except Exception as e:
+        # Keep serving the old state
+        reload_status.update(status="failed", error=str(e))
+        print(f"Model reload failed, still serving the previous model: {e}")
+        return False
+    finally:
+        reload_status["finished_at"] = time.time()
+        _reload_lock.release()
+
+def reload_model():
+    """Reload synchronously; returns None if a reload is already running"""
+    if not _reload_lock.acquire(blocking=False):
+        return None
+    return _reload_holding_lock()
 
-# Load the dataset for feature extraction
-df = pd.read_csv(data_path)
-feature_columns = df.drop(columns=['full_address', 'is_fraud']).select_dtypes(include='number').columns
+def start_background_reload():
+    """Reload in a background thread; returns False if one is already running"""
+    if not _reload_lock.acquire(blocking=False):
+        return False
+    threading.Thread(target=_reload_holding_lock, name="model-reload", daemon=True).start()
+    return True
+
+def install_reload_signal():
+    """Reload on SIGHUP (POSIX only; must be called from the main thread)"""
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda *_: start_background_reload())
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -73,22 +177,24 @@ def predict_fraud():
         if not address:
             return jsonify({"error": "Address is required"}), 400
         
-        # FIX: Convert the incoming address to lowercase for the lookup
-        address_data = df[df['full_address'] == address.lower()]
-        
-        if address_data.empty:
-            return jsonify({
-                "error": "Address not found in dataset",
-                "address": address
-            }), 404
-        
-        # Extract features
-        features = address_data[feature_columns].values[0]
-        features_scaled = transform_features(features.reshape(1, -1))
-        
-        # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        probability = model.predict_proba(features_scaled)[0][1] if hasattr(model, 'predict_proba') else None
+        current = state
+        cached = prediction_cache.get(address, current.cache_key) if prediction_cache is not None else None
+        if cached is not None:
+            prediction, probability = cached
+        else:
+            # The index lowercases the incoming address for the lookup
+            row = current.address_index.get(address)
+            
+            if row is None:
+                return jsonify({
+                    "error": "Address not found in dataset",
+                    "address": address
+                }), 404
+            
+            # Make prediction
+            prediction, probability = current.score_row(row)
+            if prediction_cache is not None:
+                prediction_cache.put(address, current.cache_key, (prediction, probability))
         
         return jsonify({
             "address": address,
@@ -100,6 +206,36 @@ def predict_fraud():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def _score_addresses(current, addresses):
+    """Score a list of addresses with one model call; results keep the input order"""
+    # Resolve every address in one pass, then score all found rows together
+    rows = current.address_index.get_many(addresses)
+    found = rows >= 0
+    
+    predictions = probabilities = None
+    if found.any():
+        predictions, probabilities = current.score_rows(rows[found])
+    
+    results = []
+    scored = 0
+    for address, is_found in zip(addresses, found):
+        if not is_found:
+            results.append({
+                "address": address,
+                "prediction": None,
+                "probability": None,
+                "error": "Address not found"
+            })
+            continue
+        
+        results.append({
+            "address": address,
+            "prediction": int(predictions[scored]),
+            "probability": float(probabilities[scored]) if probabilities is not None else None
+        })
+        scored += 1
+    return results
+
 @app.route('/batch_predict', methods=['POST'])
 def batch_predict():
     """Predict fraud for multiple addresses"""
@@ -110,33 +246,7 @@ def batch_predict():
         if not addresses:
             return jsonify({"error": "Addresses list is required"}), 400
         
-        results = []
-        for address in addresses:
-            # FIX: Convert the incoming address to lowercase for the lookup
-            address_data = df[df['full_address'] == address.lower()]
-            
-            if address_data.empty:
-                results.append({
-                    "address": address,
-                    "prediction": None,
-                    "probability": None,
-                    "error": "Address not found"
-                })
-                continue
-            
-            # Extract features
-            features = address_data[feature_columns].values[0]
-            features_scaled = transform_features(features.reshape(1, -1))
-            
-            # Make prediction
-            prediction = model.predict(features_scaled)[0]
-            probability = model.predict_proba(features_scaled)[0][1] if hasattr(model, 'predict_proba') else None
-            
-            results.append({
-                "address": address,
-                "prediction": int(prediction),
-                "probability": float(probability) if probability is not None else None
-            })
+        results = _score_addresses(state, addresses)
         
         return jsonify({
             "results": results,
@@ -146,21 +256,154 @@ def batch_predict():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/batch_predict/stream', methods=['POST'])
+def batch_predict_stream():
+    """Score a newline-delimited list of addresses and stream NDJSON results.
+
+    Each body line is an address, a JSON string or {"address": ...}. Results
+    are written as one JSON object per non-blank input line (blank lines are
+    skipped), in input order, as each chunk of STREAM_CHUNK_SIZE addresses
+    (or ?chunk_size=N) is scored, so memory use does not grow with the
+    number of addresses.
+    """
+    chunk_size = request.args.get('chunk_size', stream_chunk_size, type=int)
+    if chunk_size < 1:
+        return jsonify({"error": "chunk_size must be at least 1"}), 400
+    
+    # Take the whole body off the socket before responding, so clients that
+    # upload everything before reading the response cannot deadlock
+    spool = tempfile.SpooledTemporaryFile(max_size=stream_spool_bytes)
+    try:
+        shutil.copyfileobj(request.stream, spool, 64 * 1024)
+        spool.seek(0)
+    except Exception as e:
+        spool.close()
+        return jsonify({"error": str(e)}), 400
+    
+    # The whole stream is scored by the model that was serving when it started
+    current = state
+    
+    def generate():
+        try:
+            for chunk in iter_chunks(iter_address_lines(spool), chunk_size):
+                addresses = [address for address, error in chunk if error is None]
+                scored = iter(_score_addresses(current, addresses) if addresses else [])
+                lines = []
+                for address, error in chunk:
+                    if error is None:
+                        record = next(scored)
+                    else:
+                        record = {"address": None, "prediction": None, "probability": None, "error": error}
+                    lines.append(json.dumps(record))
+                yield "\n".join(lines) + "\n"
+        except Exception as e:
+            # Headers are already sent; report the failure as the last record
+            yield json.dumps({"error": str(e), "status": "failed"}) + "\n"
+        finally:
+            spool.close()
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/predict_features', methods=['POST'])
+def predict_features():
+    """Score feature vectors directly, for wallets that are not in the dataset.
+
+    Values follow the feature_names order from /model_info. Accepts JSON
+    {"features": [...]} (one vector) or {"features": [[...], ...]} (a batch),
+    JSON {"features_b64": "..."} with packed little-endian float32 rows, or
+    the raw float32 bytes with Content-Type application/octet-stream.
+    """
+    current = state
+    n_features = len(current.feature_columns)
+    single = False
+    try:
+        if request.mimetype == 'application/octet-stream':
+            features = decode_float32(request.get_data(), n_features, raw_features_max_rows)
+        else:
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict) or ('features' not in data and 'features_b64' not in data):
+                return jsonify({"error": "'features' or 'features_b64' is required"}), 400
+            if 'features_b64' in data:
+                features = decode_base64_float32(data['features_b64'], n_features, raw_features_max_rows)
+            else:
+                features, single = parse_feature_values(data['features'], n_features, raw_features_max_rows)
+    except ValueError as e:
+        return jsonify({"error": str(e), "feature_count": n_features}), 400
+    
+    try:
+        predictions, probabilities = current.score_live(features)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    
+    if single:
+        return jsonify({
+            "prediction": int(predictions[0]),
+            "probability": float(probabilities[0]) if probabilities is not None else None,
+            "status": "success"
+        })
+    return jsonify({
+        "predictions": predictions.astype(int).tolist(),
+        "probabilities": probabilities.astype(float).tolist() if probabilities is not None else None,
+        "status": "success"
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Serving metrics for the optional performance features"""
+    return jsonify({
+        "coalescer": state.coalescer.stats() if state.coalescer is not None else {"enabled": False},
+        "cache": prediction_cache.stats() if prediction_cache is not None else {"enabled": False}
+    })
+
+@app.route('/reload', methods=['POST'])
+def reload():
+    """Load the model and dataset again and swap them in without downtime.
+
+    Runs in the background and returns 202 unless the body has {"wait": true}.
+    With several worker processes (serve.py) send SIGHUP to the parent instead.
+    """
+    data = request.get_json(silent=True) or {}
+    if data.get('wait'):
+        result = reload_model()
+        if result is None:
+            return jsonify({"error": "Reload already in progress", **reload_status}), 409
+        return jsonify(reload_status), 200 if result else 500
+    
+    if not start_background_reload():
+        return jsonify({"error": "Reload already in progress", **reload_status}), 409
+    return jsonify(reload_status), 202
+
+@app.route('/reload', methods=['GET'])
+def reload_info():
+    """Status of the last model reload"""
+    return jsonify(reload_status)
+
 @app.route('/model_info', methods=['GET'])
 def model_info():
     """Get information about the model"""
+    current = state
     return jsonify({
         "model_type": "RandomForest",
-        "feature_count": len(feature_columns),
-        "feature_names": feature_columns.tolist(),
-        "dataset_size": len(df),
-        "fraud_ratio": float(df['is_fraud'].mean())
+        "inference_engine": current.inference_engine,
+        "model_fingerprint": current.model_fingerprint,
+        "feature_count": len(current.feature_columns),
+        "feature_names": list(current.feature_columns),
+        "dataset_size": len(current.feature_store),
+        "fraud_ratio": float(current.feature_store.labels.mean())
     })
 
 if __name__ == '__main__':
     print("Starting Fraud Detection API...")
-    print(f"Model loaded from: {model_path}")
-    print(f"Dataset loaded with {len(df)} addresses")
+    print(f"Model loaded from: {state.model_path}")
+    print(f"Dataset loaded with {len(state.feature_store)} addresses from {state.dataset_source}")
+    print(f"Inference engine: {state.inference_engine}")
+    if state.coalescer is not None:
+        print(f"Coalescing /predict calls: window {coalesce_window_ms} ms, max batch {coalesce_max_batch}")
+    if prediction_cache is not None:
+        print(f"Prediction cache: {prediction_cache_size} entries, TTL {prediction_cache_ttl or 'none'}")
+    if state.prediction_table is not None:
+        print(f"Serving precomputed predictions for {len(state.prediction_table)} addresses")
+    install_reload_signal()
     print("API will be available at: http://localhost:5000")
     
     try:
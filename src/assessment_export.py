@@ -0,0 +1,145 @@
+"""
+Bulk export of on-chain fraud assessments
+@description: Reads getFraudAssessment for every address in a file over one
+Web3 connection, with a bounded number of batched reads in flight, and
+writes the results to CSV or JSONL in input order with per-second progress
+
+Usage:
+    python blockchain_viewer.py --export watchlist.txt --output assessments.csv
+    python blockchain_viewer.py --export watchlist.csv --output assessments.jsonl --concurrency 8
+
+Input is one address per line (or NDJSON), or a CSV with a full_address or
+address column.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from web3 import Web3
+
+from address_stream import iter_address_lines, iter_chunks
+from bulk_reads import ASSESSMENT_KEYS, read_assessments
+
+ADDRESS_COLUMNS = ("full_address", "address")
+EXPORT_COLUMNS = ("address",) + ASSESSMENT_KEYS + ("error",)
+FORMATS = ("csv", "jsonl")
+
+
+def iter_address_file(path):
+    """
+    (address, error) for each address in a text/NDJSON file or a CSV with an
+    address column. A text line that cannot be parsed gives (None, error),
+    so it still gets its own output row.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as handle:
+            reader = csv.DictReader(handle)
+            column = next((name for name in ADDRESS_COLUMNS if name in (reader.fieldnames or ())), None)
+            if column is None:
+                raise ValueError(f"{path} has no address column (expected one of {', '.join(ADDRESS_COLUMNS)})")
+            for row in reader:
+                if row[column]:
+                    yield row[column].strip(), None
+        return
+
+    with open(path, "rb") as handle:
+        yield from iter_address_lines(handle)
+
+
+class CsvExportWriter:
+    def __init__(self, path):
+        self.handle = open(path, "w", newline="")
+        self.writer = csv.DictWriter(self.handle, fieldnames=EXPORT_COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.handle.close()
+
+
+class JsonlExportWriter:
+    def __init__(self, path):
+        self.handle = open(path, "w")
+
+    def write(self, rows):
+        self.handle.writelines(json.dumps(row) + "\n" for row in rows)
+
+    def close(self):
+        self.handle.close()
+
+
+def open_export_writer(path, output_format=None):
+    output_format = output_format or ("jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv")
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown format '{output_format}', expected one of {', '.join(FORMATS)}")
+    return JsonlExportWriter(path) if output_format == "jsonl" else CsvExportWriter(path)
+
+
+def read_chunk(w3, contract, entries):
+    """Export rows for a chunk of (address, error); bad lines, invalid addresses and failed reads get an error"""
+    valid = [address for address, error in entries if error is None and Web3.is_address(address)]
+    assessments = read_assessments(w3, contract, valid, max_batch=len(valid)) if valid else {}
+    rows = []
+    for address, error in entries:
+        row = dict.fromkeys(EXPORT_COLUMNS)
+        row["address"] = address
+        if error is not None:
+            row["error"] = error
+        elif address not in assessments:
+            row["error"] = "Invalid address"
+        elif assessments[address] is None:
+            row["error"] = "Read failed"
+        else:
+            row.update(assessments[address])
+        rows.append(row)
+    return rows
+
+
+def _read_chunks(w3, contract, chunks, concurrency):
+    """Yield row lists in input order, with at most 2 chunks per thread in flight"""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(read_chunk, w3, contract, chunk))
+            if len(pending) >= concurrency * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def export_assessments(w3, contract, input_path, output_path, output_format=None, concurrency=4,
+                       chunk_size=500, progress_interval=1.0):
+    """Export the assessment of every address in input_path and return a summary dict"""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    chunks = iter_chunks(iter_address_file(input_path), chunk_size)
+    rows = errors = 0
+    start = last_report = time.perf_counter()
+    writer = open_export_writer(output_path, output_format)
+    try:
+        for chunk_rows in _read_chunks(w3, contract, chunks, concurrency):
+            writer.write(chunk_rows)
+            rows += len(chunk_rows)
+            errors += sum(1 for row in chunk_rows if row["error"])
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                print(f"  {rows:,} addresses read ({rows / (now - start):,.0f}/s, {errors:,} errors)", flush=True)
+                last_report = now
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "rows": rows,
+        "errors": errors,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+    }
+    print(f"Exported {rows:,} assessments in {elapsed:.1f}s ({summary['rows_per_second']:,.0f}/s), "
+          f"{errors:,} errors. Results written to {output_path}")
+    return summary
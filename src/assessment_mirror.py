@@ -0,0 +1,87 @@
+"""
+Local mirror of the assessments the oracle has on chain
+@description: Remembers the label and confidence last stored for each
+wallet, warmed from getFraudAssessment reads or FraudAssessmentUpdated
+events, so the oracle can skip writes that would store the same result again
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class AssessmentMirror:
+    """
+    address -> (mlIsFraudulent, mlConfidence) as last stored on chain.
+
+    A new result needs a write when the wallet has no stored prediction, the
+    label flips, or the confidence (in the contract's units) differs by more
+    than threshold.
+    """
+
+    def __init__(self, threshold=5):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._stored = {}
+
+    def __len__(self):
+        return len(self._stored)
+
+    def __contains__(self, address):
+        return address.lower() in self._stored
+
+    def get(self, address):
+        """(is_fraudulent, confidence), or None if the wallet has no stored prediction"""
+        return self._stored.get(address.lower())
+
+    def record(self, address, is_fraudulent, confidence):
+        with self._lock:
+            self._stored[address.lower()] = (bool(is_fraudulent), int(confidence))
+
+    def record_absent(self, address):
+        """Remember that a wallet has no prediction on chain, so it is not read again"""
+        with self._lock:
+            self._stored[address.lower()] = None
+
+    def forget(self, address):
+        """Drop an entry, e.g. after a write failed and the chain state is unknown"""
+        with self._lock:
+            self._stored.pop(address.lower(), None)
+
+    def needs_write(self, address, is_fraudulent, confidence):
+        stored = self.get(address)
+        if stored is None:
+            return True
+        stored_label, stored_confidence = stored
+        return stored_label != bool(is_fraudulent) or abs(int(confidence) - stored_confidence) > self.threshold
+
+    def warm_from_reads(self, addresses, read_assessments):
+        """
+        Fill in addresses not yet mirrored. read_assessments(addresses) returns
+        {address: get_blockchain_assessment dict or None}. Returns how many were read.
+        """
+        missing = [address for address in dict.fromkeys(addresses) if address not in self]
+        if not missing:
+            return 0
+        for address, assessment in read_assessments(missing).items():
+            if assessment is None:
+                continue  # Read failed; try again next time
+            if assessment["hasMLPrediction"]:
+                self.record(address, assessment["mlIsFraudulent"], assessment["mlConfidence"])
+            else:
+                self.record_absent(address)
+        return len(missing)
+
+    def warm_from_events(self, events):
+        """Apply FraudAssessmentUpdated events in log order (later events win)"""
+        count = 0
+        for event in events:
+            args = event["args"]
+            if args["hasMLPrediction"]:
+                self.record(args["walletAddress"], args["mlIsFraudulent"], args["mlConfidence"])
+            else:
+                self.record_absent(args["walletAddress"])
+            count += 1
+        logger.info(f"Mirror warmed from {count} events ({len(self)} wallets)")
+        return count
@@ -0,0 +1,131 @@
+"""
+Bulk reads of on-chain fraud assessments
+@description: Fetches getFraudAssessment for many wallets per RPC round trip
+by sending the eth_call requests as JSON-RPC batches. Batches are sized so
+each response stays under a byte limit, and a batch the node rejects is
+split in half and retried. Works against already deployed contracts, since
+nothing changes on chain.
+
+Needs web3 v7 or later (contract.encode_abi and provider.make_batch_request).
+"""
+
+import logging
+import os
+
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+ASSESSMENT_KEYS = ("hasMLPrediction", "mlIsFraudulent", "mlConfidence", "mlTimestamp",
+                   "reputationScore", "reportCount", "overallRisk")
+ASSESSMENT_TYPES = ("bool", "bool", "uint256", "uint256", "uint256", "uint256", "uint256")
+
+# Seven ABI words as a 0x hex string plus the {"jsonrpc","id","result"} envelope
+RESPONSE_BYTES_PER_CALL = 2 + 64 * len(ASSESSMENT_TYPES) + 48
+
+
+def batch_limits(max_batch=None, max_response_bytes=None):
+    """(max calls per batch, max response bytes per batch) from arguments or the environment"""
+    max_batch = max_batch or int(os.getenv("ORACLE_READ_BATCH_SIZE", "1000"))
+    max_response_bytes = max_response_bytes or int(os.getenv("ORACLE_READ_MAX_RESPONSE_BYTES", "1000000"))
+    return max_batch, max_response_bytes
+
+
+def calls_per_batch(max_batch, max_response_bytes):
+    return max(1, min(max_batch, max_response_bytes // RESPONSE_BYTES_PER_CALL))
+
+
+def _call_requests(contract, addresses):
+    return [
+        ("eth_call", [{"to": contract.address,
+                       "data": contract.encode_abi("getFraudAssessment", args=[Web3.to_checksum_address(address)])},
+                      "latest"])
+        for address in addresses
+    ]
+
+
+def _decode_responses(codec, addresses, responses):
+    """{address: assessment dict or None}; calls that errored map to None"""
+    assessments = {address: None for address in addresses}
+    failed, last_error = 0, None
+    for address, response in zip(addresses, responses):
+        try:
+            if "result" not in response:
+                raise ValueError(response.get("error"))
+            values = codec.decode(ASSESSMENT_TYPES, Web3.to_bytes(hexstr=response["result"]))
+        except Exception as e:
+            failed, last_error = failed + 1, f"{address}: {e}"
+            continue
+        assessments[address] = dict(zip(ASSESSMENT_KEYS, values))
+    if failed:
+        logger.error(f"Error getting {failed} of {len(addresses)} blockchain assessments (last {last_error})")
+    return assessments
+
+
+def _is_rejected(responses):
+    # A node that refuses the whole batch (too many calls, response too
+    # large) answers with a single error object instead of a list
+    return not isinstance(responses, list)
+
+
+def _batched_reads(codec, contract, addresses, max_batch, max_response_bytes):
+    """
+    The batching loop shared by read_assessments and read_assessments_async.
+    Yields the requests for each round trip and is sent back the node's
+    responses (or the exception the send raised); returns the assessments.
+    """
+    addresses = list(dict.fromkeys(addresses))
+    size = calls_per_batch(*batch_limits(max_batch, max_response_bytes))
+    assessments, round_trips, start = {}, 0, 0
+    while start < len(addresses):
+        chunk = addresses[start:start + size]
+        round_trips += 1
+        responses = yield _call_requests(contract, chunk)
+        if _is_rejected(responses) and size > 1:
+            size = max(1, len(chunk) // 2)
+            logger.warning(f"Batch of {len(chunk)} reads rejected ({responses}); retrying with {size}")
+            continue
+        if isinstance(responses, Exception):
+            # Even a single call fails: the node is unreachable, so give up on the rest
+            logger.error(f"Error getting blockchain assessments: {responses}")
+            assessments.update({address: None for address in addresses[start:]})
+            break
+        if _is_rejected(responses):
+            responses = [responses]
+        assessments.update(_decode_responses(codec, chunk, responses))
+        start += len(chunk)
+    logger.debug(f"Read {len(addresses)} assessments in {round_trips} round trips")
+    return assessments
+
+
+def read_assessments(w3, contract, addresses, max_batch=None, max_response_bytes=None):
+    """
+    getFraudAssessment for every address as {address: assessment dict or None},
+    in as few JSON-RPC round trips as the batch limits allow.
+    """
+    reads = _batched_reads(w3.codec, contract, addresses, max_batch, max_response_bytes)
+    try:
+        requests = next(reads)
+        while True:
+            try:
+                responses = w3.provider.make_batch_request(requests)
+            except Exception as e:
+                responses = e
+            requests = reads.send(responses)
+    except StopIteration as done:
+        return done.value
+
+
+async def read_assessments_async(w3, contract, addresses, max_batch=None, max_response_bytes=None):
+    """read_assessments for an AsyncWeb3 client"""
+    reads = _batched_reads(w3.codec, contract, addresses, max_batch, max_response_bytes)
+    try:
+        requests = next(reads)
+        while True:
+            try:
+                responses = await w3.provider.make_batch_request(requests)
+            except Exception as e:
+                responses = e
+            requests = reads.send(responses)
+    except StopIteration as done:
+        return done.value
@@ -0,0 +1,300 @@
+"""
+Offline bulk scoring for the Fraud Detection model
+@description: Scores an address list or a full feature CSV in chunks across a
+process pool and writes the results to CSV or Parquet, without the API
+
+Usage:
+    python bulk_score.py --input addresses.txt --output scores.csv
+    python bulk_score.py --input features.csv --output scores.parquet --workers 8
+
+Input modes (--mode, detected from the file by default):
+    addresses   one address per line (or NDJSON), or a CSV with an address
+                column; rows are looked up in the feature store like the API
+    features    a CSV with the model's feature columns, scored as-is
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from address_stream import iter_address_lines, iter_chunks
+from feature_store import select_feature_columns
+from serving_state import default_model_paths, first_existing_path, load_dataset, score_with_model
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+default_data_path = os.path.join(base_dir, "data", "cleaned_data.csv")
+default_feature_store_dir = os.getenv("FEATURE_STORE_DIR", os.path.join(base_dir, "data", "feature_store"))
+
+ADDRESS_COLUMNS = ("full_address", "address")
+MODES = ("auto", "addresses", "features")
+
+# Per-process scoring context (model, plus the dataset index in address mode).
+# Set in the parent before the pool forks, so workers inherit it copy-on-write.
+_context = {}
+
+
+def build_scoring_context(model, mode, data_path=default_data_path,
+                          feature_store_dir=default_feature_store_dir):
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1  # Parallelism comes from the process pool
+    context = {"model": model}
+    if mode == "addresses":
+        store, _ = load_dataset(data_path, feature_store_dir)
+        context["index"] = store.index
+        context["features"] = store.features
+    return context
+
+
+def _init_worker(model_path, mode, data_path, feature_store_dir):
+    # Only loads when the pool could not fork (the context is inherited otherwise)
+    if not _context:
+        _context.update(build_scoring_context(joblib.load(model_path), mode, data_path, feature_store_dir))
+
+
+def _model_input(model, features):
+    """Name the columns when the model was fitted on a DataFrame, as sklearn expects"""
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None and len(names) == features.shape[1]:
+        return pd.DataFrame(features, columns=names, copy=False)
+    return features
+
+
+def score_addresses(addresses, context=None):
+    """Score a chunk of addresses found in the dataset; unknown ones get an error"""
+    context = context or _context
+    rows = context["index"].get_many(addresses)
+    found = rows >= 0
+
+    predictions = np.full(len(addresses), -1, dtype=np.int64)
+    probabilities = np.full(len(addresses), np.nan)
+    if found.any():
+        found_predictions, found_probabilities = score_with_model(
+            context["model"], _model_input(context["model"], context["features"][rows[found]]))
+        predictions[found] = found_predictions
+        if found_probabilities is not None:
+            probabilities[found] = found_probabilities
+
+    return pd.DataFrame({
+        "address": addresses,
+        "prediction": pd.Series(predictions, dtype="Int64").mask(~found),
+        "probability": probabilities,
+        "error": pd.Series(np.where(found, None, "Address not found"), dtype="string"),
+    })
+
+
+def score_feature_rows(ids, features, context=None):
+    """Score a chunk of feature rows; ids label the output rows"""
+    context = context or _context
+    predictions, probabilities = score_with_model(context["model"], _model_input(context["model"], features))
+    return pd.DataFrame({
+        "address": ids,
+        "prediction": predictions.astype(np.int64),
+        "probability": probabilities if probabilities is not None else np.nan,
+    })
+
+
+def _score_task(task):
+    kind, ids, features = task
+    if kind == "addresses":
+        return score_addresses(ids)
+    return score_feature_rows(ids, features)
+
+
+def detect_mode(input_path, feature_columns):
+    """Features if the CSV has every feature column, otherwise addresses"""
+    if not input_path.lower().endswith(".csv"):
+        return "addresses"
+    header = pd.read_csv(input_path, nrows=0).columns
+    return "features" if set(feature_columns) <= set(header) else "addresses"
+
+
+def _address_column(columns):
+    for name in ADDRESS_COLUMNS:
+        if name in columns:
+            return name
+    return None
+
+
+def iter_address_tasks(input_path, chunk_size):
+    if input_path.lower().endswith(".csv"):
+        column = _address_column(pd.read_csv(input_path, nrows=0).columns)
+        if column is None:
+            raise ValueError(f"{input_path} has no address column (expected one of {', '.join(ADDRESS_COLUMNS)})")
+        for chunk in pd.read_csv(input_path, usecols=[column], dtype=str, chunksize=chunk_size):
+            yield "addresses", chunk[column].fillna("").tolist(), None
+        return
+
+    with open(input_path, "rb") as handle:
+        lines = (address for address, error in iter_address_lines(handle) if error is None)
+        for chunk in iter_chunks(lines, chunk_size):
+            yield "addresses", chunk, None
+
+
+def iter_feature_tasks(input_path, feature_columns, chunk_size):
+    header = pd.read_csv(input_path, nrows=0).columns
+    id_column = _address_column(header)
+    usecols = list(feature_columns) + ([id_column] if id_column else [])
+
+    first_row = 0
+    for chunk in pd.read_csv(input_path, usecols=usecols, chunksize=chunk_size):
+        ids = chunk[id_column].tolist() if id_column else list(range(first_row, first_row + len(chunk)))
+        features = np.ascontiguousarray(chunk[list(feature_columns)].to_numpy(dtype=np.float64))
+        first_row += len(chunk)
+        yield "features", ids, features
+
+
+class CsvResultWriter:
+    def __init__(self, path):
+        self.handle = open(path, "w", newline="")
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(self.handle, index=False, header=self.header)
+        self.header = False
+
+    def close(self):
+        self.handle.close()
+
+
+class ParquetResultWriter:
+    """Appends each chunk as a row group (needs pyarrow)"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Writing Parquet needs pyarrow: pip install pyarrow") from None
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.writer = None
+
+    def write(self, frame):
+        table = self.pa.Table.from_pandas(frame, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_result_writer(path, output_format=None):
+    output_format = output_format or ("parquet" if path.lower().endswith(".parquet") else "csv")
+    if output_format == "parquet":
+        return ParquetResultWriter(path)
+    return CsvResultWriter(path)
+
+
+def _scored_chunks(tasks, workers, initargs):
+    """Yield result frames in input order, with at most 2 chunks per worker in flight"""
+    if workers <= 1:
+        for task in tasks:
+            yield _score_task(task)
+        return
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=initargs) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_score_task, task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def bulk_score(input_path, output_path, model_path=None, mode="auto", workers=None,
+               chunk_size=50000, output_format=None, data_path=default_data_path,
+               feature_store_dir=default_feature_store_dir, progress_interval=5.0):
+    """Score input_path into output_path and return a summary dict"""
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}', expected one of {', '.join(MODES)}")
+    model_path = model_path or first_existing_path(default_model_paths(base_dir))
+    if not model_path:
+        raise FileNotFoundError("Model artifact not found. Pass --model or set MODEL_PATH")
+    workers = workers or os.cpu_count() or 1
+
+    model = joblib.load(model_path)
+    feature_columns = getattr(model, "feature_names_in_", None)
+    if feature_columns is None:
+        feature_columns = select_feature_columns(pd.read_csv(data_path, nrows=100))
+    feature_columns = list(feature_columns)
+    if mode == "auto":
+        mode = detect_mode(input_path, feature_columns)
+
+    initargs = (model_path, mode, data_path, feature_store_dir)
+    _context.clear()
+    _context.update(build_scoring_context(model, mode, data_path, feature_store_dir))
+
+    if mode == "addresses":
+        tasks = iter_address_tasks(input_path, chunk_size)
+    else:
+        tasks = iter_feature_tasks(input_path, feature_columns, chunk_size)
+
+    print(f"Scoring {input_path} ({mode}) with {workers} worker(s), {chunk_size} rows per chunk")
+    rows = not_found = 0
+    start = last_report = time.perf_counter()
+    writer = open_result_writer(output_path, output_format)
+    try:
+        for frame in _scored_chunks(tasks, workers, initargs):
+            writer.write(frame)
+            rows += len(frame)
+            if "error" in frame:
+                not_found += int(frame["error"].notna().sum())
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                print(f"  {rows:,} rows scored ({rows / (now - start):,.0f} rows/s)", flush=True)
+                last_report = now
+    finally:
+        writer.close()
+        _context.clear()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "mode": mode,
+        "rows": rows,
+        "not_found": not_found,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+    }
+    print(f"Scored {rows:,} rows in {elapsed:.1f}s ({summary['rows_per_second']:,.0f} rows/s), "
+          f"{not_found:,} addresses not found. Results written to {output_path}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score an address list or feature CSV offline')
+    parser.add_argument('--input', required=True, help='Address list (.txt/.csv) or feature CSV')
+    parser.add_argument('--output', required=True, help='Result file (.csv or .parquet)')
+    parser.add_argument('--model', help='Model file (default: same as the API)')
+    parser.add_argument('--mode', choices=MODES, default='auto')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Scoring processes (default: one per CPU)')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='Rows per chunk')
+    parser.add_argument('--format', choices=['csv', 'parquet'], help='Output format (default: from extension)')
+    parser.add_argument('--data', default=default_data_path, help='Dataset CSV for address lookups')
+    parser.add_argument('--feature-store', default=default_feature_store_dir,
+                        help='Feature store directory for address lookups')
+    args = parser.parse_args(argv)
+
+    bulk_score(args.input, args.output, model_path=args.model, mode=args.mode, workers=args.workers,
+               chunk_size=args.chunk_size, output_format=args.format, data_path=args.data,
+               feature_store_dir=args.feature_store)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import os
 
@@ -7,6 +8,24 @@ input_path = r"C:\Users\zainy\Desktop\Ethereum-Fraud-Detection-System\data\trans
 
 output_path = r"C:\Users\zainy\Desktop\Ethereum-Fraud-Detection-System\data\cleaned_data.csv"
 
+DROP_COLUMNS = ['Unnamed: 0', 'Index']
+
+# Renames applied after lower-casing and replacing spaces with underscores
+COLUMN_RENAMES = {
+    'address': 'full_address',
+    'flag': 'is_fraud',
+    'total_erc20_tnxs': 'total_erc20_transactions'
+}
+
+# Streaming schema (cleaned names): everything not listed here is a float32 feature
+TEXT_COLUMNS = ['full_address']
+CATEGORY_COLUMNS = ['_erc20_most_sent_token_type', '_erc20_most_rec_token_type']
+LABEL_COLUMN = 'is_fraud'
+
+def standardize_column_name(name):
+    name = name.lower().replace(' ', '_')
+    return COLUMN_RENAMES.get(name, name)
+
 def clean_data(input_path, output_path):
     """
     Cleans the transaction dataset by handling missing values and standardizing columns.
@@ -21,18 +40,14 @@ def clean_data(input_path, output_path):
     print("Initial data shape:", df.shape)
 
     # Step 1: Drop unnecessary columns
-    df = df.drop(columns=['Unnamed: 0', 'Index'], errors='ignore')
+    df = df.drop(columns=DROP_COLUMNS, errors='ignore')
     print("Shape after dropping unnecessary columns:", df.shape)
 
     # Step 2: Standardize column names
     df.columns = df.columns.str.lower().str.replace(' ', '_', regex=False)
     
     # Rename columns for clarity
-    df = df.rename(columns={
-        'address': 'full_address',
-        'flag': 'is_fraud',
-        'total_erc20_tnxs': 'total_erc20_transactions'
-    }, errors='ignore')
+    df = df.rename(columns=COLUMN_RENAMES, errors='ignore')
     
     print("Standardized column names.")
     
@@ -49,5 +64,126 @@ def clean_data(input_path, output_path):
     df.to_csv(output_path, index=False)
     print(f"\nSuccessfully saved cleaned data to {output_path}")
 
+def streaming_schema(raw_columns):
+    """
+    (columns to read, read dtypes, raw -> cleaned names) for a CSV header.
+    The label is read as float32 so missing values parse, then stored as int8.
+    """
+    usecols, dtypes, names = [], {}, {}
+    for raw in raw_columns:
+        if raw in DROP_COLUMNS:
+            continue
+        name = standardize_column_name(raw)
+        usecols.append(raw)
+        names[raw] = name
+        if name in TEXT_COLUMNS:
+            dtypes[raw] = 'str'
+        elif name in CATEGORY_COLUMNS:
+            dtypes[raw] = 'category'
+        else:
+            dtypes[raw] = 'float32'
+    return usecols, dtypes, names
+
+def clean_chunk(chunk, names):
+    """The fill rules of clean_data applied to one chunk read with streaming_schema"""
+    chunk = chunk.rename(columns=names)
+    for column in chunk.columns:
+        if column in TEXT_COLUMNS:
+            chunk[column] = chunk[column].fillna('Unknown')
+        elif column in CATEGORY_COLUMNS:
+            if 'Unknown' not in chunk[column].cat.categories:
+                chunk[column] = chunk[column].cat.add_categories(['Unknown'])
+            chunk[column] = chunk[column].fillna('Unknown')
+        elif column == LABEL_COLUMN:
+            chunk[column] = chunk[column].fillna(0).astype('int8')
+        else:
+            chunk[column] = chunk[column].fillna(0)
+    return chunk
+
+class ParquetChunkWriter:
+    """Appends chunks as row groups with one fixed schema (needs pyarrow)"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Writing Parquet needs pyarrow: pip install pyarrow") from None
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.schema = None
+        self.writer = None
+
+    def _schema(self, chunk):
+        pa = self.pa
+        fields = []
+        for column, dtype in chunk.dtypes.items():
+            if column in CATEGORY_COLUMNS:
+                # Each chunk has its own categories; a fixed index width keeps row groups compatible
+                fields.append(pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+            elif column in TEXT_COLUMNS:
+                fields.append(pa.field(column, pa.string()))
+            else:
+                fields.append(pa.field(column, pa.from_numpy_dtype(dtype)))
+        return pa.schema(fields)
+
+    def write(self, chunk):
+        if self.writer is None:
+            self.schema = self._schema(chunk)
+            self.writer = self.pq.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(self.pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def clean_data_streaming(input_path, output_path, parquet_path=None, chunk_size=100000):
+    """
+    clean_data for inputs too large for memory: reads chunk_size rows at a
+    time with an explicit schema (float32 features, int8 label, categorical
+    token names) and appends each cleaned chunk to output_path and, if given,
+    to a Parquet file. Returns the number of rows written.
+    """
+    print(f"Streaming data from {input_path} in chunks of {chunk_size:,} rows...")
+    try:
+        header = pd.read_csv(input_path, nrows=0).columns
+    except FileNotFoundError:
+        print(f"Error: The file '{input_path}' was not found.")
+        return 0
+    usecols, dtypes, names = streaming_schema(header)
+
+    rows = 0
+    parquet = ParquetChunkWriter(parquet_path) if parquet_path else None
+    try:
+        for i, chunk in enumerate(pd.read_csv(input_path, usecols=usecols, dtype=dtypes, chunksize=chunk_size)):
+            chunk = clean_chunk(chunk[usecols], names)
+            chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+            if parquet:
+                parquet.write(chunk)
+            rows += len(chunk)
+            print(f"  {rows:,} rows cleaned", flush=True)
+    finally:
+        if parquet:
+            parquet.close()
+
+    print(f"\nSuccessfully saved {rows:,} cleaned rows to {output_path}" +
+          (f" and {parquet_path}" if parquet_path else ""))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Clean the transaction dataset')
+    parser.add_argument('--input', default=input_path, help='Raw transaction_dataset.csv')
+    parser.add_argument('--output', default=output_path, help='Cleaned CSV')
+    parser.add_argument('--chunk-size', type=int,
+                        help='Stream the input in chunks of this many rows (memory stays flat for any input size)')
+    parser.add_argument('--parquet', help='With --chunk-size, also write the cleaned data to this Parquet file')
+    args = parser.parse_args(argv)
+
+    if args.chunk_size:
+        clean_data_streaming(args.input, args.output, parquet_path=args.parquet, chunk_size=args.chunk_size)
+    else:
+        clean_data(args.input, args.output)
+
 if __name__ == '__main__':
-    clean_data(input_path, output_path)
+    main()
@@ -0,0 +1,320 @@
+"""
+Local index of the contract's assessment events
+@description: Scans FraudAssessmentUpdated and ReputationUpdated logs with
+eth_getLogs in adaptive block ranges (halved when the node says a range is
+too large, grown again after successful scans), decodes them and stores them
+in SQLite with a checkpoint, so queries such as "all high-risk wallets" or
+"changes since block N" are answered locally instead of one read per address
+
+Usage:
+    python event_indexer.py --rpc-url http://localhost:8545 --contract 0x5FbDB2315678afecb367f032d93F642f64180aa3
+    python event_indexer.py --contract 0x... --no-sync --high-risk 7000
+    python event_indexer.py --contract 0x... --since 1200
+
+Each scan commits its events together with the next block to scan, so an
+interrupted sync resumes where it stopped without duplicating events.
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from web3 import Web3
+
+from web3_client import get_client
+
+logger = logging.getLogger(__name__)
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+default_index_path = os.path.join(base_dir, "data", "event_index.sqlite")
+
+ASSESSMENT_EVENT = "FraudAssessmentUpdated(address,bool,bool,uint256,uint256,uint256,uint256,uint256)"
+REPUTATION_EVENT = "ReputationUpdated(address,uint256,uint256,string)"
+ASSESSMENT_TOPIC = Web3.keccak(text=ASSESSMENT_EVENT)
+REPUTATION_TOPIC = Web3.keccak(text=REPUTATION_EVENT)
+ASSESSMENT_DATA_TYPES = ("bool", "bool", "uint256", "uint256", "uint256", "uint256", "uint256")
+REPUTATION_DATA_TYPES = ("uint256", "uint256", "string")
+
+# Event argument names, in the order of the assessment columns below
+ASSESSMENT_ARGS = ("walletAddress", "hasMLPrediction", "mlIsFraudulent", "mlConfidence", "timestamp",
+                   "reputationScore", "reportCount", "overallRisk")
+
+# JSON-RPC error code and messages providers return when an eth_getLogs
+# range has too many results or blocks
+OVERSIZE_CODE = -32005
+OVERSIZE_HINTS = (
+    "query returned more than",     # geth, Infura: "query returned more than 10000 results"
+    "log response size exceeded",   # Alchemy
+    "response size exceeded",
+    "block range is too wide",      # Ankr
+    "block range limit exceeded",
+    "exceed maximum block range",   # BSC and other geth forks
+    "eth_getlogs is limited to",    # QuickNode: "eth_getLogs is limited to a 10,000 range"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessment_events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    wallet TEXT NOT NULL,
+    has_ml_prediction INTEGER NOT NULL,
+    ml_is_fraudulent INTEGER NOT NULL,
+    ml_confidence INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    reputation_score INTEGER NOT NULL,
+    report_count INTEGER NOT NULL,
+    overall_risk INTEGER NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS assessment_events_wallet ON assessment_events (wallet, block_number);
+CREATE TABLE IF NOT EXISTS reputation_events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    wallet TEXT NOT NULL,
+    old_score INTEGER NOT NULL,
+    new_score INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS reputation_events_wallet ON reputation_events (wallet, block_number);
+CREATE TABLE IF NOT EXISTS wallets (
+    wallet TEXT PRIMARY KEY,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    has_ml_prediction INTEGER NOT NULL,
+    ml_is_fraudulent INTEGER NOT NULL,
+    ml_confidence INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    reputation_score INTEGER NOT NULL,
+    report_count INTEGER NOT NULL,
+    overall_risk INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS wallets_risk ON wallets (overall_risk);
+CREATE INDEX IF NOT EXISTS wallets_block ON wallets (block_number);
+CREATE TABLE IF NOT EXISTS checkpoint (contract TEXT PRIMARY KEY, next_block INTEGER NOT NULL);
+"""
+
+ASSESSMENT_COLUMNS = ("wallet", "has_ml_prediction", "ml_is_fraudulent", "ml_confidence", "timestamp",
+                      "reputation_score", "report_count", "overall_risk")
+
+# The latest event per wallet wins; rescanning an older log leaves the row alone
+UPSERT_WALLET = f"""
+INSERT INTO wallets (block_number, log_index, {", ".join(ASSESSMENT_COLUMNS)})
+VALUES ({", ".join("?" * (len(ASSESSMENT_COLUMNS) + 2))})
+ON CONFLICT (wallet) DO UPDATE SET
+    {", ".join(f"{column} = excluded.{column}" for column in ("block_number", "log_index") + ASSESSMENT_COLUMNS[1:])}
+WHERE (excluded.block_number, excluded.log_index) > (wallets.block_number, wallets.log_index)
+"""
+
+
+def is_oversize_error(error):
+    response = getattr(error, "rpc_response", None)
+    if isinstance(response, dict) and (response.get("error") or {}).get("code") == OVERSIZE_CODE:
+        return True
+    message = str(error).lower()
+    # web3 puts the JSON-RPC error object, {'code': ..., 'message': ...}, in the message
+    return f"'code': {OVERSIZE_CODE}" in message or any(hint in message for hint in OVERSIZE_HINTS)
+
+
+def _hex(value):
+    return value if isinstance(value, str) else "0x" + bytes(value).hex()
+
+
+def _topic_wallet(topic):
+    return "0x" + Web3.to_bytes(hexstr=_hex(topic))[-20:].hex()
+
+
+class EventIndex:
+    """SQLite copy of one contract's assessment and reputation events"""
+
+    def __init__(self, w3, contract_address, path=default_index_path, start_block=0, max_range=None,
+                 confirmations=None):
+        self.w3 = w3
+        self.contract_address = Web3.to_checksum_address(contract_address)
+        self.path = path
+        self.start_block = start_block
+        self.max_range = max_range or int(os.getenv("EVENT_INDEX_MAX_RANGE", "10000"))
+        self.confirmations = confirmations if confirmations is not None else int(os.getenv("EVENT_INDEX_CONFIRMATIONS", "0"))
+        self.block_range = self.max_range
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM wallets").fetchone()[0]
+
+    @property
+    def next_block(self):
+        row = self._conn.execute("SELECT next_block FROM checkpoint WHERE contract = ?",
+                                 (self.contract_address.lower(),)).fetchone()
+        return row[0] if row else self.start_block
+
+    # --- Scanning ---------------------------------------------------------
+
+    def _get_logs(self, from_block, to_block):
+        return self.w3.eth.get_logs({
+            "address": self.contract_address,
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [[_hex(ASSESSMENT_TOPIC), _hex(REPUTATION_TOPIC)]],
+        })
+
+    def sync(self, to_block=None):
+        """
+        Index every event up to to_block (default: the head minus confirmations).
+        Returns the number of events stored.
+        """
+        if to_block is None:
+            to_block = self.w3.eth.block_number - self.confirmations
+        start, stored, started = self.next_block, 0, time.perf_counter()
+        while start <= to_block:
+            end = min(to_block, start + self.block_range - 1)
+            try:
+                logs = self._get_logs(start, end)
+            except Exception as e:
+                if end == start or not is_oversize_error(e):
+                    raise
+                self.block_range = max(1, (end - start + 1) // 2)
+                logger.info(f"Blocks {start}-{end} too large for one eth_getLogs; trying {self.block_range}")
+                continue
+            stored += self._store(logs, end + 1)
+            start = end + 1
+            # Grow back after a success so one busy stretch doesn't slow the rest of the scan
+            self.block_range = min(self.max_range, self.block_range * 2)
+        logger.info(f"Indexed {stored} events up to block {to_block} in {time.perf_counter() - started:.2f}s")
+        return stored
+
+    def _store(self, logs, next_block):
+        """Write decoded logs and the new checkpoint in one transaction"""
+        assessments, reputations = [], []
+        for log in logs:
+            topics = log["topics"]
+            position = (int(log["blockNumber"]), int(log["logIndex"]), _hex(log["transactionHash"]))
+            wallet = _topic_wallet(topics[1])
+            data = Web3.to_bytes(hexstr=_hex(log["data"]))
+            if _hex(topics[0]) == _hex(ASSESSMENT_TOPIC):
+                values = self.w3.codec.decode(ASSESSMENT_DATA_TYPES, data)
+                assessments.append(position + (wallet,) + tuple(int(value) for value in values))
+            elif _hex(topics[0]) == _hex(REPUTATION_TOPIC):
+                old_score, new_score, reason = self.w3.codec.decode(REPUTATION_DATA_TYPES, data)
+                reputations.append(position + (wallet, old_score, new_score, reason))
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO assessment_events (block_number, log_index, tx_hash, "
+                f"{', '.join(ASSESSMENT_COLUMNS)}) VALUES ({', '.join('?' * (len(ASSESSMENT_COLUMNS) + 3))})",
+                assessments)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO reputation_events (block_number, log_index, tx_hash, wallet, "
+                "old_score, new_score, reason) VALUES (?, ?, ?, ?, ?, ?, ?)", reputations)
+            self._conn.executemany(UPSERT_WALLET, (row[:2] + row[3:] for row in assessments))
+            self._conn.execute(
+                "INSERT INTO checkpoint (contract, next_block) VALUES (?, ?) "
+                "ON CONFLICT (contract) DO UPDATE SET next_block = excluded.next_block",
+                (self.contract_address.lower(), next_block))
+        return len(assessments) + len(reputations)
+
+    # --- Queries ----------------------------------------------------------
+
+    @staticmethod
+    def _assessment(row):
+        assessment = dict(zip(ASSESSMENT_ARGS, (row[column] for column in ASSESSMENT_COLUMNS)))
+        for key in ("hasMLPrediction", "mlIsFraudulent"):
+            assessment[key] = bool(assessment[key])
+        assessment["blockNumber"] = row["block_number"]
+        return assessment
+
+    def latest(self, wallet):
+        """The last indexed assessment for a wallet, or None"""
+        row = self._conn.execute("SELECT * FROM wallets WHERE wallet = ?", (wallet.lower(),)).fetchone()
+        return self._assessment(row) if row else None
+
+    def latest_assessments(self):
+        """The last indexed assessment of every wallet"""
+        return [self._assessment(row) for row in self._conn.execute("SELECT * FROM wallets")]
+
+    def high_risk_wallets(self, min_risk=7000, limit=None):
+        """Wallets whose latest overall risk is at least min_risk, riskiest first"""
+        rows = self._conn.execute(
+            "SELECT * FROM wallets WHERE overall_risk >= ? ORDER BY overall_risk DESC, wallet LIMIT ?",
+            (min_risk, -1 if limit is None else limit))
+        return [self._assessment(row) for row in rows]
+
+    def changes_since(self, block_number):
+        """Assessment events from block_number on, in chain order"""
+        rows = self._conn.execute(
+            "SELECT * FROM assessment_events WHERE block_number >= ? ORDER BY block_number, log_index",
+            (block_number,))
+        return [self._assessment(row) for row in rows]
+
+    def history(self, wallet):
+        """Every indexed assessment event for a wallet, oldest first"""
+        rows = self._conn.execute(
+            "SELECT * FROM assessment_events WHERE wallet = ? ORDER BY block_number, log_index",
+            (wallet.lower(),))
+        return [self._assessment(row) for row in rows]
+
+    def reputation_changes(self, wallet):
+        """ReputationUpdated events for a wallet as (block, old score, new score, reason), oldest first"""
+        rows = self._conn.execute(
+            "SELECT block_number, old_score, new_score, reason FROM reputation_events "
+            "WHERE wallet = ? ORDER BY block_number, log_index", (wallet.lower(),))
+        return [tuple(row) for row in rows]
+
+
+def _print_assessments(assessments):
+    for a in assessments:
+        label = "FRAUDULENT" if a["mlIsFraudulent"] else "LEGITIMATE" if a["hasMLPrediction"] else "NO PREDICTION"
+        print(f"{a['walletAddress']}  block {a['blockNumber']:>9}  risk {a['overallRisk']:>5}  "
+              f"{label} ({a['mlConfidence']}%)  reports {a['reportCount']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Index FraudAssessmentUpdated and ReputationUpdated events in SQLite')
+    parser.add_argument('--rpc-url', default=os.getenv('RPC_URL', 'http://localhost:8545'))
+    parser.add_argument('--contract', default=os.getenv('CONTRACT_ADDRESS'), help='Contract address')
+    parser.add_argument('--db', default=default_index_path, help='SQLite index file')
+    parser.add_argument('--from-block', type=int, default=0, help='First block to scan on a new index')
+    parser.add_argument('--no-sync', action='store_true', help='Only query the existing index')
+    parser.add_argument('--high-risk', type=int, metavar='RISK', help='List wallets with at least this overall risk')
+    parser.add_argument('--since', type=int, metavar='BLOCK', help='List assessment changes from this block on')
+    args = parser.parse_args(argv)
+    if not args.contract:
+        parser.error('--contract or CONTRACT_ADDRESS is required')
+
+    logging.basicConfig(level=logging.INFO)
+    # RPC_URL may list several endpoints; the shared client fails over between them
+    w3 = get_client(args.rpc_url).w3
+    with EventIndex(w3, args.contract, args.db, start_block=args.from_block) as index:
+        if not args.no_sync:
+            index.sync()
+        print(f"{len(index):,} wallets indexed; next block {index.next_block}")
+        if args.high_risk is not None:
+            started = time.perf_counter()
+            wallets = index.high_risk_wallets(args.high_risk)
+            _print_assessments(wallets)
+            print(f"{len(wallets):,} wallets with risk >= {args.high_risk} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+        if args.since is not None:
+            started = time.perf_counter()
+            changes = index.changes_since(args.since)
+            _print_assessments(changes)
+            print(f"{len(changes):,} changes since block {args.since} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
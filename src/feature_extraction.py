@@ -0,0 +1,536 @@
+"""
+Streaming feature extraction from raw Ethereum transactions
+@description: Computes the per-address columns of cleaned_data.csv from raw
+normal and ERC20 transaction records (Etherscan field names, CSV or JSONL,
+any order) in one pass, with a fixed amount of state per address. Runs on
+several cores by splitting the input into byte ranges and merging partial
+aggregates per address shard.
+
+Usage:
+    python feature_extraction.py --normal txs.csv --erc20 token_txs.jsonl --output features.csv --workers 8
+
+Record fields used:
+    normal   from, to, value (wei), timeStamp (unix seconds), contractAddress,
+             input, isError
+    erc20    from, to, value, tokenDecimal, tokenName, timeStamp, contractAddress
+"""
+
+import argparse
+import csv
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from sketches import DistinctCounter, HeavyHitters
+
+WEI_PER_ETHER = 10 ** 18
+RECORD_KINDS = ("normal", "erc20")
+
+# Output schema: the cleaned_data.csv columns after full_address, minus the is_fraud label
+FEATURE_COLUMNS = [
+    "avg_min_between_sent_tnx",
+    "avg_min_between_received_tnx",
+    "time_diff_between_first_and_last_(mins)",
+    "sent_tnx",
+    "received_tnx",
+    "number_of_created_contracts",
+    "unique_received_from_addresses",
+    "unique_sent_to_addresses",
+    "min_value_received",
+    "max_value_received_",
+    "avg_val_received",
+    "min_val_sent",
+    "max_val_sent",
+    "avg_val_sent",
+    "min_value_sent_to_contract",
+    "max_val_sent_to_contract",
+    "avg_value_sent_to_contract",
+    "total_transactions_(including_tnx_to_create_contract",
+    "total_ether_sent",
+    "total_ether_received",
+    "total_ether_sent_contracts",
+    "total_ether_balance",
+    "_total_erc20_tnxs",
+    "_erc20_total_ether_received",
+    "_erc20_total_ether_sent",
+    "_erc20_total_ether_sent_contract",
+    "_erc20_uniq_sent_addr",
+    "_erc20_uniq_rec_addr",
+    "_erc20_uniq_sent_addr.1",
+    "_erc20_uniq_rec_contract_addr",
+    "_erc20_avg_time_between_sent_tnx",
+    "_erc20_avg_time_between_rec_tnx",
+    "_erc20_avg_time_between_rec_2_tnx",
+    "_erc20_avg_time_between_contract_tnx",
+    "_erc20_min_val_rec",
+    "_erc20_max_val_rec",
+    "_erc20_avg_val_rec",
+    "_erc20_min_val_sent",
+    "_erc20_max_val_sent",
+    "_erc20_avg_val_sent",
+    "_erc20_min_val_sent_contract",
+    "_erc20_max_val_sent_contract",
+    "_erc20_avg_val_sent_contract",
+    "_erc20_uniq_sent_token_name",
+    "_erc20_uniq_rec_token_name",
+    "_erc20_most_sent_token_type",
+    "_erc20_most_rec_token_type",
+]
+OUTPUT_COLUMNS = ["full_address"] + FEATURE_COLUMNS
+
+
+class ValueStats:
+    """Count, sum, min and max of a stream of values"""
+
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.count:
+            self.count += other.count
+            self.total += other.total
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class TimeSpan:
+    """
+    First and last timestamp of a series of events. The mean gap between
+    consecutive events is (last - first) / (count - 1) whatever order the
+    events arrive in, so unsorted input needs no buffering.
+    """
+
+    __slots__ = ("count", "first", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.first = None
+        self.last = None
+
+    def add(self, timestamp):
+        self.count += 1
+        if self.first is None or timestamp < self.first:
+            self.first = timestamp
+        if self.last is None or timestamp > self.last:
+            self.last = timestamp
+
+    def merge(self, other):
+        if other.count:
+            self.count += other.count
+            self.first = other.first if self.first is None else min(self.first, other.first)
+            self.last = other.last if self.last is None else max(self.last, other.last)
+        return self
+
+    @property
+    def minutes(self):
+        return (self.last - self.first) / 60.0 if self.count else 0.0
+
+    @property
+    def mean_gap_minutes(self):
+        return self.minutes / (self.count - 1) if self.count > 1 else 0.0
+
+
+def _distinct(counter):
+    return len(counter) if counter is not None else 0
+
+
+class AddressAggregates:
+    """All running state for one address; every field has a fixed maximum size"""
+
+    __slots__ = (
+        "sent", "received", "sent_to_contract", "sent_times", "received_times", "all_times",
+        "created_contracts", "sent_to", "received_from",
+        "erc20_sent", "erc20_received", "erc20_sent_contract",
+        "erc20_sent_to", "erc20_received_from", "erc20_received_tokens",
+        "erc20_sent_names", "erc20_received_names", "erc20_sent_types", "erc20_received_types",
+    )
+
+    # Distinct counters and token summaries are created on first use
+    _LAZY = ("sent_to", "received_from", "erc20_sent_to", "erc20_received_from", "erc20_received_tokens",
+             "erc20_sent_names", "erc20_received_names", "erc20_sent_types", "erc20_received_types")
+
+    def __init__(self):
+        self.sent = ValueStats()
+        self.received = ValueStats()
+        self.sent_to_contract = ValueStats()
+        self.sent_times = TimeSpan()
+        self.received_times = TimeSpan()
+        self.all_times = TimeSpan()
+        self.created_contracts = 0
+        self.erc20_sent = ValueStats()
+        self.erc20_received = ValueStats()
+        self.erc20_sent_contract = ValueStats()
+        for name in self._LAZY:
+            setattr(self, name, None)
+
+    def __setstate__(self, state):
+        # Skip fields saved by older versions that no longer exist (the ERC20 time spans)
+        for name, value in state[1].items():
+            if name in self.__slots__:
+                setattr(self, name, value)
+
+    def _counter(self, name):
+        counter = getattr(self, name)
+        if counter is None:
+            counter = HeavyHitters() if name.endswith("_types") else DistinctCounter()
+            setattr(self, name, counter)
+        return counter
+
+    def merge(self, other):
+        for name in self.__slots__:
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if name == "created_contracts":
+                self.created_contracts += theirs
+            elif theirs is None:
+                continue
+            elif mine is None:
+                setattr(self, name, theirs)
+            else:
+                mine.merge(theirs)
+        return self
+
+    def to_row(self):
+        has_erc20 = self.erc20_sent.count or self.erc20_received.count
+        missing_token = "Unknown" if has_erc20 else "0"
+
+        def most_common(name):
+            summary = getattr(self, name)
+            value = summary.most_common() if summary is not None else None
+            return missing_token if value is None else value
+
+        return [
+            self.sent_times.mean_gap_minutes,
+            self.received_times.mean_gap_minutes,
+            self.all_times.minutes,
+            self.sent.count,
+            self.received.count,
+            self.created_contracts,
+            _distinct(self.received_from),
+            _distinct(self.sent_to),
+            self.received.min or 0.0,
+            self.received.max or 0.0,
+            self.received.mean,
+            self.sent.min or 0.0,
+            self.sent.max or 0.0,
+            self.sent.mean,
+            self.sent_to_contract.min or 0.0,
+            self.sent_to_contract.max or 0.0,
+            self.sent_to_contract.mean,
+            self.sent.count + self.received.count + self.created_contracts,
+            self.sent.total,
+            self.received.total,
+            self.sent_to_contract.total,
+            self.received.total - self.sent.total,
+            self.erc20_sent.count + self.erc20_received.count,
+            self.erc20_received.total,
+            self.erc20_sent.total,
+            self.erc20_sent_contract.total,
+            _distinct(self.erc20_sent_to),
+            _distinct(self.erc20_received_from),
+            0,  # "ERC20 uniq sent addr.1": undocumented duplicate column in the source dataset
+            _distinct(self.erc20_received_tokens),
+            # The four "ERC20 avg time between ..." columns are 0 for every
+            # address in the training data, so they are written as 0 here too:
+            # real values would be inputs the model never saw
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            self.erc20_received.min or 0.0,
+            self.erc20_received.max or 0.0,
+            self.erc20_received.mean,
+            self.erc20_sent.min or 0.0,
+            self.erc20_sent.max or 0.0,
+            self.erc20_sent.mean,
+            self.erc20_sent_contract.min or 0.0,
+            self.erc20_sent_contract.max or 0.0,
+            self.erc20_sent_contract.mean,
+            _distinct(self.erc20_sent_names),
+            _distinct(self.erc20_received_names),
+            most_common("erc20_sent_types"),
+            most_common("erc20_received_types"),
+        ]
+
+
+def _address(value):
+    return (value or "").strip().lower()
+
+
+class FeatureExtractor:
+    """Folds transaction records into per-address aggregates"""
+
+    def __init__(self):
+        self.addresses = {}
+
+    def _get(self, address):
+        aggregates = self.addresses.get(address)
+        if aggregates is None:
+            aggregates = self.addresses[address] = AddressAggregates()
+        return aggregates
+
+    def add(self, kind, record):
+        if kind == "normal":
+            self.add_normal(record)
+        else:
+            self.add_erc20(record)
+
+    def add_normal(self, record):
+        if str(record.get("isError", "0")).strip() == "1":
+            return  # Failed transactions move no ether
+        sender = _address(record.get("from"))
+        receiver = _address(record.get("to"))
+        timestamp = int(record["timeStamp"])
+        value = float(record.get("value") or 0) / WEI_PER_ETHER
+
+        if sender:
+            source = self._get(sender)
+            source.all_times.add(timestamp)
+            if not receiver:
+                if _address(record.get("contractAddress")):
+                    source.created_contracts += 1
+                return
+            source.sent.add(value)
+            source.sent_times.add(timestamp)
+            source._counter("sent_to").add(receiver)
+            # Calls with input data go to contracts (plain transfers carry none)
+            if (record.get("input") or "0x") != "0x":
+                source.sent_to_contract.add(value)
+
+        if receiver:
+            target = self._get(receiver)
+            target.received.add(value)
+            target.received_times.add(timestamp)
+            target.all_times.add(timestamp)
+            if sender:
+                target._counter("received_from").add(sender)
+
+    def add_erc20(self, record):
+        sender = _address(record.get("from"))
+        receiver = _address(record.get("to"))
+        token = _address(record.get("contractAddress"))
+        name = (record.get("tokenName") or "").strip()
+        decimals = int(record.get("tokenDecimal") or 0)
+        value = float(record.get("value") or 0) / 10 ** decimals
+
+        if sender:
+            source = self._get(sender)
+            if receiver and receiver == token:
+                source.erc20_sent_contract.add(value)
+            source.erc20_sent.add(value)
+            if receiver:
+                source._counter("erc20_sent_to").add(receiver)
+            source._counter("erc20_sent_names").add(name)
+            source._counter("erc20_sent_types").add(name)
+
+        if receiver:
+            target = self._get(receiver)
+            target.erc20_received.add(value)
+            if sender:
+                target._counter("erc20_received_from").add(sender)
+            if token:
+                target._counter("erc20_received_tokens").add(token)
+            target._counter("erc20_received_names").add(name)
+            target._counter("erc20_received_types").add(name)
+
+    def merge(self, other):
+        for address, aggregates in other.addresses.items():
+            mine = self.addresses.get(address)
+            if mine is None:
+                self.addresses[address] = aggregates
+            else:
+                mine.merge(aggregates)
+        return self
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def to_dataframe(self):
+        """One row per address, sorted by address, in the cleaned_data.csv column order"""
+        addresses = sorted(self.addresses)
+        rows = [[address] + self.addresses[address].to_row() for address in addresses]
+        return pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+
+
+def _is_jsonl(path):
+    return path.lower().endswith((".jsonl", ".ndjson", ".json"))
+
+
+def _iter_lines(handle, start, end):
+    """Decoded lines that start inside [start, end) of an open binary file"""
+    if start > handle.tell():
+        handle.seek(start - 1)
+        handle.readline()  # Finish the line that straddles the boundary
+    while end is None or handle.tell() < end:
+        line = handle.readline()
+        if not line:
+            return
+        yield line.decode("utf-8")
+
+
+def iter_records(path, start=0, end=None):
+    """
+    Yield records from a CSV or JSONL file, optionally only the lines that
+    start inside the byte range [start, end). Ranges split on line boundaries,
+    so CSV fields must not contain newlines (true for Etherscan exports).
+    """
+    with open(path, "rb") as handle:
+        if _is_jsonl(path):
+            for line in _iter_lines(handle, start, end):
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        header = next(csv.reader([handle.readline().decode("utf-8")]))
+        for row in csv.reader(_iter_lines(handle, start, end)):
+            if row:
+                yield dict(zip(header, row))
+
+
+def split_byte_ranges(path, n_parts):
+    """Split a file into about n_parts byte ranges (iter_records aligns them to lines)"""
+    size = os.path.getsize(path)
+    n_parts = max(1, min(n_parts, size // (1 << 20) or 1))
+    step = size // n_parts
+    bounds = [i * step for i in range(n_parts)] + [size]
+    return [(bounds[i], bounds[i + 1]) for i in range(n_parts)]
+
+
+def address_shard(address, n_shards):
+    return zlib.crc32(address.encode("utf-8")) % n_shards
+
+
+def _extract_range(task):
+    """Map step: aggregate one byte range, then split the result by address shard"""
+    kind, path, start, end, n_shards, out_dir, task_id = task
+    extractor = FeatureExtractor()
+    records = 0
+    for record in iter_records(path, start, end):
+        extractor.add(kind, record)
+        records += 1
+
+    shards = [dict() for _ in range(n_shards)]
+    for address, aggregates in extractor.addresses.items():
+        shards[address_shard(address, n_shards)][address] = aggregates
+
+    paths = []
+    for shard, addresses in enumerate(shards):
+        part_path = os.path.join(out_dir, f"part_{task_id}_{shard}.pkl")
+        with open(part_path, "wb") as handle:
+            pickle.dump(addresses, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        paths.append(part_path)
+    return records, paths
+
+
+def _merge_shard(part_paths):
+    """Reduce step: merge one shard's partial aggregates into feature rows"""
+    extractor = FeatureExtractor()
+    for part_path in part_paths:
+        with open(part_path, "rb") as handle:
+            partial = FeatureExtractor()
+            partial.addresses = pickle.load(handle)
+        extractor.merge(partial)
+        os.remove(part_path)
+    return extractor.to_dataframe()
+
+
+def extract_features(inputs, workers=1, progress_interval=5.0):
+    """
+    Compute features for every address in the inputs.
+
+    inputs is a list of (kind, path) pairs with kind "normal" or "erc20".
+    Returns a DataFrame in the cleaned_data.csv column order (without is_fraud).
+    """
+    for kind, _ in inputs:
+        if kind not in RECORD_KINDS:
+            raise ValueError(f"Unknown record kind '{kind}', expected 'normal' or 'erc20'")
+
+    start = time.perf_counter()
+    if workers <= 1:
+        extractor = FeatureExtractor()
+        records = 0
+        last_report = start
+        for kind, path in inputs:
+            for record in iter_records(path):
+                extractor.add(kind, record)
+                records += 1
+                if records % 100000 == 0 and time.perf_counter() - last_report >= progress_interval:
+                    last_report = time.perf_counter()
+                    print(f"  {records:,} records, {len(extractor):,} addresses "
+                          f"({records / (last_report - start):,.0f} records/s)", flush=True)
+        result = extractor.to_dataframe()
+    else:
+        out_dir = tempfile.mkdtemp(prefix="feature_extraction_")
+        try:
+            tasks = [
+                (kind, path, range_start, range_end, workers, out_dir, f"{i}_{j}")
+                for i, (kind, path) in enumerate(inputs)
+                for j, (range_start, range_end) in enumerate(split_byte_ranges(path, workers))
+            ]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                records = 0
+                shard_parts = [[] for _ in range(workers)]
+                for done, (task_records, paths) in enumerate(pool.map(_extract_range, tasks), 1):
+                    records += task_records
+                    for shard, part_path in enumerate(paths):
+                        shard_parts[shard].append(part_path)
+                    print(f"  {done}/{len(tasks)} input ranges, {records:,} records "
+                          f"({records / (time.perf_counter() - start):,.0f} records/s)", flush=True)
+                frames = list(pool.map(_merge_shard, shard_parts))
+            # Empty shards would turn the string columns into object dtype
+            frames = [frame for frame in frames if len(frame)] or frames[:1]
+            result = pd.concat(frames, ignore_index=True).sort_values("full_address", ignore_index=True)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"Extracted features for {len(result):,} addresses from {records:,} records in {elapsed:.1f}s")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compute fraud model features from raw transactions')
+    parser.add_argument('--normal', nargs='*', default=[], help='Normal transaction files (CSV or JSONL)')
+    parser.add_argument('--erc20', nargs='*', default=[], help='ERC20 token transfer files (CSV or JSONL)')
+    parser.add_argument('--output', required=True, help='Output CSV')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes to use (default: one per CPU)')
+    args = parser.parse_args(argv)
+
+    inputs = [("normal", path) for path in args.normal] + [("erc20", path) for path in args.erc20]
+    if not inputs:
+        parser.error("give at least one --normal or --erc20 file")
+
+    features = extract_features(inputs, workers=args.workers)
+    features.to_csv(args.output, index=False)
+    print(f"Saved {len(features):,} rows to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Feature vector input validation for the Fraud Detection API
+@description: Turns JSON lists or packed float32 bytes into a checked
+(n_rows, n_features) matrix in a few whole-array operations, so scoring
+precomputed vectors does not pay for per-field Python checks
+"""
+
+import base64
+import binascii
+
+import numpy as np
+
+
+def validate_feature_matrix(matrix, n_features, max_rows=None):
+    """Check the shape and that every value is finite; returns the matrix"""
+    if matrix.ndim != 2 or matrix.shape[1] != n_features:
+        raise ValueError(f"Expected {n_features} feature values per row, got shape {list(matrix.shape)}")
+    if matrix.shape[0] == 0:
+        raise ValueError("No feature rows given")
+    if max_rows is not None and matrix.shape[0] > max_rows:
+        raise ValueError(f"Too many rows: {matrix.shape[0]} (limit {max_rows})")
+
+    finite = np.isfinite(matrix).all(axis=1)
+    if not finite.all():
+        bad_rows = np.flatnonzero(~finite)
+        shown = ", ".join(str(row) for row in bad_rows[:10])
+        more = f" and {len(bad_rows) - 10} more" if len(bad_rows) > 10 else ""
+        raise ValueError(f"Non-finite feature values in rows {shown}{more}")
+    return matrix
+
+
+def parse_feature_values(values, n_features, max_rows=None):
+    """
+    Convert a JSON feature vector or list of vectors into a float64 matrix.
+
+    Returns (matrix, single): single is True when one flat vector was given.
+    """
+    if isinstance(values, (str, bytes, dict)) or values is None:
+        raise ValueError("'features' must be a list of numbers or a list of rows")
+    try:
+        # One conversion for the whole payload; ragged rows fail here
+        matrix = np.array(values)
+    except (TypeError, ValueError):
+        raise ValueError("'features' must contain only numbers, with the same length in every row") from None
+    # Any string (even "1.5") or null makes the array text or object, so it is
+    # rejected rather than converted; booleans mixed with numbers count as 0/1
+    if matrix.dtype.kind not in "iuf":
+        raise ValueError("'features' must contain only numbers, with the same length in every row")
+    matrix = matrix.astype(np.float64, copy=False)
+
+    single = matrix.ndim == 1
+    if single:
+        matrix = matrix.reshape(1, -1)
+    return validate_feature_matrix(matrix, n_features, max_rows), single
+
+
+def decode_float32(buffer, n_features, max_rows=None):
+    """Read rows of little-endian float32 values from raw bytes"""
+    row_bytes = 4 * n_features
+    if len(buffer) == 0 or len(buffer) % row_bytes:
+        raise ValueError(f"Binary body must be a multiple of {row_bytes} bytes "
+                         f"({n_features} float32 values per row), got {len(buffer)}")
+    matrix = np.frombuffer(buffer, dtype='<f4').reshape(-1, n_features)
+    return validate_feature_matrix(matrix, n_features, max_rows)
+
+
+def decode_base64_float32(text, n_features, max_rows=None):
+    try:
+        buffer = base64.b64decode(text, validate=True)
+    except (binascii.Error, TypeError, ValueError):
+        raise ValueError("'features_b64' is not valid base64") from None
+    return decode_float32(buffer, n_features, max_rows)
@@ -0,0 +1,236 @@
+"""
+Incremental per-address feature state
+@description: Persists the running aggregates from feature_extraction.py in
+SQLite so new transactions update an address's features in O(1) instead of
+recomputing its whole history, and tracks which addresses changed so only
+those are rescored
+
+Usage:
+    python feature_state.py --state data/feature_state.sqlite --normal new_txs.csv --erc20 new_token_txs.jsonl \
+        --api-url http://localhost:5000 --output rescored.csv
+
+Each transaction must be applied once; the store does not deduplicate.
+"""
+
+import argparse
+import os
+import pickle
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+import requests
+
+from feature_extraction import OUTPUT_COLUMNS, RECORD_KINDS, FeatureExtractor, iter_records
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+default_state_path = os.path.join(base_dir, "data", "feature_state.sqlite")
+
+LOAD_BATCH = 500    # addresses per SELECT (stays under SQLite's bound-parameter limit)
+APPLY_BATCH = 1000  # records whose addresses are loaded together
+MAX_WORKING = 100000  # addresses held in memory before apply() writes them back
+
+
+def _touched_addresses(record):
+    return {address for address in ((record.get("from") or "").strip().lower(),
+                                    (record.get("to") or "").strip().lower()) if address}
+
+
+class FeatureStateStore:
+    """SQLite table of per-address aggregates with an in-memory working set"""
+
+    def __init__(self, path=default_state_path, max_working=MAX_WORKING):
+        self.path = path
+        self.max_working = max_working
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS address_state (address TEXT PRIMARY KEY, state BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        # Addresses touched since the last flush, held as a FeatureExtractor so
+        # updates use exactly the same aggregation code as a full extraction
+        self._working = FeatureExtractor()
+        self._loaded = set()
+        self._dirty = set()
+        self._changed = set()
+        self._unstored = set()  # Loaded addresses that have no row yet
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load(self, addresses):
+        """Pull stored aggregates for addresses not yet in the working set"""
+        missing = [address for address in addresses if address not in self._loaded]
+        for i in range(0, len(missing), LOAD_BATCH):
+            batch = missing[i:i + LOAD_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT address, state FROM address_state WHERE address IN ({placeholders})", batch
+            )
+            for address, state in rows:
+                self._working.addresses[address] = pickle.loads(state)
+        self._unstored.update(address for address in missing if address not in self._working.addresses)
+        self._loaded.update(missing)
+
+    def apply(self, kind, records):
+        """Fold new transaction records into the stored aggregates; returns the record count.
+
+        The working set is flushed whenever it holds more than max_working
+        addresses, so memory stays bounded however many addresses the
+        records touch.
+        """
+        if kind not in RECORD_KINDS:
+            raise ValueError(f"Unknown record kind '{kind}', expected 'normal' or 'erc20'")
+        count = 0
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == APPLY_BATCH:
+                count += self._apply_batch(kind, batch)
+                batch = []
+        if batch:
+            count += self._apply_batch(kind, batch)
+        return count
+
+    def _apply_batch(self, kind, records):
+        touched = set()
+        for record in records:
+            touched |= _touched_addresses(record)
+        self._load(list(touched))
+        for record in records:
+            self._working.add(kind, record)
+        self._dirty |= touched
+        self._changed |= touched
+        if len(self._working.addresses) > self.max_working:
+            self.flush()
+        return len(records)
+
+    def apply_file(self, kind, path):
+        return self.apply(kind, iter_records(path))
+
+    def flush(self):
+        """Write changed aggregates back and empty the working set"""
+        if self._dirty:
+            addresses = self._working.addresses
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO address_state (address, state) VALUES (?, ?)",
+                ((address, pickle.dumps(addresses[address], protocol=pickle.HIGHEST_PROTOCOL))
+                 for address in self._dirty if address in addresses),
+            )
+            self._conn.commit()
+        self._working = FeatureExtractor()
+        self._loaded = set()
+        self._dirty = set()
+        self._unstored = set()
+
+    def drain_changed(self):
+        """Addresses updated since the last call, sorted; clears the set"""
+        changed = sorted(self._changed)
+        self._changed = set()
+        return changed
+
+    def get(self, address):
+        """Current aggregates for an address, or None if it has no transactions"""
+        address = address.lower()
+        self._load([address])
+        return self._working.addresses.get(address)
+
+    def feature_frame(self, addresses):
+        """Feature rows (cleaned_data.csv columns) for addresses that have state"""
+        addresses = [address.lower() for address in addresses]
+        self._load(addresses)
+        known = self._working.addresses
+        rows = [[address] + known[address].to_row() for address in addresses if address in known]
+        return pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+
+    def __len__(self):
+        """Number of addresses with state, counting ones not flushed yet"""
+        stored = self._conn.execute("SELECT COUNT(*) FROM address_state").fetchone()[0]
+        return stored + len(self._dirty & self._unstored)
+
+
+def rescore(store, addresses, score_fn, feature_columns):
+    """
+    Score the current features of addresses with score_fn, which takes an
+    (N, F) matrix in feature_columns order and returns (predictions,
+    probabilities), like ServingState.score_live or api_score_fn.
+    """
+    frame = store.feature_frame(addresses)
+    result = pd.DataFrame({"address": frame["full_address"]})
+    if frame.empty:
+        return result.assign(prediction=pd.Series(dtype="int64"), probability=pd.Series(dtype="float64"))
+
+    features = np.ascontiguousarray(frame[list(feature_columns)].to_numpy(dtype=np.float64))
+    predictions, probabilities = score_fn(features)
+    result["prediction"] = np.asarray(predictions).astype(np.int64)
+    result["probability"] = probabilities if probabilities is not None else np.nan
+    return result
+
+
+def api_feature_columns(api_url, session=None):
+    """Feature order the running API scores with"""
+    session = session or requests.Session()
+    response = session.get(f"{api_url}/model_info", timeout=10)
+    response.raise_for_status()
+    return response.json()["feature_names"]
+
+
+def api_score_fn(api_url, session=None, batch_size=5000):
+    """A score_fn that sends packed float32 rows to the API's /predict_features"""
+    session = session or requests.Session()
+
+    def score(features):
+        predictions, probabilities = [], []
+        for start in range(0, len(features), batch_size):
+            body = np.ascontiguousarray(features[start:start + batch_size], dtype='<f4').tobytes()
+            response = session.post(f"{api_url}/predict_features", data=body,
+                                    headers={"Content-Type": "application/octet-stream"}, timeout=60)
+            response.raise_for_status()
+            result = response.json()
+            predictions += result["predictions"]
+            probabilities += result["probabilities"] or [np.nan] * len(result["predictions"])
+        return np.array(predictions), np.array(probabilities, dtype=np.float64)
+
+    return score
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply new transactions to the feature state and rescore changed addresses')
+    parser.add_argument('--state', default=default_state_path, help='SQLite state file')
+    parser.add_argument('--normal', nargs='*', default=[], help='New normal transaction files (CSV or JSONL)')
+    parser.add_argument('--erc20', nargs='*', default=[], help='New ERC20 transfer files (CSV or JSONL)')
+    parser.add_argument('--api-url', help='Rescore changed addresses with this API (e.g. http://localhost:5000)')
+    parser.add_argument('--output', help='CSV for the rescored addresses (default: print a summary)')
+    args = parser.parse_args(argv)
+
+    with FeatureStateStore(args.state) as store:
+        records = 0
+        for kind, paths in (("normal", args.normal), ("erc20", args.erc20)):
+            for path in paths:
+                records += store.apply_file(kind, path)
+        store.flush()
+        changed = store.drain_changed()
+        print(f"Applied {records:,} records; {len(changed):,} addresses changed ({len(store):,} tracked)")
+
+        if args.api_url and changed:
+            session = requests.Session()
+            columns = api_feature_columns(args.api_url, session)
+            scores = rescore(store, changed, api_score_fn(args.api_url, session), columns)
+            if args.output:
+                scores.to_csv(args.output, index=False)
+                print(f"Saved {len(scores):,} scores to {args.output}")
+            else:
+                print(f"Rescored {len(scores):,} addresses, {int(scores['prediction'].sum()):,} flagged as fraud")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Columnar binary feature store for the Fraud Detection API
+@description: Converts cleaned_data.csv into raw .npy columns that the API
+memory-maps at startup instead of parsing the CSV
+
+Layout of a store directory:
+    features.npy      float64 (n_rows, n_features), C-contiguous
+    labels.npy        int64 is_fraud labels
+    addresses.npy     lowercase addresses as fixed-width bytes
+    index_keys.npy    sorted unique addresses (binary search keys)
+    index_rows.npy    first row position for each key
+    meta.json         feature columns, row count, source CSV fingerprint
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from address_index import AddressIndex, SortedAddressIndex, build_feature_matrix
+from prediction_table import file_fingerprint
+
+FORMAT_VERSION = 1
+
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+default_csv_path = os.path.join(base_dir, "data", "cleaned_data.csv")
+default_store_dir = os.path.join(base_dir, "data", "feature_store")
+
+
+def select_feature_columns(df):
+    """The numeric scoring columns, same selection as model_training.py"""
+    return df.drop(columns=['full_address', 'is_fraud']).select_dtypes(include='number').columns.tolist()
+
+
+class FeatureStore:
+    """Feature matrix, labels and address index for the scored dataset"""
+
+    def __init__(self, features, labels, addresses, feature_columns, index, fingerprint):
+        self.features = features
+        self.labels = labels
+        self.addresses = addresses
+        self.feature_columns = feature_columns
+        self.index = index
+        # SHA-256 of the source CSV, used to key the prediction table
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.features)
+
+    def address_at(self, row):
+        address = self.addresses[row]
+        return address.decode('ascii') if isinstance(address, bytes) else str(address)
+
+    @classmethod
+    def from_dataframe(cls, df, fingerprint=None):
+        feature_columns = select_feature_columns(df)
+        addresses = df['full_address'].str.lower().to_numpy(dtype=object)
+        return cls(
+            features=build_feature_matrix(df, feature_columns),
+            labels=df['is_fraud'].to_numpy(dtype=np.int64),
+            addresses=addresses,
+            feature_columns=feature_columns,
+            index=AddressIndex(addresses.tolist()),
+            fingerprint=fingerprint,
+        )
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        return cls.from_dataframe(pd.read_csv(csv_path), fingerprint=file_fingerprint(csv_path))
+
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {"source_size": stat.st_size, "source_mtime": stat.st_mtime}
+
+
+def build_feature_store(csv_path=default_csv_path, store_dir=default_store_dir):
+    """Convert the cleaned CSV into a memory-mappable store directory"""
+    print(f"Building feature store from {csv_path}...")
+    df = pd.read_csv(csv_path)
+    store = FeatureStore.from_dataframe(df, fingerprint=file_fingerprint(csv_path))
+    sorted_index = SortedAddressIndex.from_addresses(store.addresses)
+
+    # Write into a sibling temp dir and swap it in, so readers never see a partial store
+    tmp_dir = store_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    np.save(os.path.join(tmp_dir, "features.npy"), store.features)
+    np.save(os.path.join(tmp_dir, "labels.npy"), store.labels)
+    np.save(os.path.join(tmp_dir, "addresses.npy"), np.array([a.encode('ascii') for a in store.addresses]))
+    np.save(os.path.join(tmp_dir, "index_keys.npy"), sorted_index.keys)
+    np.save(os.path.join(tmp_dir, "index_rows.npy"), sorted_index.rows)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "n_rows": len(store),
+        "feature_columns": store.feature_columns,
+        "source_fingerprint": store.fingerprint,
+        **_source_stamp(csv_path),
+    }
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as handle:
+        json.dump(meta, handle, indent=2)
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(tmp_dir, store_dir)
+    print(f"Saved {len(store)} rows x {len(store.feature_columns)} features to {store_dir}")
+    return store_dir
+
+
+def load_feature_store(store_dir=default_store_dir, mmap=True):
+    """Open a store directory; arrays are memory-mapped read-only by default"""
+    with open(os.path.join(store_dir, "meta.json")) as handle:
+        meta = json.load(handle)
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported feature store version: {meta.get('format_version')}")
+
+    mmap_mode = 'r' if mmap else None
+
+    def load(name):
+        return np.load(os.path.join(store_dir, name), mmap_mode=mmap_mode)
+
+    features = load("features.npy")
+    if features.shape != (meta["n_rows"], len(meta["feature_columns"])):
+        raise ValueError(f"Feature store at {store_dir} does not match its metadata")
+
+    return FeatureStore(
+        features=features,
+        labels=load("labels.npy"),
+        addresses=load("addresses.npy"),
+        feature_columns=meta["feature_columns"],
+        index=SortedAddressIndex(load("index_keys.npy"), load("index_rows.npy"), size=meta["n_rows"]),
+        fingerprint=meta["source_fingerprint"],
+    )
+
+
+def is_store_current(store_dir, csv_path):
+    """True if the store exists and was built from the CSV as it is now"""
+    meta_path = os.path.join(store_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True  # Store shipped without its source CSV
+    with open(meta_path) as handle:
+        meta = json.load(handle)
+    stamp = _source_stamp(csv_path)
+    return (meta.get("source_size") == stamp["source_size"]
+            and meta.get("source_mtime") == stamp["source_mtime"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the binary feature store from cleaned_data.csv')
+    parser.add_argument('--csv', default=default_csv_path, help='Cleaned dataset CSV')
+    parser.add_argument('--out', default=default_store_dir, help='Output store directory')
+    args = parser.parse_args()
+    build_feature_store(args.csv, args.out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Compiled flat-array inference for tree ensembles
+@description: Packs a fitted RandomForestClassifier into contiguous numpy
+arrays and evaluates whole batches level by level, giving the same
+probabilities as predict_proba without sklearn's per-estimator overhead
+"""
+
+import numpy as np
+
+
+class CompiledForest:
+    """
+    A fitted forest packed into flat node arrays shared by all trees.
+
+    Node ids are global across trees. Children are interleaved as
+    (right, left) pairs so the next node is children[2 * node + go_left],
+    one gather per level for every (sample, tree) path still in flight.
+    """
+
+    def __init__(self, feature, threshold, children, is_leaf, missing_go_to_left,
+                 leaf_value, roots, max_depth, classes, n_features_in):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.is_leaf = is_leaf
+        self.missing_go_to_left = missing_go_to_left
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features_in
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_model(cls, model):
+        """Compile a fitted sklearn forest classifier"""
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators:
+            raise TypeError("Expected a fitted tree ensemble with estimators_")
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output classifiers can be compiled")
+
+        n_classes = len(model.classes_)
+        features, thresholds, children, leaves, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in estimators:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+            feature = np.where(is_leaf, 0, tree.feature)
+
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+            missing_left = getattr(tree, 'missing_go_to_left', None)
+            if missing_left is None:
+                missing_left = np.zeros(n_nodes, dtype=bool)
+
+            features.append(feature)
+            thresholds.append(tree.threshold)
+            children.append(np.stack([right, left], axis=1).ravel())
+            leaves.append(is_leaf)
+            missing.append(np.asarray(missing_left, dtype=bool))
+            values.append(value)
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            children=np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+            is_leaf=np.concatenate(leaves),
+            missing_go_to_left=np.concatenate(missing),
+            leaf_value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=np.asarray(model.classes_),
+            n_features_in=model.n_features_in_,
+        )
+
+    def apply(self, X, chunk_size=1024):
+        """Return the leaf node id reached in every tree, shape (n_samples, n_trees)"""
+        # sklearn evaluates trees on float32 inputs; match it so splits agree exactly
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError("Expected a 2D feature matrix")
+
+        n_samples, n_features = X.shape
+        if n_features != self.n_features_in_:
+            raise ValueError(
+                f"X has {n_features} features, but the forest is expecting "
+                f"{self.n_features_in_} features as input."
+            )
+        X_flat = X.ravel()
+        has_missing = bool(np.isnan(X).any())
+        leaves = np.empty((n_samples, self.n_trees), dtype=np.intp)
+
+        # Chunk the samples so the per-level working set stays cache sized
+        for start in range(0, n_samples, chunk_size):
+            stop = min(start + chunk_size, n_samples)
+            chunk_leaves = np.empty((stop - start) * self.n_trees, dtype=np.intp)
+
+            nodes = np.tile(self.roots, stop - start)
+            offsets = np.repeat(np.arange(start, stop, dtype=np.intp) * n_features, self.n_trees)
+            slots = np.arange(nodes.size)
+
+            for _ in range(self.max_depth + 1):
+                # Retire paths that reached a leaf so later levels only touch live ones
+                done = self.is_leaf[nodes]
+                if done.any():
+                    chunk_leaves[slots[done]] = nodes[done]
+                    live = ~done
+                    nodes, offsets, slots = nodes[live], offsets[live], slots[live]
+                    if nodes.size == 0:
+                        break
+
+                x = X_flat[offsets + self.feature[nodes]]
+                go_left = x <= self.threshold[nodes]
+                if has_missing:
+                    go_left |= np.isnan(x) & self.missing_go_to_left[nodes]
+                nodes = self.children[2 * nodes + go_left]
+
+            leaves[start:stop] = chunk_leaves.reshape(stop - start, self.n_trees)
+        return leaves
+
+    def predict_proba(self, X):
+        """Class probabilities averaged over trees, identical to the sklearn forest"""
+        nodes = self.apply(X)
+        proba = np.zeros((nodes.shape[0], self.leaf_value.shape[1]), dtype=np.float64)
+        # Accumulate tree by tree in estimator order, like sklearn does
+        for tree in range(self.n_trees):
+            proba += self.leaf_value[nodes[:, tree]]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
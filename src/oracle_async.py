@@ -0,0 +1,254 @@
+"""
+Asyncio Fraud Detection Oracle
+@description: Runs the oracle as concurrent stages joined by bounded queues:
+ML scoring of address chunks, sending of assessment transactions, and
+receipt confirmation. The next chunk is scored while earlier results are
+being written and mined, and a full queue pauses the stage that feeds it.
+Transactions go through the same FraudDetectionOracle write path as the
+threaded oracle (TransactionSubmitter nonces, gas prices and replacement,
+gas sizing, ORACLE_BATCH_WRITES); only scoring and mirror reads are async.
+
+Usage:
+    ORACLE_ASYNC=1 python oracle_service.py
+"""
+
+import asyncio
+import logging
+import os
+
+import aiohttp
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+
+from bulk_reads import ASSESSMENT_KEYS, read_assessments_async
+from oracle_service import CONTRACT_ABI, FraudDetectionOracle, assessment_fields, batch_prediction_results
+from web3_client import parse_rpc_urls
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()  # Queue sentinel: the stage before has finished
+
+
+class AsyncFraudDetectionOracle:
+    """
+    The same work as FraudDetectionOracle.process_addresses (score, skip
+    unchanged, write, confirm) as an asyncio pipeline:
+
+        chunks -> [ml_concurrency scorers] -> writes -> [writer] -> confirms -> [confirmer]
+
+    writes holds at most queue_size scored addresses and confirms at most
+    max_pending submitted transactions. The writer hands each transaction to
+    writer.submitter from a worker thread and the confirmer awaits its
+    receipt future, so sending behaves exactly as in the threaded oracle.
+    """
+
+    def __init__(self, api_url="http://localhost:5000", rpc_url=None, contract_address=None, private_key=None,
+                 batch_size=None, ml_concurrency=None, queue_size=None, max_pending=None, writer=None):
+        self.api_url = api_url
+        self.writer = writer or FraudDetectionOracle(api_url, rpc_url, contract_address, private_key, batch_size)
+        self.batch_size = batch_size or int(os.getenv("ML_BATCH_SIZE", "1000"))
+        self.ml_concurrency = ml_concurrency or int(os.getenv("ORACLE_ML_CONCURRENCY", "2"))
+        self.queue_size = queue_size or int(os.getenv("ORACLE_QUEUE_SIZE", "1000"))
+        self.max_pending = max_pending or int(os.getenv("ORACLE_MAX_PENDING_TXS", "64"))
+
+        # The skip-unchanged mirror is the writer's, so both oracles agree on what is on chain
+        self.mirror = self.writer.mirror
+        self.writes_avoided = 0
+
+        # Mirror reads use the first endpoint; writes fail over through the writer's web3_client
+        self.rpc_url = parse_rpc_urls(rpc_url or self.writer.rpc_url)[0]
+        contract_address = contract_address or self.writer.contract_address
+        self.contract_address = Web3.to_checksum_address(contract_address) if contract_address else None
+        self.w3 = AsyncWeb3(AsyncHTTPProvider(self.rpc_url))
+        self.contract = None
+        if self.contract_address:
+            self.contract = self.w3.eth.contract(address=self.contract_address, abi=CONTRACT_ABI)
+
+    @property
+    def can_write(self):
+        return bool(self.writer.contract_address and self.writer.private_key)
+
+    async def close(self):
+        await self.w3.provider.disconnect()
+        if self.writer._submitter is not None:
+            await asyncio.to_thread(self.writer.submitter.close)
+
+    # --- ML scoring -------------------------------------------------------
+
+    async def get_ml_predictions(self, session, addresses):
+        """One /batch_predict call; returns {address: result} like FraudDetectionOracle.get_ml_predictions"""
+        try:
+            async with session.post(f"{self.api_url}/batch_predict",
+                                    json={"addresses": [address.lower() for address in addresses]},
+                                    timeout=aiohttp.ClientTimeout(total=60)) as response:
+                if response.status != 200:
+                    message = await response.text()
+                    logger.error(f"Batch API error for {len(addresses)} addresses: {message}")
+                    return {address: {"status": "error", "message": message} for address in addresses}
+                payload = await response.json()
+        except Exception as e:
+            logger.error(f"Error getting batch predictions for {len(addresses)} addresses: {e}")
+            return {address: {"status": "error", "message": str(e)} for address in addresses}
+        return batch_prediction_results(addresses, payload["results"])
+
+    async def _score_stage(self, session, chunks, writes, results):
+        while True:
+            chunk = await chunks.get()
+            if chunk is _DONE:
+                return
+            ml_results = await self.get_ml_predictions(session, [address for _, address in chunk])
+            for index, address in chunk:
+                ml_result = ml_results[address]
+                if ml_result["status"] != "success":
+                    logger.error(f"Failed to get ML prediction for {address}: {ml_result.get('message', 'Unknown error')}")
+                    results[index] = {"address": address, "error": ml_result.get("message", "Unknown error")}
+                    continue
+                results[index] = {"address": address, "ml_prediction": ml_result["prediction"],
+                                  "ml_confidence": ml_result["probability"]}
+                await writes.put(results[index])  # Waits while the writer is behind
+
+    # --- Chain writes -----------------------------------------------------
+
+    async def get_blockchain_assessment(self, address):
+        try:
+            assessment = await self.contract.functions.getFraudAssessment(Web3.to_checksum_address(address)).call()
+        except Exception as e:
+            logger.error(f"Error getting blockchain assessment for {address}: {e}")
+            return None
+        return dict(zip(ASSESSMENT_KEYS, assessment))
+
+    async def get_blockchain_assessments(self, addresses):
+        return await read_assessments_async(self.w3, self.contract, addresses)
+
+    async def _skip_unchanged(self, group):
+        """The results in group that need a write; the others are marked unchanged"""
+        if self.mirror is None:
+            return group
+        missing = [result["address"] for result in group if result["address"] not in self.mirror]
+        if missing:
+            reads = await self.get_blockchain_assessments(missing)
+            self.mirror.warm_from_reads(missing, lambda _: reads)
+        to_write = []
+        for result in group:
+            _, is_fraudulent, confidence = assessment_fields(result["ml_prediction"], result["ml_confidence"])[:3]
+            if self.mirror.needs_write(result["address"], is_fraudulent, confidence):
+                to_write.append(result)
+            else:
+                result["blockchain_updated"] = False
+                result["unchanged"] = True
+        self.writes_avoided += len(group) - len(to_write)
+        return to_write
+
+    async def _submit(self, group):
+        """Send the writes for group; returns (results, receipt future or None) entries to confirm"""
+        if self.writer.batch_writes:
+            batches = await asyncio.to_thread(self.writer.pack_write_batches, group)
+            for batch in batches:
+                items = [(r["address"], r["ml_prediction"], r["ml_confidence"]) for r in batch]
+                yield batch, await asyncio.to_thread(self.writer.submit_blockchain_batch, items)
+            return
+        for result in group:
+            yield [result], await asyncio.to_thread(self.writer.submit_blockchain_prediction, result["address"],
+                                                    result["ml_prediction"], result["ml_confidence"])
+
+    async def _write_stage(self, writes, confirms):
+        finished = False
+        while not finished:
+            # Take whatever is queued (at least one item) so mirror reads and batches are grouped
+            group = [await writes.get()]
+            while len(group) < self.batch_size and not writes.empty():
+                group.append(writes.get_nowait())
+            finished = group[-1] is _DONE
+            group = [result for result in group if result is not _DONE]
+            if not group:
+                continue
+
+            if not self.can_write:
+                logger.warning("Blockchain update skipped - no contract address or private key")
+                for result in group:
+                    result["blockchain_updated"] = False
+                continue
+
+            # submitter.submit blocks its thread while max_pending transactions are unconfirmed
+            async for entry in self._submit(await self._skip_unchanged(group)):
+                await confirms.put(entry)
+        await confirms.put(_DONE)
+
+    # --- Confirmation -----------------------------------------------------
+
+    async def _confirm_stage(self, confirms):
+        while True:
+            entry = await confirms.get()
+            if entry is _DONE:
+                return
+            batch, future = entry
+            if future is not None:
+                await asyncio.wait([asyncio.wrap_future(future)])
+            # The future is done, so the writer's logging helpers do not block
+            if self.writer.batch_writes:
+                updated = self.writer._wait_for_batch(batch, future)
+            else:
+                result = batch[0]
+                updated = self.writer._wait_for_update(result["address"], result["ml_prediction"],
+                                                       result["ml_confidence"], future)
+            for result in batch:
+                result["blockchain_updated"] = updated
+                if self.mirror is not None:
+                    if updated:
+                        _, is_fraudulent, confidence = assessment_fields(result["ml_prediction"],
+                                                                         result["ml_confidence"])[:3]
+                        self.mirror.record(result["address"], is_fraudulent, confidence)
+                    else:
+                        self.mirror.forget(result["address"])
+
+    # --- Pipeline ---------------------------------------------------------
+
+    async def process_addresses(self, addresses):
+        """Score and write addresses; returns one result per address in input order"""
+        results = [None] * len(addresses)
+        chunks = asyncio.Queue(maxsize=self.ml_concurrency)
+        writes = asyncio.Queue(maxsize=self.queue_size)
+        confirms = asyncio.Queue(maxsize=self.max_pending)
+        avoided_before = self.writes_avoided
+
+        async def feed():
+            for start in range(0, len(addresses), self.batch_size):
+                end = min(start + self.batch_size, len(addresses))
+                await chunks.put([(index, addresses[index]) for index in range(start, end)])
+            for _ in range(self.ml_concurrency):
+                await chunks.put(_DONE)
+
+        async def score(session):
+            await asyncio.gather(*(self._score_stage(session, chunks, writes, results)
+                                   for _ in range(self.ml_concurrency)))
+            await writes.put(_DONE)
+
+        connector = aiohttp.TCPConnector(limit=self.ml_concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [asyncio.ensure_future(stage) for stage in (
+                feed(), score(session), self._write_stage(writes, confirms), self._confirm_stage(confirms)
+            )]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        written = sum(1 for result in results if result.get("blockchain_updated"))
+        logger.info(f"Cycle: {written} written, {self.writes_avoided - avoided_before} writes avoided "
+                    f"(unchanged on chain), {len(addresses)} addresses")
+        return results
+
+
+async def run_forever(oracle, addresses, interval=3600):
+    """The oracle service loop: rescore addresses every interval seconds"""
+    try:
+        while True:
+            print(f"Processing {len(addresses)} addresses...")
+            avoided_before = oracle.writes_avoided
+            for result in await oracle.process_addresses(addresses):
+                print(f"Result for {result['address']}: {result}")
+            print(f"Writes avoided this cycle (unchanged on chain): {oracle.writes_avoided - avoided_before}")
+            print(f"😴 Processing complete. Sleeping for {interval // 60} minutes...")
+            await asyncio.sleep(interval)
+    finally:
+        await oracle.close()
@@ -0,0 +1,305 @@
+"""
+Event-driven mode for the Fraud Detection Oracle
+@description: Feeds the oracle from a work queue of addresses with new
+activity (a tailed file, an in-process queue, or a scanner of new blocks on
+a node) instead of rescoring a fixed list every hour. Repeated addresses are
+collapsed within a time window before scoring, and throughput and freshness
+(activity seen -> assessment on chain) are tracked.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class QueueSource:
+    """Addresses pushed by other threads in the same process"""
+
+    def __init__(self, maxsize=0, clock=time.time):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._clock = clock
+
+    def put(self, address, seen_at=None):
+        self._queue.put((address, seen_at if seen_at is not None else self._clock()))
+
+    def poll(self, timeout=1.0):
+        """Wait up to timeout for work, then return everything queued as (address, seen_at)"""
+        try:
+            events = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+
+class FileTailSource:
+    """
+    Follows a file that other processes append addresses to, one per line:
+    a bare address or {"address": ..., "seen_at": unix_seconds}. Restarts from
+    the top if the file is truncated or replaced.
+    """
+
+    def __init__(self, path, from_start=False, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._handle = None
+        self._inode = None
+        self._partial = b""
+        self._from_start = from_start
+
+    def _open(self):
+        try:
+            handle = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        if not self._from_start and self._inode is None:
+            handle.seek(0, os.SEEK_END)
+        self._handle = handle
+        self._inode = os.fstat(handle.fileno()).st_ino
+        self._partial = b""
+        return True
+
+    def _rotated(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return stat.st_ino != self._inode or stat.st_size < self._handle.tell()
+
+    def _parse(self, line):
+        text = line.decode("utf-8", "replace").strip()
+        if not text:
+            return None
+        if text.startswith("{"):
+            try:
+                record = json.loads(text)
+                return record["address"], float(record.get("seen_at") or self._clock())
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Skipping unreadable work item: {text[:100]}")
+                return None
+        return text, self._clock()
+
+    def poll(self, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            if self._handle is None and not self._open():
+                events = []
+            else:
+                if self._rotated():
+                    self._handle.close()
+                    self._from_start = True  # A new file is read from its first line
+                    self._open()
+                data = self._partial + self._handle.read()
+                lines = data.split(b"\n")
+                self._partial = lines.pop()  # Keep a line that is still being written
+                events = [event for event in map(self._parse, lines) if event is not None]
+            if events or time.monotonic() >= deadline:
+                return events
+            time.sleep(min(0.1, max(0.0, deadline - time.monotonic())))
+
+
+class BlockScannerSource:
+    """
+    Polls a node for new blocks and emits the sender and recipient of every
+    transaction (or the created contract). seen_at is the block timestamp, so
+    freshness covers the time from the transaction being mined.
+    """
+
+    def __init__(self, w3, start_block=None, max_blocks_per_poll=100):
+        self.w3 = w3
+        self.next_block = start_block
+        self.max_blocks_per_poll = max_blocks_per_poll
+
+    def poll(self, timeout=1.0):
+        head = self.w3.eth.block_number
+        if self.next_block is None:
+            self.next_block = head + 1  # Only activity from now on
+        if self.next_block > head:
+            time.sleep(timeout)
+            return []
+
+        events = []
+        last = min(head, self.next_block + self.max_blocks_per_poll - 1)
+        for number in range(self.next_block, last + 1):
+            block = self.w3.eth.get_block(number, full_transactions=True)
+            for tx in block["transactions"]:
+                for address in (tx.get("from"), tx.get("to") or tx.get("creates")):
+                    if address:
+                        events.append((str(address), float(block["timestamp"])))
+        self.next_block = last + 1
+        return events
+
+
+class DedupWindow:
+    """
+    Collects addresses for window_seconds after the first one arrives, then
+    releases them once each. Repeats keep the earliest seen_at, so freshness
+    is measured from the first activity.
+    """
+
+    def __init__(self, window_seconds=5.0, max_batch=1000, clock=time.monotonic):
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._clock = clock
+        self._pending = {}
+        self._opened_at = None
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, address, seen_at):
+        key = address.lower()
+        if key in self._pending:
+            self.duplicates += 1
+            self._pending[key] = min(self._pending[key], seen_at)
+            return
+        if self._opened_at is None:
+            self._opened_at = self._clock()
+        self._pending[key] = seen_at
+
+    def ready(self):
+        if not self._pending:
+            return False
+        return (len(self._pending) >= self.max_batch
+                or self._clock() - self._opened_at >= self.window_seconds)
+
+    def seconds_until_ready(self):
+        if not self._pending:
+            return None
+        return max(0.0, self.window_seconds - (self._clock() - self._opened_at))
+
+    def take(self):
+        """Up to max_batch unique (address, first seen_at) pairs, oldest first"""
+        items = sorted(self._pending.items(), key=lambda item: item[1])[:self.max_batch]
+        for address, _ in items:
+            del self._pending[address]
+        self._opened_at = self._clock() if self._pending else None
+        return items
+
+
+class OracleMetrics:
+    """Counters plus recent freshness samples for the event-driven oracle"""
+
+    def __init__(self, max_samples=10000, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started_at = clock()
+        self.events = 0
+        self.batches = 0
+        self.processed = 0
+        self.written = 0
+        self.unchanged = 0
+        self.failed = 0
+        self._freshness = deque(maxlen=max_samples)
+
+    def record_batch(self, results, seen_at):
+        """results: process_addresses outputs; seen_at: address -> first seen time"""
+        now = self._clock()
+        with self._lock:
+            self.batches += 1
+            for result in results:
+                self.processed += 1
+                if result.get("blockchain_updated"):
+                    self.written += 1
+                    self._freshness.append(now - seen_at[result["address"].lower()])
+                elif result.get("unchanged"):
+                    self.unchanged += 1
+                elif "error" in result:
+                    self.failed += 1
+
+    def stats(self):
+        with self._lock:
+            elapsed = max(self._clock() - self.started_at, 1e-9)
+            samples = np.array(self._freshness) if self._freshness else None
+            return {
+                "events": self.events,
+                "batches": self.batches,
+                "processed": self.processed,
+                "written": self.written,
+                "unchanged": self.unchanged,
+                "failed": self.failed,
+                "addresses_per_second": self.processed / elapsed,
+                "freshness_p50_seconds": float(np.percentile(samples, 50)) if samples is not None else None,
+                "freshness_p95_seconds": float(np.percentile(samples, 95)) if samples is not None else None,
+                "freshness_max_seconds": float(samples.max()) if samples is not None else None,
+            }
+
+
+class EventDrivenOracle:
+    """Runs an oracle from a work source: poll -> dedupe window -> score and write"""
+
+    def __init__(self, oracle, source, window_seconds=5.0, max_batch=1000,
+                 report_interval=60.0, metrics=None, clock=time.monotonic,
+                 retry_delay=1.0, max_retry_delay=60.0):
+        self.oracle = oracle
+        self.source = source
+        self.window = DedupWindow(window_seconds, max_batch, clock=clock)
+        self.metrics = metrics or OracleMetrics()
+        self.report_interval = report_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._clock = clock
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def process_batch(self, items):
+        seen_at = dict(items)
+        results = self.oracle.process_addresses([address for address, _ in items])
+        self.metrics.record_batch(results, seen_at)
+        return results
+
+    def run_once(self, poll_timeout=1.0):
+        """One poll plus, if the window is due, one processed batch; returns its results"""
+        wait = self.window.seconds_until_ready()
+        timeout = poll_timeout if wait is None else min(poll_timeout, wait)
+        events = self.source.poll(timeout=timeout)
+        self.metrics.events += len(events)
+        for address, seen_at in events:
+            self.window.add(address, seen_at)
+        if self.window.ready():
+            items = self.window.take()
+            try:
+                return self.process_batch(items)
+            except Exception:
+                for address, seen_at in items:  # Put the batch back so the next attempt retries it
+                    self.window.add(address, seen_at)
+                raise
+        return []
+
+    def run(self):
+        logger.info("Event-driven oracle started")
+        last_report = self._clock()
+        delay = 0.0
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                delay = 0.0
+            except Exception as e:
+                # A node or API hiccup must not end the oracle: back off (doubling, capped) and retry
+                delay = min(self.max_retry_delay, max(self.retry_delay, delay * 2))
+                logger.error(f"Event-driven oracle iteration failed: {e}; retrying in {delay:.1f}s")
+                self._stop.wait(delay)
+            if self._clock() - last_report >= self.report_interval:
+                last_report = self._clock()
+                stats = self.metrics.stats()
+                logger.info(
+                    f"Oracle: {stats['processed']} processed, {stats['written']} written, "
+                    f"{stats['unchanged']} writes avoided, "
+                    f"{stats['failed']} failed, {stats['addresses_per_second']:.2f} addr/s, "
+                    f"freshness p50 {stats['freshness_p50_seconds']}s p95 {stats['freshness_p95_seconds']}s, "
+                    f"{self.window.duplicates} duplicates merged"
+                )
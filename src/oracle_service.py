@@ -1,66 +1,171 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import json
 import os
 from web3 import Web3
-from eth_account import Account
 import logging
+from assessment_mirror import AssessmentMirror
+from bulk_reads import read_assessments
+from tx_submitter import TransactionSubmitter
+from web3_client import get_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class FraudDetectionOracle:
-    def __init__(self, api_url="http://localhost:5000", rpc_url=None, contract_address=None, private_key=None):
-        self.api_url = api_url
-        self.rpc_url = rpc_url or "http://localhost:8545"
-        self.contract_address = contract_address
-        self.private_key = private_key
-        
-        # Initialize Web3
-        self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
-        
-        # Load contract ABI (simplified for this example)
-        self.contract_abi = [
+# Gas for a batch transaction on top of its per-assessment cost (base cost, calldata, loop)
+BATCH_BASE_GAS = 50000
+
+# Margin over the node's gas estimate for a batch transaction
+BATCH_GAS_HEADROOM = 1.2
+
+# Contract ABI (simplified to what the oracle calls)
+CONTRACT_ABI = [
+    {
+        "inputs": [
+            {"name": "walletAddress", "type": "address"},
+            {"name": "hasMLPrediction", "type": "bool"},
+            {"name": "mlIsFraudulent", "type": "bool"},
+            {"name": "mlConfidence", "type": "uint256"},
+            {"name": "reputationScore", "type": "uint256"},
+            {"name": "reportCount", "type": "uint256"},
+            {"name": "overallRisk", "type": "uint256"}
+        ],
+        "name": "updateFraudAssessment",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+    {
+        "inputs": [
+            {"name": "walletAddresses", "type": "address[]"},
             {
-                "inputs": [
-                    {"name": "walletAddress", "type": "address"},
+                "name": "assessments",
+                "type": "tuple[]",
+                "components": [
                     {"name": "hasMLPrediction", "type": "bool"},
                     {"name": "mlIsFraudulent", "type": "bool"},
                     {"name": "mlConfidence", "type": "uint256"},
                     {"name": "reputationScore", "type": "uint256"},
                     {"name": "reportCount", "type": "uint256"},
                     {"name": "overallRisk", "type": "uint256"}
-                ],
-                "name": "updateFraudAssessment",
-                "outputs": [],
-                "stateMutability": "nonpayable",
-                "type": "function"
-            },
-            {
-                "inputs": [{"name": "_wallet", "type": "address"}],
-                "name": "getFraudAssessment",
-                "outputs": [
-                    {"name": "hasMLPrediction", "type": "bool"},
-                    {"name": "mlIsFraudulent", "type": "bool"},
-                    {"name": "mlConfidence", "type": "uint256"},
-                    {"name": "mlTimestamp", "type": "uint256"},
-                    {"name": "reputationScore", "type": "int256"},
-                    {"name": "reportCount", "type": "uint256"},
-                    {"name": "overallRisk", "type": "uint256"}
-                ],
-                "stateMutability": "view",
-                "type": "function"
+                ]
+            }
+        ],
+        "name": "batchUpdateFraudAssessments",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "name": "walletAddress", "type": "address"},
+            {"indexed": False, "name": "hasMLPrediction", "type": "bool"},
+            {"indexed": False, "name": "mlIsFraudulent", "type": "bool"},
+            {"indexed": False, "name": "mlConfidence", "type": "uint256"},
+            {"indexed": False, "name": "timestamp", "type": "uint256"},
+            {"indexed": False, "name": "reputationScore", "type": "uint256"},
+            {"indexed": False, "name": "reportCount", "type": "uint256"},
+            {"indexed": False, "name": "overallRisk", "type": "uint256"}
+        ],
+        "name": "FraudAssessmentUpdated",
+        "type": "event"
+    },
+    {
+        "inputs": [{"name": "_wallet", "type": "address"}],
+        "name": "getFraudAssessment",
+        "outputs": [
+            {"name": "hasMLPrediction", "type": "bool"},
+            {"name": "mlIsFraudulent", "type": "bool"},
+            {"name": "mlConfidence", "type": "uint256"},
+            {"name": "mlTimestamp", "type": "uint256"},
+            {"name": "reputationScore", "type": "int256"},
+            {"name": "reportCount", "type": "uint256"},
+            {"name": "overallRisk", "type": "uint256"}
+        ],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+
+def assessment_fields(prediction, confidence):
+    """Assessment values stored for an ML prediction, in contract argument order"""
+    confidence_percentage = int(confidence * 100) if confidence else 50
+    
+    # Calculate reputation score and report count (default values for now)
+    reputation_score = 5000  # Default 50% reputation
+    report_count = 0  # No reports yet
+    overall_risk = int(confidence_percentage * 0.4)  # Simple risk calculation
+    
+    return (
+        True,  # hasMLPrediction
+        bool(prediction),  # mlIsFraudulent
+        confidence_percentage,  # mlConfidence
+        reputation_score,  # reputationScore
+        report_count,  # reportCount
+        overall_risk  # overallRisk
+    )
+
+def batch_prediction_results(addresses, items):
+    """Map /batch_predict results (one per address, in request order) to get_ml_prediction-style dicts"""
+    results = {}
+    for address, item in zip(addresses, items):
+        if item.get("prediction") is None:
+            results[address] = {"status": "error", "message": item.get("error", "No prediction")}
+        else:
+            results[address] = {
+                "prediction": item["prediction"],
+                "probability": item["probability"],
+                "status": "success"
             }
-        ]
+    return results
+
+class FraudDetectionOracle:
+    def __init__(self, api_url="http://localhost:5000", rpc_url=None, contract_address=None, private_key=None,
+                 batch_size=None):
+        self.api_url = api_url
+        self.rpc_url = rpc_url or "http://localhost:8545"
+        self.contract_address = contract_address
+        self.private_key = private_key
+        # Addresses per /batch_predict call in process_addresses
+        self.batch_size = batch_size or int(os.getenv("ML_BATCH_SIZE", "1000"))
+        
+        # Write assessments with batchUpdateFraudAssessments, as many per
+        # transaction as fit under the gas limit (and the block gas limit).
+        # gas_per_assessment only sizes batches: a first write of a wallet
+        # stores about 8 new slots, so 200000 is an upper bound. Each batch is
+        # sent with the node's gas estimate.
+        self.batch_writes = os.getenv("ORACLE_BATCH_WRITES", "0") == "1"
+        self.batch_gas_limit = int(os.getenv("ORACLE_BATCH_GAS_LIMIT", "10000000"))
+        self.gas_per_assessment = int(os.getenv("ORACLE_GAS_PER_ASSESSMENT", "200000"))
+        self._block_gas_limit = None
+        
+        # Skip writes that would store the same label and a confidence within
+        # the threshold (percentage points) of what is already on chain
+        self.mirror = None
+        if os.getenv("ORACLE_SKIP_UNCHANGED", "1") == "1":
+            self.mirror = AssessmentMirror(threshold=float(os.getenv("ORACLE_CONFIDENCE_THRESHOLD", "5")))
+        self.writes_avoided = 0
+        
+        # Keep-alive connections to the ML API, reused by every batch call
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        
+        # Initialize Web3 (shared pooled client; rpc_url may list several endpoints for failover)
+        self.client = get_client(self.rpc_url)
+        self.w3 = self.client.w3
+        self._submitter = None
+        
+        # Load contract ABI (simplified for this example)
+        self.contract_abi = CONTRACT_ABI
         
         if self.contract_address:
             # Ensure the contract address is checksummed
             self.contract_address = Web3.to_checksum_address(self.contract_address)
-            self.contract = self.w3.eth.contract(
-                address=self.contract_address,
-                abi=self.contract_abi
-            )
+            self.contract = self.client.contract(self.contract_address, self.contract_abi)
         
         self._test_api_connection()
    
@@ -100,54 +205,149 @@ class FraudDetectionOracle:
             logger.error(f"Error getting prediction for {address}: {e}")
             return {"status": "error", "message": str(e)}
    
-    def update_blockchain_prediction(self, address, prediction, confidence):
-        """Update prediction on the blockchain"""
+    def get_ml_predictions(self, addresses):
+        """Get predictions for many addresses with one /batch_predict call per chunk.
+
+        Returns {address: result} with the same result shape as get_ml_prediction.
+        """
+        results = {}
+        for start in range(0, len(addresses), self.batch_size):
+            chunk = addresses[start:start + self.batch_size]
+            try:
+                response = self.session.post(
+                    f"{self.api_url}/batch_predict",
+                    json={"addresses": [address.lower() for address in chunk]},
+                    timeout=60
+                )
+                if response.status_code != 200:
+                    logger.error(f"Batch API error for {len(chunk)} addresses: {response.text}")
+                    results.update({address: {"status": "error", "message": response.text} for address in chunk})
+                    continue
+                
+                results.update(batch_prediction_results(chunk, response.json()["results"]))
+            except Exception as e:
+                logger.error(f"Error getting batch predictions for {len(chunk)} addresses: {e}")
+                results.update({address: {"status": "error", "message": str(e)} for address in chunk})
+        return results
+   
+    @property
+    def submitter(self):
+        """Pipelined sender for assessment transactions (created on first write)"""
+        if self._submitter is None:
+            self._submitter = TransactionSubmitter(
+                self.w3,
+                self.private_key,
+                max_pending=int(os.getenv("ORACLE_MAX_PENDING_TXS", "64")),
+                replace_after=float(os.getenv("ORACLE_REPLACE_AFTER", "60"))
+            )
+        return self._submitter
+   
+    def _assessment_fields(self, prediction, confidence):
+        """Assessment values stored for an ML prediction, in contract argument order"""
+        return assessment_fields(prediction, confidence)
+   
+    def _assessment_call(self, address, prediction, confidence):
+        """Contract call that records an ML prediction for an address"""
+        # Ensure the address is checksummed before the contract call
+        checksum_address = Web3.to_checksum_address(address)
+        return self.contract.functions.updateFraudAssessment(
+            checksum_address, *self._assessment_fields(prediction, confidence)
+        )
+   
+    def write_gas_limit(self):
+        """Most gas one batch may use: batch_gas_limit, capped at the block gas limit"""
+        if self._block_gas_limit is None and self.contract_address:
+            try:
+                self._block_gas_limit = self.w3.eth.get_block("latest")["gasLimit"]
+            except Exception as e:
+                logger.warning(f"Could not read the block gas limit ({e}); using ORACLE_BATCH_GAS_LIMIT")
+        return min(self.batch_gas_limit, self._block_gas_limit or self.batch_gas_limit)
+   
+    def pack_write_batches(self, items):
+        """Split items into consecutive batches whose budgeted gas stays under write_gas_limit()"""
+        per_batch = max(1, (self.write_gas_limit() - BATCH_BASE_GAS) // self.gas_per_assessment)
+        return [items[start:start + per_batch] for start in range(0, len(items), per_batch)]
+   
+    def submit_blockchain_batch(self, batch):
+        """Send one batchUpdateFraudAssessments transaction for (address, prediction, confidence) items.
+
+        Returns a Future for the receipt, or None if the update was skipped or could not be sent.
+        """
         if not self.contract_address or not self.private_key:
             logger.warning("Blockchain update skipped - no contract address or private key")
-            return False
+            return None
         
         try:
-            account = Account.from_key(self.private_key)
-            confidence_percentage = int(confidence * 100) if confidence else 50
-            
-            # Ensure the address is checksummed before the contract call
-            checksum_address = Web3.to_checksum_address(address)
-            
-            # Calculate reputation score and report count (default values for now)
-            reputation_score = 5000  # Default 50% reputation
-            report_count = 0  # No reports yet
-            overall_risk = int(confidence_percentage * 0.4)  # Simple risk calculation
-            
-            transaction = self.contract.functions.updateFraudAssessment(
-                checksum_address,
-                True,  # hasMLPrediction
-                bool(prediction),  # mlIsFraudulent
-                confidence_percentage,  # mlConfidence
-                reputation_score,  # reputationScore
-                report_count,  # reportCount
-                overall_risk  # overallRisk
-            ).build_transaction({
-                'from': account.address,
-                'gas': 200000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': self.w3.eth.get_transaction_count(account.address),
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, self.private_key)
-            # CORRECTED: The attribute is now 'raw_transaction'
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            if receipt.status == 1:
-                logger.info(f"✅ Blockchain updated for {address}: Fraud={prediction}, Confidence={confidence_percentage}%")
-                return True
-            else:
-                logger.error(f"❌ Transaction failed for {address}")
-                return False
-               
+            call = self.contract.functions.batchUpdateFraudAssessments(
+                [Web3.to_checksum_address(address) for address, _, _ in batch],
+                [self._assessment_fields(prediction, confidence) for _, prediction, confidence in batch]
+            )
+            limit = self.write_gas_limit()
+            estimate = call.estimate_gas({"from": self.submitter.account.address})
+            if estimate > limit:
+                raise ValueError(f"the batch needs {estimate} gas, over the {limit} limit; "
+                                 "raise ORACLE_GAS_PER_ASSESSMENT so batches are smaller")
+            gas = min(int(estimate * BATCH_GAS_HEADROOM), limit)
+            return self.submitter.submit(call, gas=gas, label=f"batch of {len(batch)}")
+        except Exception as e:
+            logger.error(f"Error updating blockchain for a batch of {len(batch)} addresses: {e}")
+            return None
+   
+    def submit_blockchain_prediction(self, address, prediction, confidence):
+        """Send a prediction update without waiting for it to be mined.
+
+        Returns a Future for the receipt, or None if the update was skipped or could not be sent.
+        """
+        if not self.contract_address or not self.private_key:
+            logger.warning("Blockchain update skipped - no contract address or private key")
+            return None
+        
+        try:
+            return self.submitter.submit(self._assessment_call(address, prediction, confidence), label=address)
+        except Exception as e:
+            logger.error(f"Error updating blockchain for {address}: {e}")
+            return None
+   
+    def _wait_for_update(self, address, prediction, confidence, future):
+        """Resolve a submitted update to True/False, logging the outcome"""
+        if future is None:
+            return False
+        try:
+            receipt = future.result()
         except Exception as e:
             logger.error(f"Error updating blockchain for {address}: {e}")
             return False
+        
+        if receipt.status == 1:
+            confidence_percentage = int(confidence * 100) if confidence else 50
+            logger.info(f"✅ Blockchain updated for {address}: Fraud={prediction}, Confidence={confidence_percentage}%")
+            return True
+        else:
+            logger.error(f"❌ Transaction failed for {address}")
+            return False
+   
+    def _wait_for_batch(self, batch, future):
+        """Resolve a submitted batch to True/False, logging the outcome"""
+        if future is None:
+            return False
+        try:
+            receipt = future.result()
+        except Exception as e:
+            logger.error(f"Error updating blockchain for a batch of {len(batch)} addresses: {e}")
+            return False
+        
+        if receipt.status == 1:
+            logger.info(f"✅ Blockchain updated for {len(batch)} addresses in one transaction "
+                        f"({receipt.gasUsed // len(batch)} gas each)")
+            return True
+        else:
+            logger.error(f"❌ Batch transaction failed for {len(batch)} addresses")
+            return False
+   
+    def update_blockchain_prediction(self, address, prediction, confidence):
+        """Update prediction on the blockchain"""
+        future = self.submit_blockchain_prediction(address, prediction, confidence)
+        return self._wait_for_update(address, prediction, confidence, future)
    
     def process_address(self, address):
         """Process a single address through the oracle"""
@@ -176,6 +376,99 @@ class FraudDetectionOracle:
                 "error": ml_result.get("message", "Unknown error")
             }
    
+    def process_addresses(self, addresses):
+        """Process many addresses, fetching their ML predictions in batches"""
+        logger.info(f"Processing {len(addresses)} addresses")
+        ml_results = self.get_ml_predictions(list(addresses))
+        
+        results = []
+        scored = []
+        for address in addresses:
+            ml_result = ml_results[address]
+            if ml_result["status"] != "success":
+                logger.error(f"Failed to get ML prediction for {address}: {ml_result.get('message', 'Unknown error')}")
+                results.append({"address": address, "error": ml_result.get("message", "Unknown error")})
+                continue
+            
+            result = {"address": address, "ml_prediction": ml_result["prediction"],
+                      "ml_confidence": ml_result["probability"]}
+            results.append(result)
+            scored.append(result)
+        
+        to_write = self._skip_unchanged(scored)
+        self._write_assessments(to_write)
+        if self.mirror is not None:
+            for result in to_write:
+                if result["blockchain_updated"]:
+                    fields = self._assessment_fields(result["ml_prediction"], result["ml_confidence"])
+                    self.mirror.record(result["address"], fields[1], fields[2])
+                else:
+                    self.mirror.forget(result["address"])  # State on chain is unknown
+        
+        logger.info(f"Cycle: {len(to_write)} writes submitted, "
+                    f"{len(scored) - len(to_write)} avoided (unchanged on chain)")
+        return results
+   
+    def _skip_unchanged(self, scored):
+        """Results whose assessment differs from the mirrored on-chain one; the rest are marked unchanged"""
+        if self.mirror is None or not self.contract_address:
+            return scored
+        
+        self.mirror.warm_from_reads([r["address"] for r in scored], self.get_blockchain_assessments)
+        to_write = []
+        for result in scored:
+            _, is_fraudulent, confidence = self._assessment_fields(result["ml_prediction"], result["ml_confidence"])[:3]
+            if self.mirror.needs_write(result["address"], is_fraudulent, confidence):
+                to_write.append(result)
+            else:
+                result["blockchain_updated"] = False
+                result["unchanged"] = True
+        self.writes_avoided += len(scored) - len(to_write)
+        return to_write
+   
+    def warm_mirror_from_events(self, from_block=0, index_path=":memory:"):
+        """Load the last assessment per wallet from FraudAssessmentUpdated logs.
+
+        The log is scanned with event_indexer.EventIndex, in block ranges that
+        shrink when the node refuses one; index_path keeps the index between
+        runs (only new blocks are then scanned). If the scan fails, the
+        mirror is left empty and fills from getFraudAssessment reads.
+        Returns the number of events loaded.
+        """
+        from event_indexer import EventIndex
+        try:
+            with EventIndex(self.w3, self.contract_address, index_path, start_block=from_block) as index:
+                index.sync()
+                return self.warm_mirror_from_index(index)
+        except Exception as e:
+            logger.warning(f"Could not read assessment events from block {from_block} ({e}); "
+                           f"the local copy will be filled from getFraudAssessment reads instead")
+            return 0
+    
+    def warm_mirror_from_index(self, index):
+        """Load the last assessment per wallet from a synced event_indexer.EventIndex"""
+        return self.mirror.warm_from_events({"args": assessment} for assessment in index.latest_assessments())
+   
+    def _write_assessments(self, scored):
+        """Send every update back-to-back, then collect the receipts; sets blockchain_updated"""
+        if self.batch_writes:
+            submitted = []
+            for batch in self.pack_write_batches(scored):
+                items = [(r["address"], r["ml_prediction"], r["ml_confidence"]) for r in batch]
+                submitted.append((batch, self.submit_blockchain_batch(items)))
+            for batch, future in submitted:
+                updated = self._wait_for_batch(batch, future)
+                for result in batch:
+                    result["blockchain_updated"] = updated
+            return
+        
+        submitted = [(r, self.submit_blockchain_prediction(r["address"], r["ml_prediction"], r["ml_confidence"]))
+                     for r in scored]
+        for result, future in submitted:
+            result["blockchain_updated"] = self._wait_for_update(
+                result["address"], result["ml_prediction"], result["ml_confidence"], future
+            )
+   
     def get_blockchain_assessment(self, address):
         """Get fraud assessment from blockchain"""
         if not self.contract_address:
@@ -198,6 +491,13 @@ class FraudDetectionOracle:
         except Exception as e:
             logger.error(f"Error getting blockchain assessment for {address}: {e}")
             return None
+   
+    def get_blockchain_assessments(self, addresses):
+        """Assessments for many addresses as {address: assessment or None}, batched into few RPC round trips"""
+        if not self.contract_address:
+            logger.warning("Cannot get blockchain assessments - no contract address")
+            return {address: None for address in addresses}
+        return read_assessments(self.w3, self.contract, addresses)
 
 def main():
     """Main function to run the oracle service in a continuous loop."""
@@ -209,6 +509,10 @@ def main():
     contract_address = os.getenv("CONTRACT_ADDRESS")
     private_key = os.getenv("PRIVATE_KEY")
     
+    # The event-driven runner drives the threaded oracle; the asyncio one only rescores a fixed list
+    if os.getenv("ORACLE_MODE", "loop") == "events" and os.getenv("ORACLE_ASYNC", "0") == "1":
+        raise ValueError("ORACLE_ASYNC=1 is not supported with ORACLE_MODE=events; unset one of them")
+    
     oracle = FraudDetectionOracle(
         api_url=api_url,
         rpc_url=rpc_url,
@@ -216,6 +520,18 @@ def main():
         private_key=private_key
     )
     
+    # Warm the skip-unchanged mirror from the event log instead of one read per wallet
+    mirror_from_block = os.getenv("ORACLE_MIRROR_FROM_BLOCK")
+    event_index_path = os.getenv("ORACLE_EVENT_INDEX")
+    if oracle.mirror is not None and contract_address and (event_index_path or mirror_from_block):
+        # With a local SQLite index only blocks since the last run are scanned
+        oracle.warm_mirror_from_events(int(mirror_from_block or 0), event_index_path or ":memory:")
+    
+    # ORACLE_MODE=events only rescores addresses with new activity
+    if os.getenv("ORACLE_MODE", "loop") == "events":
+        run_event_driven(oracle)
+        return
+    
     # These addresses are from your cleaned_data.csv file.
     test_addresses = [
         "0x00009277775ac7d0d59eaad8fee3d10ac6c805e8",
@@ -223,22 +539,65 @@ def main():
         "0x0002bda54cb772d040f779e88eb453cac0daa244"
     ]
     
+    # ORACLE_ASYNC=1 runs scoring, writes and confirmations as overlapping asyncio stages
+    if os.getenv("ORACLE_ASYNC", "0") == "1":
+        import asyncio
+        from oracle_async import AsyncFraudDetectionOracle, run_forever
+        async_oracle = AsyncFraudDetectionOracle(api_url, rpc_url, contract_address, private_key, writer=oracle)
+        asyncio.run(run_forever(async_oracle, test_addresses))
+        return
+    
     # Run the oracle in a loop
     while True:
         print(f"Processing {len(test_addresses)} addresses...")
-        for address in test_addresses:
-            result = oracle.process_address(address)
+        avoided_before = oracle.writes_avoided
+        results = oracle.process_addresses(test_addresses)
+        # One batched read for the whole cycle instead of an eth_call per address
+        assessments = oracle.get_blockchain_assessments([result["address"] for result in results])
+        for result in results:
+            address = result["address"]
             print(f"Result for {address}: {result}")
             
-            assessment = oracle.get_blockchain_assessment(address)
+            assessment = assessments.get(address)
             if assessment:
                 print(f"Blockchain assessment: {assessment}")
             
             print("-" * 50)
         
+        print(f"Writes avoided this cycle (unchanged on chain): {oracle.writes_avoided - avoided_before}")
+        
         # Wait for 60 minutes before the next run
         print("😴 Processing complete. Sleeping for 60 minutes...")
         time.sleep(3600)  # 3600 seconds = 60 minutes
 
+def run_event_driven(oracle):
+    """Score addresses from a work queue instead of a fixed list.
+
+    ORACLE_SOURCE=blocks scans new blocks on RPC_URL (the default);
+    ORACLE_SOURCE=file:/path/to/addresses.txt tails a file of addresses.
+    """
+    from oracle_events import BlockScannerSource, EventDrivenOracle, FileTailSource
+    
+    source_spec = os.getenv("ORACLE_SOURCE", "blocks")
+    if source_spec.startswith("file:"):
+        source = FileTailSource(source_spec[len("file:"):])
+    elif source_spec == "blocks":
+        source = BlockScannerSource(oracle.w3)
+    else:
+        raise ValueError(f"Unknown ORACLE_SOURCE '{source_spec}', expected 'blocks' or 'file:<path>'")
+    
+    runner = EventDrivenOracle(
+        oracle,
+        source,
+        window_seconds=float(os.getenv("ORACLE_DEDUP_WINDOW", "5")),
+        max_batch=int(os.getenv("ORACLE_MAX_BATCH", "1000")),
+        report_interval=float(os.getenv("ORACLE_REPORT_INTERVAL", "60")),
+    )
+    print(f"Event-driven oracle reading from {source_spec}")
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        print(f"Stopped. {runner.metrics.stats()}")
+
 if __name__ == "__main__":
     main()
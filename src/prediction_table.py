@@ -0,0 +1,117 @@
+"""
+Precomputed prediction table for the Fraud Detection API
+@description: Scores every known address once and persists the result keyed
+by the model and dataset fingerprints, so the API can serve pure lookups
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PredictionTable:
+    """Per-row predictions and fraud probabilities for the whole dataset"""
+
+    def __init__(self, predictions, probabilities, model_fingerprint, data_fingerprint):
+        self.predictions = predictions
+        # None when the model has no predict_proba
+        self.probabilities = probabilities
+        self.model_fingerprint = model_fingerprint
+        self.data_fingerprint = data_fingerprint
+
+    def __len__(self):
+        return len(self.predictions)
+
+    def lookup(self, rows):
+        """Return (predictions, probabilities) for an array of row positions"""
+        probabilities = self.probabilities[rows] if self.probabilities is not None else None
+        return self.predictions[rows], probabilities
+
+    def matches(self, model_fingerprint, data_fingerprint):
+        return (self.model_fingerprint == model_fingerprint
+                and self.data_fingerprint == data_fingerprint)
+
+    @classmethod
+    def build(cls, feature_matrix, score_fn, model_fingerprint, data_fingerprint, chunk_size=4096):
+        """Score the full feature matrix in chunks with score_fn(features)"""
+        n_rows = len(feature_matrix)
+        predictions = np.zeros(n_rows, dtype=np.int64)
+        probabilities = np.zeros(n_rows, dtype=np.float64)
+        has_probabilities = True
+
+        for start in range(0, n_rows, chunk_size):
+            stop = min(start + chunk_size, n_rows)
+            chunk_predictions, chunk_probabilities = score_fn(feature_matrix[start:stop])
+            predictions[start:stop] = chunk_predictions
+            if chunk_probabilities is None:
+                has_probabilities = False
+            else:
+                probabilities[start:stop] = chunk_probabilities
+
+        return cls(predictions, probabilities if has_probabilities else None,
+                   model_fingerprint, data_fingerprint)
+
+    def save(self, path):
+        """Write the table atomically so readers never see a partial file"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as handle:
+            np.savez(
+                handle,
+                predictions=self.predictions,
+                probabilities=(self.probabilities if self.probabilities is not None
+                               else np.empty(0, dtype=np.float64)),
+                has_probabilities=np.array(self.probabilities is not None),
+                model_fingerprint=np.array(self.model_fingerprint),
+                data_fingerprint=np.array(self.data_fingerprint),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as archive:
+            probabilities = archive['probabilities'] if bool(archive['has_probabilities']) else None
+            return cls(archive['predictions'], probabilities,
+                       str(archive['model_fingerprint']), str(archive['data_fingerprint']))
+
+
+def prediction_table_path(cache_dir, model_fingerprint, data_fingerprint):
+    return os.path.join(
+        cache_dir,
+        f"prediction_table_{model_fingerprint[:16]}_{data_fingerprint[:16]}.npz"
+    )
+
+
+def load_or_build_prediction_table(feature_matrix, score_fn, model_fingerprint,
+                                   data_fingerprint, cache_dir):
+    """
+    Load the persisted table for these artifacts, or score the dataset and
+    persist it. A changed model or dataset gives a new key, so a stale table
+    is never served.
+    """
+    path = prediction_table_path(cache_dir, model_fingerprint, data_fingerprint)
+
+    if os.path.exists(path):
+        try:
+            table = PredictionTable.load(path)
+            if table.matches(model_fingerprint, data_fingerprint) and len(table) == len(feature_matrix):
+                return table
+        except (OSError, ValueError, KeyError):
+            pass  # Corrupt or incompatible file, rebuild below
+
+    table = PredictionTable.build(feature_matrix, score_fn, model_fingerprint, data_fingerprint)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        table.save(path)
+    except OSError:
+        pass  # Read-only results dir: keep the in-memory table
+    return table
@@ -0,0 +1,126 @@
+"""
+Micro-batching request coalescer for the Fraud Detection API
+@description: Collects concurrent single-address predictions for a short
+window and scores them with one batched model call
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class RequestCoalescer:
+    """
+    Queue single-row predictions and score them together.
+
+    A background worker waits until either max_batch requests are queued or
+    window_ms has passed since the oldest queued request, then calls
+    score_fn(rows) once and hands each caller its own result.
+    """
+
+    def __init__(self, score_fn, window_ms=2.0, max_batch=64):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.score_fn = score_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+
+        self._pending = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._worker = None
+
+        # Metrics
+        self._batches = 0
+        self._requests = 0
+        self._max_seen = 0
+        self._histogram = {}
+
+    def submit(self, row):
+        """Queue one dataset row; the Future resolves to (prediction, probability)"""
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Coalescer is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="request-coalescer", daemon=True)
+                self._worker.start()
+            self._pending.append((row, future, time.monotonic()))
+            # Wake the worker for the first request of a window or a full batch
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._condition.notify()
+        return future
+
+    def score(self, row, timeout=10.0):
+        """Blocking helper used by the request handlers"""
+        return self.submit(row).result(timeout=timeout)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=1.0)
+
+    def _take_batch(self):
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return None
+
+            deadline = self._pending[0][2] + self.window
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            self._score_batch(batch)
+
+    def _score_batch(self, batch):
+        rows = np.fromiter((row for row, _, _ in batch), dtype=np.int64, count=len(batch))
+        try:
+            predictions, probabilities = self.score_fn(rows)
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+        else:
+            for i, (_, future, _) in enumerate(batch):
+                probability = probabilities[i] if probabilities is not None else None
+                future.set_result((predictions[i], probability))
+        self._record(len(batch))
+
+    def _record(self, size):
+        with self._condition:
+            self._batches += 1
+            self._requests += size
+            self._max_seen = max(self._max_seen, size)
+            # Power-of-two buckets: 1, 2, 4, 8, ...
+            bucket = 1 << (size - 1).bit_length()
+            self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+
+    def stats(self):
+        with self._condition:
+            return {
+                "enabled": True,
+                "window_ms": self.window * 1000.0,
+                "max_batch": self.max_batch,
+                "batches": self._batches,
+                "requests": self._requests,
+                "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+                "max_batch_size_seen": self._max_seen,
+                "batch_size_histogram": {f"<={k}": v for k, v in sorted(self._histogram.items())},
+                "queued": len(self._pending),
+            }
@@ -0,0 +1,195 @@
+"""
+Multi-process server for the Fraud Detection API
+@description: Loads the model and feature store once, then pre-forks worker
+processes that share them copy-on-write and accept on one listening socket
+
+Usage: python serve.py --workers 4 [--host 127.0.0.1] [--port 5000]
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from collections import deque
+
+from werkzeug.serving import make_server
+
+
+def create_listen_socket(host, port, backlog=1024):
+    """Bind the shared listening socket in the parent before forking"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """
+    Fork N workers that each run a threaded WSGI server on the inherited socket.
+
+    Everything the parent loaded before forking (model trees, feature matrix,
+    address index) is shared copy-on-write; the feature store arrays are
+    memory-mapped, so they stay shared even after pages are touched. Workers
+    that die are restarted until the server is stopped, after a delay that
+    doubles with each recent exit (restart_delay up to max_restart_delay).
+    If max_crashes workers exit within crash_window seconds (e.g. the model
+    fails to load in every worker), the server gives up. SIGHUP sent to the
+    parent first runs on_reload in the parent, so workers forked from then on
+    start with the new model, and is then forwarded to every running worker
+    (the API reloads its model on it).
+    """
+
+    def __init__(self, app, host="127.0.0.1", port=5000, workers=2, on_worker_start=None, on_reload=None,
+                 restart_delay=0.1, max_restart_delay=30.0, max_crashes=10, crash_window=60.0):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.on_worker_start = on_worker_start
+        self.on_reload = on_reload
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_crashes = max_crashes
+        self.crash_window = crash_window
+        self.sock = None
+        self.children = set()
+        self._stopping = False
+        self._crashes = deque()
+
+    def start(self):
+        self.sock = create_listen_socket(self.host, self.port)
+        self.port = self.sock.getsockname()[1]
+
+        # Move everything loaded so far out of the collector's reach, so gc
+        # passes in the workers don't write to (and un-share) those pages
+        gc.collect()
+        gc.freeze()
+
+        for _ in range(self.workers):
+            self._spawn()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                if hasattr(signal, 'SIGHUP'):
+                    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+                if self.on_worker_start is not None:
+                    self.on_worker_start()
+                server = make_server(self.host, self.port, self.app, threaded=True, fd=self.sock.fileno())
+                server.serve_forever()
+            except BaseException:
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.children.add(pid)
+        return pid
+
+    def stop(self, *_):
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.children.discard(pid)
+
+    def reload(self, signum, *_):
+        """Reload in the parent, then in every worker"""
+        if self.on_reload is not None:
+            try:
+                self.on_reload()
+            except Exception as e:
+                print(f"Reload in the server process failed: {e}", flush=True)
+            # Share the new model with workers forked from now on, as in start()
+            gc.collect()
+            gc.freeze()
+        self.forward_signal(signum)
+
+    def forward_signal(self, signum, *_):
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                self.children.discard(pid)
+
+    def _restart_delay(self, pid):
+        """Record a worker exit; returns the delay before restarting it, or None to give up"""
+        now = time.monotonic()
+        self._crashes.append(now)
+        while self._crashes and now - self._crashes[0] > self.crash_window:
+            self._crashes.popleft()
+        if len(self._crashes) >= self.max_crashes:
+            return None
+        return min(self.max_restart_delay, self.restart_delay * 2 ** (len(self._crashes) - 1))
+
+    def run(self):
+        """Supervise workers until SIGTERM/SIGINT; returns the exit code (1 if workers kept crashing)"""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self.reload)
+
+        exit_code = 0
+        while self.children:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            self.children.discard(pid)
+            if self._stopping:
+                continue
+            delay = self._restart_delay(pid)
+            if delay is None:
+                print(f"Worker {pid} exited; {len(self._crashes)} worker exits in the last "
+                      f"{self.crash_window:.0f}s, giving up", flush=True)
+                exit_code = 1
+                self.stop()
+                continue
+            print(f"Worker {pid} exited, restarting it in {delay:.2f}s", flush=True)
+            time.sleep(delay)
+            if not self._stopping:
+                self._spawn()
+
+        self.sock.close()
+        return exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the Fraud Detection API with multiple worker processes')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes (default: one per CPU)')
+    args = parser.parse_args()
+
+    # Importing app loads the model and dataset once, in the parent
+    from app import app, install_reload_signal, reload_model
+
+    if not hasattr(os, 'fork'):
+        print("Pre-forking is not available on this platform; serving with a single process")
+        install_reload_signal()
+        app.run(host=args.host, port=args.port, threaded=True)
+        return
+
+    server = PreforkServer(app, host=args.host, port=args.port, workers=args.workers,
+                           on_worker_start=install_reload_signal, on_reload=reload_model)
+    server.start()
+    print(f"Fraud Detection API listening on http://{args.host}:{server.port} "
+          f"with {args.workers} worker processes", flush=True)
+    return server.run()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
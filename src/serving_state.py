@@ -0,0 +1,171 @@
+"""
+Serving state for the Fraud Detection API
+@description: Everything a request needs to score an address (model,
+feature store, index, optional table/engine/coalescer) bundled in one
+object, so a reload can build a new one and swap a single reference
+"""
+
+import os
+import threading
+
+import joblib
+import numpy as np
+
+from feature_store import FeatureStore, is_store_current, load_feature_store
+from forest_inference import CompiledForest
+from prediction_table import file_fingerprint, load_or_build_prediction_table
+from request_coalescer import RequestCoalescer
+
+INFERENCE_ENGINES = ("sklearn", "compiled")
+
+
+def default_model_paths(base_dir):
+    """Model files to try, in order (MODEL_PATH overrides the defaults)"""
+    candidates = [
+        os.path.join(base_dir, "results", "tuned_fraud_detection_model.joblib"),
+        os.path.join(base_dir, "results", "fraud_detection_model.joblib"),
+    ]
+    if os.getenv("MODEL_PATH"):
+        candidates.insert(0, os.getenv("MODEL_PATH"))
+    return candidates
+
+
+def first_existing_path(candidates):
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def score_with_model(estimator, features):
+    """Score a (N, F) feature matrix with a single model call.
+
+    Returns (predictions, probabilities); the label is derived from the
+    class probabilities so the forest is only traversed once.
+    """
+    if not hasattr(estimator, 'predict_proba'):
+        return estimator.predict(features), None
+    proba = estimator.predict_proba(features)
+    predictions = estimator.classes_[np.argmax(proba, axis=1)]
+    return predictions, proba[:, 1]
+
+
+class ServingState:
+    """A loaded model plus the dataset it scores, treated as immutable once serving"""
+
+    def __init__(self, model, model_path, model_fingerprint, feature_store, dataset_source,
+                 scaler=None, inference_engine="sklearn", compiled_max_batch=512):
+        if inference_engine not in INFERENCE_ENGINES:
+            raise ValueError(f"Unknown INFERENCE_ENGINE '{inference_engine}', expected 'sklearn' or 'compiled'")
+
+        self.model = model
+        self.model_path = model_path
+        self.model_fingerprint = model_fingerprint
+        self.scaler = scaler
+        self.inference_engine = inference_engine
+        self.compiled_max_batch = compiled_max_batch
+        self.compiled_forest = CompiledForest.from_model(model) if inference_engine == "compiled" else None
+
+        self.feature_store = feature_store
+        self.dataset_source = dataset_source
+        self.feature_columns = feature_store.feature_columns
+        # The address index and scoring matrix are built once so requests never scan the dataset
+        self.address_index = feature_store.index
+        self.feature_matrix = feature_store.features
+
+        self.prediction_table = None
+        self.coalescer = None
+
+    @property
+    def cache_key(self):
+        """Identifies the model + dataset pair, for keying cached predictions"""
+        return f"{self.model_fingerprint}:{self.feature_store.fingerprint}"
+
+    def transform_features(self, array_2d):
+        # Apply scaler if available; otherwise pass-through
+        if self.scaler is not None:
+            return self.scaler.transform(array_2d)
+        return array_2d
+
+    def score_features(self, features):
+        """Score a (N, F) feature matrix; small batches use the compiled engine if enabled"""
+        estimator = self.model
+        if self.compiled_forest is not None and len(features) <= self.compiled_max_batch:
+            estimator = self.compiled_forest
+        return score_with_model(estimator, features)
+
+    def score_live(self, features):
+        return self.score_features(self.transform_features(features))
+
+    def score_rows(self, rows):
+        """Return (predictions, probabilities) for an array of dataset row positions"""
+        if self.prediction_table is not None:
+            return self.prediction_table.lookup(rows)
+        return self.score_live(self.feature_matrix[rows])
+
+    def score_row(self, row):
+        """Return (prediction, probability) for a single dataset row"""
+        if self.coalescer is not None:
+            return self.coalescer.score(row)
+        predictions, probabilities = self.score_rows(np.array([row]))
+        return predictions[0], probabilities[0] if probabilities is not None else None
+
+    def enable_prediction_table(self, cache_dir):
+        """Precompute (or load) scores for every row, keyed by the model and dataset hashes"""
+        self.prediction_table = load_or_build_prediction_table(
+            self.feature_matrix,
+            self.score_live,
+            model_fingerprint=self.model_fingerprint,
+            data_fingerprint=self.feature_store.fingerprint,
+            cache_dir=cache_dir,
+        )
+
+    def enable_coalescer(self, window_ms, max_batch):
+        self.coalescer = RequestCoalescer(self.score_rows, window_ms=window_ms, max_batch=max_batch)
+
+    def warm_up(self, n_rows=8):
+        """Run a few real predictions so a broken artifact fails here, not on traffic"""
+        rows = np.arange(min(n_rows, len(self.feature_store)))
+        if len(rows):
+            self.score_live(self.feature_matrix[rows])
+            self.score_rows(rows)
+
+    def retire(self, grace_seconds=30.0):
+        """Release resources once requests that still hold this state have finished"""
+        if self.coalescer is not None:
+            timer = threading.Timer(grace_seconds, self.coalescer.close)
+            timer.daemon = True
+            timer.start()
+
+
+def load_dataset(data_path, feature_store_dir):
+    """Prefer the memory-mapped feature store; fall back to parsing the CSV if
+    the store is missing or out of date. Returns (feature_store, source)."""
+    if is_store_current(feature_store_dir, data_path):
+        return load_feature_store(feature_store_dir), feature_store_dir
+    return FeatureStore.from_csv(data_path), data_path
+
+
+def load_state(model_path, data_path, feature_store_dir, scaler=None,
+               inference_engine="sklearn", compiled_max_batch=512,
+               precompute_predictions=False, prediction_table_dir=None,
+               coalesce_requests=False, coalesce_window_ms=2.0, coalesce_max_batch=64):
+    """Load the model and dataset from disk and set up the optional features"""
+    model = joblib.load(model_path)
+    feature_store, dataset_source = load_dataset(data_path, feature_store_dir)
+
+    state = ServingState(
+        model=model,
+        model_path=model_path,
+        model_fingerprint=file_fingerprint(model_path),
+        feature_store=feature_store,
+        dataset_source=dataset_source,
+        scaler=scaler,
+        inference_engine=inference_engine,
+        compiled_max_batch=compiled_max_batch,
+    )
+    if precompute_predictions:
+        state.enable_prediction_table(prediction_table_dir)
+    if coalesce_requests:
+        state.enable_coalescer(coalesce_window_ms, coalesce_max_batch)
+    return state
@@ -0,0 +1,123 @@
+"""
+Bounded-memory counters for per-address transaction aggregates
+@description: Distinct counts that stay exact for small sets and switch to a
+HyperLogLog sketch past a limit, plus a Misra-Gries most-frequent counter.
+Both can be merged, so partial results from separate shards combine exactly
+as if the records had been seen in one pass
+"""
+
+import hashlib
+import math
+
+EXACT_LIMIT = 1024      # distinct values kept exactly before switching to HyperLogLog
+HLL_PRECISION = 12      # 4096 one-byte registers, ~1.6% standard error
+HEAVY_HITTER_SLOTS = 32
+
+
+def hash64(value):
+    """Stable 64-bit hash (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class DistinctCounter:
+    """Counts distinct strings in at most ~EXACT_LIMIT hashes or 2**HLL_PRECISION bytes"""
+
+    __slots__ = ("_hashes", "_registers")
+
+    def __init__(self):
+        self._hashes = set()
+        self._registers = None
+
+    @property
+    def is_exact(self):
+        return self._registers is None
+
+    def add(self, value):
+        self.add_hash(hash64(value))
+
+    def add_hash(self, h):
+        if self._registers is None:
+            self._hashes.add(h)
+            if len(self._hashes) > EXACT_LIMIT:
+                self._to_sketch()
+        else:
+            self._add_to_registers(h)
+
+    def _to_sketch(self):
+        self._registers = bytearray(1 << HLL_PRECISION)
+        for h in self._hashes:
+            self._add_to_registers(h)
+        self._hashes = None
+
+    def _add_to_registers(self, h):
+        index = h >> (64 - HLL_PRECISION)
+        rest = h & ((1 << (64 - HLL_PRECISION)) - 1)
+        rank = (64 - HLL_PRECISION) - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def merge(self, other):
+        """Add everything counted by another counter into this one"""
+        if other._registers is None:
+            for h in other._hashes:
+                self.add_hash(h)
+            return self
+        if self._registers is None:
+            self._to_sketch()
+        self._registers = bytearray(map(max, self._registers, other._registers))
+        return self
+
+    def __len__(self):
+        if self._registers is None:
+            return len(self._hashes)
+        m = len(self._registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return int(round(estimate))
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary: tracks the most frequent values in a fixed number of
+    slots. The most common value is exact whenever it makes up more than
+    1/(slots+1) of the items, which is the case for an address's main token.
+    """
+
+    __slots__ = ("counts", "slots")
+
+    def __init__(self, slots=HEAVY_HITTER_SLOTS):
+        self.counts = {}
+        self.slots = slots
+
+    def add(self, value, count=1):
+        counts = self.counts
+        if value in counts or len(counts) < self.slots:
+            counts[value] = counts.get(value, 0) + count
+            return
+        # Full: every tracked value (and the new one) loses the same amount
+        cut = min(count, min(counts.values()))
+        for key in list(counts):
+            counts[key] -= cut
+            if counts[key] == 0:
+                del counts[key]
+        if count > cut:
+            counts[value] = count - cut
+
+    def merge(self, other):
+        counts = dict(self.counts)
+        for value, count in other.counts.items():
+            counts[value] = counts.get(value, 0) + count
+        if len(counts) > self.slots:
+            # Subtract the (slots+1)-th largest count to get back within budget
+            cut = sorted(counts.values(), reverse=True)[self.slots]
+            counts = {value: count - cut for value, count in counts.items() if count > cut}
+        self.counts = counts
+        return self
+
+    def most_common(self):
+        """The most frequent value, ties broken alphabetically; None if empty"""
+        if not self.counts:
+            return None
+        return min(self.counts.items(), key=lambda item: (-item[1], item[0]))[0]
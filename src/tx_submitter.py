@@ -0,0 +1,286 @@
+"""
+Pipelined transaction submission for the Fraud Detection Oracle
+@description: Signs and sends many contract calls back-to-back from one
+account. Nonces are tracked locally instead of asking the node before every
+write, the gas price is fetched once per block, and receipts are confirmed by
+a background thread so the sender never waits a block between transactions.
+Transactions that stay unmined are re-sent with the same nonce and a higher
+gas price.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from eth_account import Account
+from web3.exceptions import TransactionNotFound
+
+logger = logging.getLogger(__name__)
+
+
+class NonceManager:
+    """Hands out consecutive nonces for one account, syncing with the node only when needed"""
+
+    def __init__(self, w3, address):
+        self.w3 = w3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next = None
+
+    def next(self):
+        with self._lock:
+            if self._next is None:
+                # "pending" counts transactions already in the node's pool
+                self._next = self.w3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def resync(self):
+        """Forget the local count; the next nonce is read from the node again"""
+        with self._lock:
+            self._next = None
+
+
+class GasPriceCache:
+    """
+    The node's gas price, fetched again only when a new block has been seen.
+    The block number itself is checked at most every poll_interval seconds.
+    """
+
+    def __init__(self, w3, poll_interval=1.0, clock=time.monotonic):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._block = None
+        self._price = None
+        self._checked_at = None
+
+    def price(self):
+        with self._lock:
+            now = self._clock()
+            if self._price is not None and now - self._checked_at < self.poll_interval:
+                return self._price
+            block = self.w3.eth.block_number
+            self._checked_at = now
+            if block != self._block or self._price is None:
+                self._price = self.w3.eth.gas_price
+                self._block = block
+            return self._price
+
+
+class PendingTransaction:
+    __slots__ = ("nonce", "tx", "hashes", "label", "sent_at", "replacements", "future")
+
+    def __init__(self, nonce, tx, tx_hash, label, sent_at):
+        self.nonce = nonce
+        self.tx = tx
+        self.hashes = [tx_hash]
+        self.label = label
+        self.sent_at = sent_at
+        self.replacements = 0
+        self.future = Future()
+
+
+class TransactionSubmitter:
+    """
+    Sends contract calls without waiting for each one to be mined.
+
+    submit() returns a Future that resolves to the receipt. At most
+    max_pending transactions are in flight; further submits block until one
+    confirms. A transaction with no receipt after replace_after seconds is
+    re-sent with the same nonce and its gas price raised by gas_bump (nodes
+    require at least +10% to replace), up to max_replacements times, after
+    which its Future fails with TimeoutError.
+    """
+
+    def __init__(self, w3, private_key, max_pending=64, replace_after=60.0, gas_bump=1.125,
+                 max_replacements=3, poll_interval=0.5, gas_price_cache=None, clock=time.monotonic):
+        self.w3 = w3
+        self.account = Account.from_key(private_key)
+        self.nonces = NonceManager(w3, self.account.address)
+        self.gas_prices = gas_price_cache or GasPriceCache(w3)
+        self.replace_after = replace_after
+        self.gas_bump = gas_bump
+        self.max_replacements = max_replacements
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._chain_id = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._send_lock = threading.Lock()  # Keeps sends in nonce order
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._pending = {}
+        self._stop = threading.Event()
+        self._confirmer = None
+        self.sent = 0
+        self.confirmed = 0
+        self.failed = 0
+        self.replaced = 0
+
+    @property
+    def chain_id(self):
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _send(self, tx):
+        signed = self.account.sign_transaction(tx)
+        return self.w3.eth.send_raw_transaction(signed.raw_transaction)
+
+    def submit(self, contract_function, gas=200000, label=None):
+        """Build, sign and send a contract call; returns a Future for its receipt"""
+        self._slots.acquire()
+        try:
+            with self._send_lock:
+                pending = self._send_new(contract_function, gas, label)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending[pending.nonce] = pending
+            if self._confirmer is None:
+                self._stop.clear()
+                self._confirmer = threading.Thread(target=self._confirm_loop, name="tx-confirmer", daemon=True)
+                self._confirmer.start()
+        return pending.future
+
+    def _send_new(self, contract_function, gas, label):
+        for attempt in range(2):
+            nonce = self.nonces.next()
+            tx = contract_function.build_transaction({
+                "from": self.account.address,
+                "gas": gas,
+                "gasPrice": self.gas_prices.price(),
+                "nonce": nonce,
+                "chainId": self.chain_id,
+            })
+            try:
+                tx_hash = self._send(tx)
+            except Exception as e:
+                # The local count is now wrong (a gap, or another sender used
+                # the nonce); read it from the node again
+                self.nonces.resync()
+                if attempt == 0 and "nonce" in str(e).lower():
+                    logger.warning(f"Nonce {nonce} rejected ({e}), retrying with the node's count")
+                    continue
+                raise
+            self.sent += 1
+            return PendingTransaction(nonce, tx, tx_hash, label, self._clock())
+
+    def _receipt(self, pending):
+        for tx_hash in pending.hashes:
+            try:
+                return self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+        return None
+
+    def _finish(self, pending, receipt=None, error=None):
+        with self._lock:
+            if self._pending.pop(pending.nonce, None) is None:
+                return
+        self._slots.release()
+        if error is not None:
+            self.failed += 1
+            pending.future.set_exception(error)
+        else:
+            self.confirmed += 1
+            pending.future.set_result(receipt)
+
+    def _replace(self, pending):
+        """Re-send a stuck transaction with the same nonce and a higher gas price"""
+        tx = dict(pending.tx)
+        tx["gasPrice"] = max(int(tx["gasPrice"] * self.gas_bump) + 1, self.gas_prices.price())
+        try:
+            with self._send_lock:
+                tx_hash = self._send(tx)
+        except Exception as e:
+            # Usually the original was mined in the meantime ("nonce too low");
+            # its receipt is picked up on the next check
+            logger.warning(f"Could not replace transaction with nonce {pending.nonce}: {e}")
+            pending.sent_at = self._clock()
+            return
+        pending.tx = tx
+        pending.hashes.append(tx_hash)
+        pending.sent_at = self._clock()
+        pending.replacements += 1
+        self.replaced += 1
+        logger.info(f"Replaced stuck transaction {pending.label or pending.nonce} "
+                    f"(nonce {pending.nonce}, gas price {tx['gasPrice']})")
+
+    def check_pending(self):
+        """Collect receipts and replace stuck transactions; returns how many confirmed"""
+        with self._check_lock:
+            return self._check_pending()
+
+    def _check_pending(self):
+        with self._lock:
+            waiting = [self._pending[nonce] for nonce in sorted(self._pending)]
+        confirmed = 0
+        for pending in waiting:
+            receipt = self._receipt(pending)
+            if receipt is not None:
+                self._finish(pending, receipt)
+                confirmed += 1
+                continue
+            if self._clock() - pending.sent_at < self.replace_after:
+                # Later nonces from this account cannot be mined before this one
+                break
+            if pending.replacements >= self.max_replacements:
+                self.nonces.resync()
+                self._finish(pending, error=TimeoutError(
+                    f"Transaction with nonce {pending.nonce} not mined after "
+                    f"{pending.replacements} replacements"))
+                continue
+            self._replace(pending)
+            break
+        return confirmed
+
+    def _confirm_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.check_pending()
+            except Exception as e:
+                logger.error(f"Error checking transaction receipts: {e}")
+            if self._stop.wait(self.poll_interval):
+                return
+            with self._lock:
+                if not self._pending:
+                    # Nothing left to watch; the next submit() starts a new thread
+                    self._confirmer = None
+                    return
+
+    def flush(self, timeout=None):
+        """Wait until every submitted transaction is confirmed or failed"""
+        with self._lock:
+            futures = [pending.future for pending in self._pending.values()]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for future in futures:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                future.result(timeout=remaining)
+            except Exception:
+                pass  # Failures are reported through each Future
+        return self.pending_count() == 0
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        with self._lock:
+            self._stop.set()
+            self._confirmer = None
+
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "confirmed": self.confirmed,
+            "failed": self.failed,
+            "replaced": self.replaced,
+            "pending": self.pending_count(),
+        }
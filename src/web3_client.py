@@ -0,0 +1,249 @@
+"""
+Shared Web3 client for the oracle and the blockchain viewer
+@description: One Web3 instance per set of RPC URLs, posting over a pooled
+keep-alive HTTP session per URL, with contract objects cached by address
+and ABI. Given several URLs, requests go to the endpoint with the lowest
+measured latency and fail over to the next one on connection errors,
+timeouts and HTTP errors; a failed endpoint sits out a cooldown.
+
+Usage:
+    RPC_URL=https://sepolia.infura.io/v3/KEY,https://rpc.sepolia.org python oracle_service.py
+
+JSON-RPC errors (reverts, invalid params) are answers, not failures, and
+are returned from the endpoint that gave them.
+
+Transaction sends, nonce counts and receipt lookups depend on one node's
+mempool, and a send that timed out may still have been accepted. These go
+to one sticky primary endpoint and only move to another when the primary
+cannot be connected to at all.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+from web3 import Web3
+from web3.exceptions import ProviderConnectionError
+from web3.providers.base import JSONBaseProvider
+
+logger = logging.getLogger(__name__)
+
+LATENCY_SMOOTHING = 0.3  # Weight of the newest sample in each endpoint's latency average
+
+# Methods pinned to the primary endpoint (see the module docstring)
+STICKY_METHODS = frozenset({
+    "eth_sendRawTransaction",
+    "eth_sendTransaction",
+    "eth_getTransactionCount",
+    "eth_getTransactionReceipt",
+    "eth_getTransactionByHash",
+})
+
+_sessions = {}
+_clients = {}
+_lock = threading.Lock()
+
+
+def sort_by_response_id(responses):
+    """Batch responses in request order; JSON-RPC lets a node answer in any order"""
+    if all(response.get("id") is not None for response in responses):
+        return sorted(responses, key=lambda response: response["id"])
+    # Some errors come back without an id; rely on the node's order then
+    return responses
+
+
+def parse_rpc_urls(rpc_urls):
+    """A list of URLs from a list or a comma-separated string"""
+    if isinstance(rpc_urls, str):
+        rpc_urls = rpc_urls.split(",")
+    urls = [url.strip() for url in rpc_urls if url and url.strip()]
+    if not urls:
+        raise ValueError("At least one RPC URL is required")
+    return urls
+
+
+def get_session(url):
+    """The pooled keep-alive session for one RPC URL, shared by every thread and client"""
+    with _lock:
+        session = _sessions.get(url)
+        if session is None:
+            pool_size = int(os.getenv("RPC_POOL_SIZE", "16"))
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+            _sessions[url] = session
+        return session
+
+
+def never_sent(error):
+    """True if a request failed before reaching the node (refused or no connection made)"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    # urllib3's NewConnectionError (connection refused) is a ConnectTimeoutError
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, ConnectTimeoutError)
+
+
+class RpcEndpoint:
+    """One RPC URL with its smoothed latency and failure state"""
+
+    def __init__(self, url, position):
+        self.url = url
+        self.position = position
+        self.latency = None
+        self.measured_at = None
+        self.failed_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def record(self, latency, now):
+        self.requests += 1
+        self.latency = latency if self.latency is None else (
+            LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self.latency)
+        self.measured_at = now
+        self.failed_until = 0.0
+
+    def fail(self, now, cooldown):
+        self.requests += 1
+        self.failures += 1
+        self.failed_until = now + cooldown
+
+    def stats(self):
+        return {
+            "url": self.url,
+            "latency_ms": None if self.latency is None else self.latency * 1000,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class FailoverHTTPProvider(JSONBaseProvider):
+    """
+    JSON-RPC over HTTP to the fastest healthy endpoint of several.
+
+    Endpoints not measured yet, or not measured for probe_interval seconds,
+    are tried first so every endpoint's latency stays current; the rest are
+    tried fastest first. Endpoints in their cooldown are only tried when
+    all of them are. STICKY_METHODS go to the primary endpoint instead.
+    """
+
+    def __init__(self, endpoint_uris, timeout=None, cooldown=None, probe_interval=60.0, clock=time.monotonic):
+        super().__init__()
+        self.endpoints = [RpcEndpoint(url, position) for position, url in enumerate(parse_rpc_urls(endpoint_uris))]
+        self.timeout = timeout or float(os.getenv("RPC_TIMEOUT", "10"))
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv("RPC_FAILOVER_COOLDOWN", "30"))
+        self.probe_interval = probe_interval
+        self.clock = clock
+        self.primary = self.endpoints[0]
+        self._stats_lock = threading.Lock()
+
+    def __str__(self):
+        return f"FailoverHTTPProvider({', '.join(endpoint.url for endpoint in self.endpoints)})"
+
+    def ordered_endpoints(self):
+        now = self.clock()
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.failed_until <= now]
+        cooling = sorted((endpoint for endpoint in self.endpoints if endpoint.failed_until > now),
+                         key=lambda endpoint: endpoint.failed_until)
+
+        def priority(endpoint):
+            stale = endpoint.measured_at is None or now - endpoint.measured_at > self.probe_interval
+            return (not stale, endpoint.latency or 0.0, endpoint.position)
+
+        return sorted(healthy, key=priority) + cooling
+
+    def _post(self, endpoint, data):
+        started = self.clock()
+        response = get_session(endpoint.url).post(
+            endpoint.url, data=data, headers={"Content-Type": "application/json"}, timeout=self.timeout)
+        response.raise_for_status()
+        finished = self.clock()
+        with self._stats_lock:
+            endpoint.record(finished - started, finished)
+        return response.content
+
+    def _send(self, data):
+        errors = []
+        for endpoint in self.ordered_endpoints():
+            try:
+                return self._post(endpoint, data)
+            except (requests.RequestException, OSError) as e:
+                with self._stats_lock:
+                    endpoint.fail(self.clock(), self.cooldown)
+                errors.append(f"{endpoint.url}: {e}")
+                if len(self.endpoints) > 1:
+                    logger.warning(f"RPC endpoint {endpoint.url} failed ({e}); trying the next one")
+        raise ProviderConnectionError(f"All RPC endpoints failed: {'; '.join(errors)}")
+
+    def _send_sticky(self, data):
+        """Send to the primary; move to another endpoint only if the primary never got the request"""
+        errors = []
+        for _ in self.endpoints:
+            endpoint = self.primary
+            try:
+                return self._post(endpoint, data)
+            except (requests.RequestException, OSError) as e:
+                with self._stats_lock:
+                    endpoint.fail(self.clock(), self.cooldown)
+                if not never_sent(e):
+                    # The node may have acted on it (e.g. accepted a transaction): no retry elsewhere
+                    raise ProviderConnectionError(f"{endpoint.url}: {e}") from e
+                errors.append(f"{endpoint.url}: {e}")
+                with self._stats_lock:
+                    self.primary = self.ordered_endpoints()[0]
+                logger.warning(f"Primary RPC endpoint {endpoint.url} is unreachable; "
+                               f"switching to {self.primary.url}")
+        raise ProviderConnectionError(f"All RPC endpoints failed: {'; '.join(errors)}")
+
+    def make_request(self, method, params):
+        data = self.encode_rpc_request(method, params)
+        return self.decode_rpc_response(self._send_sticky(data) if method in STICKY_METHODS else self._send(data))
+
+    def make_batch_request(self, batch_requests):
+        data = self.encode_batch_rpc_request(batch_requests)
+        sticky = any(method in STICKY_METHODS for method, _ in batch_requests)
+        response = self.decode_rpc_response(self._send_sticky(data) if sticky else self._send(data))
+        if not isinstance(response, list):
+            return response  # The node rejected the whole batch
+        return sort_by_response_id(response)
+
+    def stats(self):
+        with self._stats_lock:
+            return [endpoint.stats() for endpoint in self.endpoints]
+
+
+class Web3Client:
+    """A Web3 instance over FailoverHTTPProvider, plus a cache of contract objects"""
+
+    def __init__(self, rpc_urls, timeout=None, cooldown=None):
+        self.rpc_urls = parse_rpc_urls(rpc_urls)
+        self.provider = FailoverHTTPProvider(self.rpc_urls, timeout=timeout, cooldown=cooldown)
+        self.w3 = Web3(self.provider)
+        self._contracts = {}
+        self._contracts_lock = threading.Lock()
+
+    def contract(self, address, abi):
+        """The contract object for address and abi, built on first use"""
+        key = (Web3.to_checksum_address(address), json.dumps(abi, sort_keys=True))
+        with self._contracts_lock:
+            contract = self._contracts.get(key)
+            if contract is None:
+                contract = self.w3.eth.contract(address=key[0], abi=abi)
+                self._contracts[key] = contract
+            return contract
+
+
+def get_client(rpc_urls=None):
+    """The shared Web3Client for rpc_urls (default: RPC_URL, comma-separated for failover)"""
+    urls = tuple(parse_rpc_urls(rpc_urls or os.getenv("RPC_URL", "http://localhost:8545")))
+    with _lock:
+        client = _clients.get(urls)
+        if client is None:
+            client = Web3Client(urls)
+            _clients[urls] = client
+        return client
@@ -4,6 +4,7 @@ Service Startup Script for Fraud Detection System
 This script helps you start all services in the correct order
 """
 
+import argparse
 import subprocess
 import time
 import sys
@@ -34,8 +35,8 @@ def check_port_available(port):
     except OSError:
         return False
 
-def start_ml_api():
-    """Start the ML API service"""
+def start_ml_api(workers=1):
+    """Start the ML API service (pre-forked across processes when workers > 1)"""
     print_header("Starting ML API Service")
     
     if not check_port_available(5000):
@@ -46,11 +47,15 @@ def start_ml_api():
     print_info("Starting ML API on port 5000...")
     print_info("This will start the Flask API serving your fraud detection model")
     
+    if workers > 1:
+        print_info(f"Using {workers} worker processes")
+        command = [sys.executable, "serve.py", "--workers", str(workers), "--port", "5000"]
+    else:
+        command = [sys.executable, "app.py"]
+    
     try:
         # Start the ML API
-        process = subprocess.Popen([
-            sys.executable, "app.py"
-        ], cwd=Path(__file__).parent / "src")
+        process = subprocess.Popen(command, cwd=Path(__file__).parent / "src")
         
         # Wait a bit for the service to start
         time.sleep(3)
@@ -102,6 +107,15 @@ def start_web_interface():
 
 def main():
     """Main function to start all services"""
+    parser = argparse.ArgumentParser(description="Start the Fraud Detection System services")
+    parser.add_argument(
+        "--api-workers",
+        type=int,
+        default=1,
+        help="Number of ML API worker processes (default: 1, the Flask dev server)"
+    )
+    args = parser.parse_args()
+    
     print("🚀 Fraud Detection System - Service Startup")
     print("This script will help you start all services")
     
@@ -134,7 +148,7 @@ def main():
     processes = []
     
     if not ml_running:
-        ml_process = start_ml_api()
+        ml_process = start_ml_api(args.api_workers)
         if ml_process:
             processes.append(("ML API", ml_process))
         else:
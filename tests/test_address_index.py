@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from address_index import AddressIndex, SortedAddressIndex, build_feature_matrix
+
+class TestAddressIndex(unittest.TestCase):
+    """Test the address lookup index"""
+    
+    def setUp(self):
+        """Setup test data"""
+        self.addresses = [
+            "0x00009277775ac7d0d59eaad8fee3d10ac6c805e8",
+            "0x0002b44ddb1476db43c868bd494422ee4c136fed",
+            "0x0002bda54cb772d040f779e88eb453cac0daa244",
+            "0x00009277775ac7d0d59eaad8fee3d10ac6c805e8"  # duplicate row
+        ]
+        self.index = AddressIndex(self.addresses)
+    
+    def test_lookup_known_address(self):
+        """Test known addresses resolve to their row"""
+        self.assertEqual(self.index.get(self.addresses[1]), 1)
+        self.assertEqual(self.index.get(self.addresses[2]), 2)
+    
+    def test_lookup_is_case_insensitive(self):
+        """Test checksummed addresses find the lowercase row"""
+        self.assertEqual(self.index.get(self.addresses[1].upper().replace('0X', '0x')), 1)
+    
+    def test_duplicate_keeps_first_row(self):
+        """Test duplicates resolve to the first occurrence"""
+        self.assertEqual(self.index.get(self.addresses[0]), 0)
+        self.assertEqual(len(self.index), 4)
+    
+    def test_unknown_address(self):
+        """Test unknown addresses return None"""
+        self.assertIsNone(self.index.get("0x1234567890123456789012345678901234567890"))
+        self.assertNotIn("0x1234567890123456789012345678901234567890", self.index)
+    
+    def test_get_many(self):
+        """Test resolving a batch of addresses"""
+        rows = self.index.get_many([self.addresses[2], "0xdead", self.addresses[0]])
+        np.testing.assert_array_equal(rows, [2, -1, 0])
+    
+    def test_build_feature_matrix(self):
+        """Test the feature matrix is contiguous float64"""
+        df = pd.DataFrame({'a': [1, 2], 'b': [0.5, 1.5], 'name': ['x', 'y']})
+        matrix = build_feature_matrix(df, ['a', 'b'])
+        
+        self.assertEqual(matrix.dtype, np.float64)
+        self.assertTrue(matrix.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(matrix, [[1, 0.5], [2, 1.5]])
+
+class TestSortedAddressIndex(TestAddressIndex):
+    """Run the same lookups against the binary-search index"""
+    
+    def setUp(self):
+        """Setup test data"""
+        super().setUp()
+        self.index = SortedAddressIndex.from_addresses(self.addresses)
+    
+    def test_longer_query_does_not_match_prefix(self):
+        """Test queries wider than the stored keys are rejected, not truncated"""
+        self.assertIsNone(self.index.get(self.addresses[1] + "ff"))
+    
+    def test_empty_batch(self):
+        """Test resolving no addresses"""
+        self.assertEqual(len(self.index.get_many([])), 0)
+
+if __name__ == '__main__':
+    unittest.main()
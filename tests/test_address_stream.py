@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+import io
+import json
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from address_stream import parse_address_line, iter_address_lines, iter_chunks
+
+class TestAddressStream(unittest.TestCase):
+    """Test line-by-line parsing of streamed address lists"""
+    
+    def setUp(self):
+        """Setup test data"""
+        self.address = "0x00009277775ac7d0d59eaad8fee3d10ac6c805e8"
+    
+    def test_parse_line_formats(self):
+        """Test bare, JSON string and JSON object lines"""
+        self.assertEqual(parse_address_line(self.address + "\r\n"), self.address)
+        self.assertEqual(parse_address_line(json.dumps(self.address)), self.address)
+        self.assertEqual(parse_address_line(json.dumps({'address': self.address, 'tag': 1})), self.address)
+        self.assertIsNone(parse_address_line("   \n"))
+    
+    def test_parse_line_rejects_other_json(self):
+        """Test JSON without an address raises ValueError"""
+        with self.assertRaises(ValueError):
+            parse_address_line(json.dumps({'addr': self.address}))
+        with self.assertRaises(ValueError):
+            parse_address_line("{broken")
+    
+    def test_iter_lines_reports_errors_in_order(self):
+        """Test invalid lines are reported where they occur"""
+        stream = io.BytesIO(b"a\n\n{bad\n\xff\xfe\nb")
+        
+        items = list(iter_address_lines(stream))
+        
+        self.assertEqual([address for address, _ in items], ["a", None, None, "b"])
+        self.assertIsNone(items[0][1])
+        self.assertIsNotNone(items[1][1])
+        self.assertIsNotNone(items[2][1])
+    
+    def test_iter_lines_skips_oversized_line(self):
+        """Test an oversized line is skipped as a whole"""
+        stream = io.BytesIO(b"a\n" + b"x" * 100 + b"\nb\n")
+        
+        items = list(iter_address_lines(stream, max_line_bytes=16))
+        
+        self.assertEqual([address for address, _ in items], ["a", None, "b"])
+        self.assertIn("longer than 16", items[1][1])
+    
+    def test_iter_chunks(self):
+        """Test chunking keeps order and emits the remainder"""
+        self.assertEqual(list(iter_chunks(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(list(iter_chunks([], 3)), [])
+        with self.assertRaises(ValueError):
+            list(iter_chunks(range(3), 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,18 @@
 import unittest
+from unittest.mock import patch
 import json
 import sys
 import os
 import tempfile
 import shutil
+import threading
+import time
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from app import app
+import app as api_module
 import joblib
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
@@ -102,10 +106,372 @@ class TestAPI(unittest.TestCase):
         # Should either return 200 (if implemented) or 404 (if not implemented)
         self.assertIn(response.status_code, [200, 404])
     
+    def test_metrics_endpoint(self):
+        """Test metrics endpoint"""
+        response = self.client.get('/metrics')
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertIn('coalescer', data)
+    
     def test_nonexistent_endpoint(self):
         """Test 404 for bad endpoint"""
         response = self.client.get('/nonexistent')
         self.assertEqual(response.status_code, 404)
 
+class TestAPIPredictions(unittest.TestCase):
+    """Test predictions against addresses that exist in the dataset"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Swap in a model that matches the dataset features"""
+        cls.original_model = api_module.state.model
+        
+        X = api_module.state.feature_matrix
+        y = api_module.state.feature_store.labels
+        cls.model = RandomForestClassifier(n_estimators=5, max_depth=6, random_state=42)
+        cls.model.fit(X, y)
+        api_module.state.model = cls.model
+        
+        app.config['TESTING'] = True
+        cls.client = app.test_client()
+        cls.known_address = api_module.state.feature_store.address_at(3)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Restore the original model"""
+        api_module.state.model = cls.original_model
+    
+    def test_predict_known_address(self):
+        """Test predict uses the row for the requested address"""
+        response = self.client.post('/predict',
+                                  data=json.dumps({'address': self.known_address.upper().replace('0X', '0x')}),
+                                  content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        expected = self.model.predict_proba(api_module.state.feature_matrix[3:4])[0][1]
+        self.assertAlmostEqual(data['probability'], expected)
+    
+    def test_batch_predict_mixed_addresses(self):
+        """Test batch predict keeps order and marks unknown addresses"""
+        unknown = "0x1234567890123456789012345678901234567890"
+        response = self.client.post('/batch_predict',
+                                  data=json.dumps({'addresses': [unknown, self.known_address]}),
+                                  content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data)['results']
+        self.assertEqual(results[0]['address'], unknown)
+        self.assertIsNone(results[0]['prediction'])
+        self.assertEqual(results[1]['address'], self.known_address)
+        self.assertIn(results[1]['prediction'], [0, 1])
+    
+    def test_batch_predict_scores_in_one_call(self):
+        """Test batch predict makes a single predict_proba call"""
+        addresses = [api_module.state.feature_store.address_at(row) for row in [5, 0, 7]]
+        addresses.insert(1, "0x1234567890123456789012345678901234567890")
+        
+        with patch.object(self.model, 'predict_proba', wraps=self.model.predict_proba) as mock_proba:
+            response = self.client.post('/batch_predict',
+                                      data=json.dumps({'addresses': addresses}),
+                                      content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_proba.call_count, 1)
+        
+        results = json.loads(response.data)['results']
+        self.assertEqual([r['address'] for r in results], addresses)
+        self.assertEqual(results[1]['error'], "Address not found")
+        expected = self.model.predict_proba(api_module.state.feature_matrix[[5, 0, 7]])
+        for result, proba in zip([results[0], results[2], results[3]], expected):
+            self.assertAlmostEqual(result['probability'], proba[1])
+            self.assertEqual(result['prediction'], int(np.argmax(proba)))
+    
+    def test_predict_serves_precomputed_table(self):
+        """Test predictions come from the table when it is enabled"""
+        from prediction_table import PredictionTable
+        table = PredictionTable.build(api_module.state.feature_matrix, api_module.state.score_live, 'm', 'd')
+        
+        with patch.object(api_module.state, 'prediction_table', table), \
+                patch.object(self.model, 'predict_proba') as mock_proba:
+            response = self.client.post('/predict',
+                                      data=json.dumps({'address': self.known_address}),
+                                      content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        mock_proba.assert_not_called()
+        self.assertAlmostEqual(json.loads(response.data)['probability'], table.probabilities[3])
+    
+    def test_compiled_engine_matches_sklearn(self):
+        """Test the compiled engine gives the same batch results"""
+        from forest_inference import CompiledForest
+        addresses = [api_module.state.feature_store.address_at(row) for row in range(20)]
+        
+        def batch():
+            response = self.client.post('/batch_predict',
+                                      data=json.dumps({'addresses': addresses}),
+                                      content_type='application/json')
+            return json.loads(response.data)['results']
+        
+        expected = batch()
+        with patch.object(api_module.state, 'compiled_forest', CompiledForest.from_model(self.model)), \
+                patch.object(self.model, 'predict_proba') as mock_proba:
+            results = batch()
+        
+        mock_proba.assert_not_called()
+        self.assertEqual(results, expected)
+    
+    def test_predict_through_coalescer(self):
+        """Test single predictions can be routed through the coalescer"""
+        from request_coalescer import RequestCoalescer
+        coalescer = RequestCoalescer(api_module.state.score_rows, window_ms=1)
+        
+        with patch.object(api_module.state, 'coalescer', coalescer):
+            response = self.client.post('/predict',
+                                      data=json.dumps({'address': self.known_address}),
+                                      content_type='application/json')
+            metrics = json.loads(self.client.get('/metrics').data)
+        coalescer.close()
+        
+        self.assertEqual(response.status_code, 200)
+        expected = self.model.predict_proba(api_module.state.feature_matrix[3:4])[0][1]
+        self.assertAlmostEqual(json.loads(response.data)['probability'], expected)
+        self.assertEqual(metrics['coalescer']['requests'], 1)
+    
+    def test_predict_uses_cache(self):
+        """Test repeated predictions are served from the cache"""
+        from prediction_cache import PredictionCache
+        cache = PredictionCache(max_size=10)
+        
+        def predict():
+            return self.client.post('/predict',
+                                  data=json.dumps({'address': self.known_address}),
+                                  content_type='application/json')
+        
+        with patch.object(api_module, 'prediction_cache', cache):
+            first = json.loads(predict().data)
+            with patch.object(self.model, 'predict_proba') as mock_proba:
+                second = json.loads(predict().data)
+            metrics = json.loads(self.client.get('/metrics').data)
+        
+        mock_proba.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(metrics['cache']['hits'], 1)
+        self.assertEqual(metrics['cache']['misses'], 1)
+
+    def test_stream_matches_batch_predict(self):
+        """Test the streaming endpoint returns the same results as batch predict, one per line"""
+        unknown = "0x1234567890123456789012345678901234567890"
+        addresses = [api_module.state.feature_store.address_at(row) for row in range(10)] + [unknown]
+        body = "\n".join(addresses[:5]) + "\n" + "\n".join(json.dumps({'address': a}) for a in addresses[5:])
+        
+        response = self.client.post('/batch_predict/stream?chunk_size=3', data=body,
+                                  content_type='application/x-ndjson')
+        expected = json.loads(self.client.post('/batch_predict',
+                                             data=json.dumps({'addresses': addresses}),
+                                             content_type='application/json').data)['results']
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(results, expected)
+    
+    def test_stream_scores_one_chunk_per_call(self):
+        """Test the stream scores each chunk with a single model call"""
+        body = "\n".join(api_module.state.feature_store.address_at(row) for row in range(10))
+        
+        with patch.object(self.model, 'predict_proba', wraps=self.model.predict_proba) as mock_proba:
+            response = self.client.post('/batch_predict/stream?chunk_size=4', data=body)
+            response.get_data()
+        
+        self.assertEqual(mock_proba.call_count, 3)
+    
+    def test_stream_reports_invalid_lines_in_place(self):
+        """Test bad lines get an error record without stopping the stream"""
+        body = self.known_address + "\n{not json\n\n" + json.dumps({'addr': 'x'}) + "\n" + self.known_address
+        
+        response = self.client.post('/batch_predict/stream', data=body)
+        
+        results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]['address'], self.known_address)
+        self.assertIn('Invalid line', results[1]['error'])
+        self.assertIn('Invalid line', results[2]['error'])
+        self.assertEqual(results[3], results[0])
+    
+    def test_stream_rejects_bad_chunk_size(self):
+        """Test chunk_size must be positive"""
+        response = self.client.post('/batch_predict/stream?chunk_size=0', data=self.known_address)
+        self.assertEqual(response.status_code, 400)
+
+    def test_predict_features_single_and_batch(self):
+        """Test raw feature vectors are scored without an address lookup"""
+        X = api_module.state.feature_matrix[[3, 8]]
+        expected = self.model.predict_proba(X)[:, 1]
+        
+        single = self.client.post('/predict_features',
+                                data=json.dumps({'features': X[0].tolist()}),
+                                content_type='application/json')
+        batch = self.client.post('/predict_features',
+                               data=json.dumps({'features': X.tolist()}),
+                               content_type='application/json')
+        
+        self.assertEqual(single.status_code, 200)
+        self.assertAlmostEqual(json.loads(single.data)['probability'], expected[0])
+        self.assertEqual(batch.status_code, 200)
+        np.testing.assert_allclose(json.loads(batch.data)['probabilities'], expected)
+    
+    def test_predict_features_binary(self):
+        """Test packed float32 input, raw and base64"""
+        import base64
+        X = api_module.state.feature_matrix[:4].astype('<f4')
+        expected = self.model.predict_proba(X)[:, 1]
+        
+        raw = self.client.post('/predict_features', data=X.tobytes(),
+                             content_type='application/octet-stream')
+        encoded = self.client.post('/predict_features',
+                                 data=json.dumps({'features_b64': base64.b64encode(X.tobytes()).decode()}),
+                                 content_type='application/json')
+        
+        self.assertEqual(raw.status_code, 200)
+        np.testing.assert_allclose(json.loads(raw.data)['probabilities'], expected)
+        self.assertEqual(json.loads(encoded.data), json.loads(raw.data))
+    
+    def test_predict_features_rejects_bad_input(self):
+        """Test invalid vectors get a 400 with the expected width"""
+        n_features = len(api_module.state.feature_columns)
+        for body in ({'features': [1, 2, 3]}, {'features': [float('nan')] * n_features}, {'values': []}):
+            response = self.client.post('/predict_features', data=json.dumps(body),
+                                      content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        
+        response = self.client.post('/predict_features', data=b"\x00" * 6,
+                                  content_type='application/octet-stream')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data)['feature_count'], n_features)
+
+class TestModelReload(unittest.TestCase):
+    """Test zero-downtime model reloads"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Save models that match the dataset to reload from"""
+        cls.temp_dir = tempfile.mkdtemp()
+        X = api_module.state.feature_matrix
+        y = api_module.state.feature_store.labels
+        
+        cls.good_model_path = os.path.join(cls.temp_dir, 'good_model.joblib')
+        joblib.dump(RandomForestClassifier(n_estimators=3, max_depth=4, random_state=1).fit(X, y),
+                    cls.good_model_path)
+        
+        cls.bad_model_path = os.path.join(cls.temp_dir, 'bad_model.joblib')
+        joblib.dump(RandomForestClassifier(n_estimators=2).fit(X[:, :3], y), cls.bad_model_path)
+        
+        app.config['TESTING'] = True
+        cls.client = app.test_client()
+        cls.known_address = api_module.state.feature_store.address_at(3)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Cleanup"""
+        shutil.rmtree(cls.temp_dir)
+    
+    def setUp(self):
+        """Remember the serving state so each test can restore it"""
+        self.original_state = api_module.state
+    
+    def tearDown(self):
+        """Restore the serving state"""
+        api_module.state = self.original_state
+    
+    def reload(self, model_path, wait=True):
+        with patch.object(api_module, 'candidate_model_paths', [model_path]):
+            return self.client.post('/reload',
+                                  data=json.dumps({'wait': wait}),
+                                  content_type='application/json')
+    
+    def test_reload_swaps_model(self):
+        """Test a reload serves the new model"""
+        response = self.reload(self.good_model_path)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['status'], 'ready')
+        self.assertIsNot(api_module.state, self.original_state)
+        self.assertEqual(api_module.state.model_path, self.good_model_path)
+        
+        info = json.loads(self.client.get('/model_info').data)
+        self.assertEqual(info['model_fingerprint'], api_module.state.model_fingerprint)
+        
+        response = self.client.post('/predict',
+                                  data=json.dumps({'address': self.known_address}),
+                                  content_type='application/json')
+        expected = api_module.state.model.predict_proba(api_module.state.feature_matrix[3:4])[0][1]
+        self.assertAlmostEqual(json.loads(response.data)['probability'], expected)
+    
+    def test_failed_reload_keeps_old_model(self):
+        """Test a model that fails warm-up is never swapped in"""
+        response = self.reload(self.bad_model_path)
+        
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(json.loads(response.data)['status'], 'failed')
+        self.assertIs(api_module.state, self.original_state)
+        self.assertEqual(json.loads(self.client.get('/reload').data)['status'], 'failed')
+    
+    def test_concurrent_reload_is_rejected(self):
+        """Test only one reload runs at a time"""
+        api_module._reload_lock.acquire()
+        try:
+            response = self.reload(self.good_model_path)
+        finally:
+            api_module._reload_lock.release()
+        
+        self.assertEqual(response.status_code, 409)
+    
+    def test_reload_invalidates_cache(self):
+        """Test cached predictions from the old model are dropped"""
+        from prediction_cache import PredictionCache
+        cache = PredictionCache(max_size=10)
+        cache.put(self.known_address, api_module.state.cache_key, (1, 0.99))
+        
+        with patch.object(api_module, 'prediction_cache', cache):
+            self.reload(self.good_model_path)
+        
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()['invalidations'], 1)
+    
+    def test_no_failed_requests_during_background_reload(self):
+        """Test requests keep succeeding while a reload runs in the background"""
+        self.reload(self.good_model_path)  # Start from a model that can score the dataset
+        statuses = []
+        stop = threading.Event()
+        
+        def hammer():
+            client = app.test_client()
+            while not stop.is_set():
+                response = client.post('/predict',
+                                     data=json.dumps({'address': self.known_address}),
+                                     content_type='application/json')
+                statuses.append(response.status_code)
+        
+        threads = [threading.Thread(target=hammer) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        
+        response = self.reload(self.good_model_path, wait=False)
+        self.assertEqual(response.status_code, 202)
+        deadline = time.time() + 30
+        while api_module.reload_status['status'] == 'reloading' and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        
+        stop.set()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(api_module.reload_status['status'], 'ready')
+        self.assertGreater(len(statuses), 0)
+        self.assertEqual(set(statuses), {200})
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import csv
+import io
+import json
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from unittest.mock import Mock
+
+from eth_abi import encode
+from web3 import Web3
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from assessment_export import export_assessments
+from bulk_reads import ASSESSMENT_TYPES
+from oracle_service import CONTRACT_ABI
+
+CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+class SlowNode:
+    """Batched eth_calls that take a while, recording how many batches overlap"""
+    
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+    
+    def make_batch_request(self, requests):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return [{"result": "0x" + encode(ASSESSMENT_TYPES, (True, True, int(call["data"][-2:], 16), 0, 5000, 0, 9000)).hex()}
+                for _, (call, _) in requests]
+
+class TestAssessmentExport(unittest.TestCase):
+    """Test the non-interactive assessment export"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.node = SlowNode()
+        self.w3 = Mock(codec=Web3().codec, provider=self.node)
+        self.contract = Web3().eth.contract(address=CONTRACT, abi=CONTRACT_ABI)
+        self.addresses = [f"0x{i:040x}" for i in range(1, 101)]
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+    
+    def export(self, input_path, output_name, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            return export_assessments(self.w3, self.contract, input_path, self.path(output_name), **kwargs)
+    
+    def test_csv_export_keeps_input_order_with_bounded_concurrency(self):
+        """Test rows come out in input order while at most `concurrency` batches are read at once"""
+        with open(self.path("watchlist.txt"), "w") as handle:
+            handle.write("\n".join(self.addresses[:50] + ["not-an-address"] + self.addresses[50:]) + "\n")
+    
+        summary = self.export(self.path("watchlist.txt"), "out.csv", concurrency=3, chunk_size=10)
+    
+        with open(self.path("out.csv"), newline="") as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertEqual([row["address"] for row in rows], self.addresses[:50] + ["not-an-address"] + self.addresses[50:])
+        self.assertEqual(rows[0]["mlConfidence"], "1")
+        self.assertEqual(rows[50]["error"], "Invalid address")
+        self.assertEqual(summary["rows"], 101)
+        self.assertEqual(summary["errors"], 1)
+        self.assertLessEqual(self.node.max_active, 3)
+        self.assertGreater(self.node.max_active, 1)
+    
+    def test_jsonl_export_from_csv_input(self):
+        """Test a CSV watchlist with a full_address column exports to JSONL"""
+        with open(self.path("watchlist.csv"), "w") as handle:
+            handle.write("full_address,label\n" + "".join(f"{a},x\n" for a in self.addresses[:5]))
+    
+        self.export(self.path("watchlist.csv"), "out.jsonl", concurrency=1)
+    
+        with open(self.path("out.jsonl")) as handle:
+            rows = [json.loads(line) for line in handle]
+        self.assertEqual([row["address"] for row in rows], self.addresses[:5])
+        self.assertIs(rows[2]["mlIsFraudulent"], True)
+        self.assertEqual(rows[2]["overallRisk"], 9000)
+        self.assertIsNone(rows[2]["error"])
+    
+    def test_unparsable_lines_get_error_rows(self):
+        """Test every NDJSON line gets an output row, including lines without an address"""
+        with open(self.path("watchlist.ndjson"), "w") as handle:
+            handle.write(json.dumps({"address": self.addresses[0]}) + "\n" + '{"id": 7}\n' +
+                         json.dumps(self.addresses[1]) + "\n")
+    
+        summary = self.export(self.path("watchlist.ndjson"), "out.jsonl", concurrency=1)
+    
+        with open(self.path("out.jsonl")) as handle:
+            rows = [json.loads(line) for line in handle]
+        self.assertEqual([row["address"] for row in rows], [self.addresses[0], None, self.addresses[1]])
+        self.assertTrue(rows[1]["error"].startswith("Invalid line"))
+        self.assertIsNone(rows[1]["overallRisk"])
+        self.assertIsNone(rows[2]["error"])
+        self.assertEqual(summary["errors"], 1)
+    
+    def test_progress_is_reported(self):
+        """Test progress lines are printed while the export runs"""
+        with open(self.path("watchlist.txt"), "w") as handle:
+            handle.write("\n".join(self.addresses))
+        output = io.StringIO()
+    
+        with redirect_stdout(output):
+            export_assessments(self.w3, self.contract, self.path("watchlist.txt"), self.path("out.csv"),
+                               concurrency=1, chunk_size=10, progress_interval=0.0)
+    
+        self.assertIn("100 addresses read", output.getvalue())
+        self.assertIn("Exported 100 assessments", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
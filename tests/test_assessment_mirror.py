@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from assessment_mirror import AssessmentMirror
+
+class TestAssessmentMirror(unittest.TestCase):
+    """Test the skip-unchanged decision and mirror warming"""
+    
+    def setUp(self):
+        self.mirror = AssessmentMirror(threshold=5)
+        self.mirror.record("0xAA", True, 80)
+    
+    def test_unknown_wallet_needs_write(self):
+        """Test wallets with nothing mirrored are always written"""
+        self.assertTrue(self.mirror.needs_write("0xbb", False, 10))
+    
+    def test_small_confidence_change_is_skipped(self):
+        """Test the same label within the threshold is not written again"""
+        self.assertFalse(self.mirror.needs_write("0xaa", True, 80))
+        self.assertFalse(self.mirror.needs_write("0xaa", True, 85))
+        self.assertTrue(self.mirror.needs_write("0xaa", True, 86))
+    
+    def test_label_flip_needs_write(self):
+        """Test a changed label is written even with the same confidence"""
+        self.assertTrue(self.mirror.needs_write("0xaa", False, 80))
+    
+    def test_warm_from_reads_caches_absent_wallets(self):
+        """Test reads fill the mirror, wallets without a prediction are not read twice and failed reads are retried"""
+        calls = []
+        
+        def read(addresses):
+            calls.append(list(addresses))
+            return {
+                "0xbb": {"hasMLPrediction": True, "mlIsFraudulent": False, "mlConfidence": 30},
+                "0xcc": {"hasMLPrediction": False, "mlIsFraudulent": False, "mlConfidence": 0},
+                "0xdd": None,
+            }
+        
+        self.mirror.warm_from_reads(["0xaa", "0xbb", "0xcc", "0xdd"], read)
+        self.mirror.warm_from_reads(["0xbb", "0xcc", "0xdd"], lambda addresses: calls.append(addresses) or {})
+        
+        self.assertEqual(calls, [["0xbb", "0xcc", "0xdd"], ["0xdd"]])
+        self.assertEqual(self.mirror.get("0xbb"), (False, 30))
+        self.assertTrue(self.mirror.needs_write("0xcc", False, 0))
+    
+    def test_warm_from_events_keeps_latest(self):
+        """Test later events for a wallet replace earlier ones"""
+        events = [
+            {"args": {"walletAddress": "0xBB", "hasMLPrediction": True, "mlIsFraudulent": True, "mlConfidence": 90}},
+            {"args": {"walletAddress": "0xBB", "hasMLPrediction": True, "mlIsFraudulent": False, "mlConfidence": 40}},
+        ]
+        
+        self.assertEqual(self.mirror.warm_from_events(events), 2)
+        self.assertEqual(self.mirror.get("0xbb"), (False, 40))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import sys
+import os
+import asyncio
+from unittest.mock import Mock
+
+from eth_abi import encode
+from web3 import Web3
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bulk_reads import ASSESSMENT_TYPES, RESPONSE_BYTES_PER_CALL, read_assessments, read_assessments_async
+from oracle_service import CONTRACT_ABI
+
+CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+class FakeNode:
+    """Answers batched eth_calls with an assessment whose confidence is the wallet's last byte"""
+    
+    def __init__(self, max_batch=None):
+        self.max_batch = max_batch
+        self.batches = []
+    
+    def make_batch_request(self, requests):
+        self.batches.append(len(requests))
+        if self.max_batch and len(requests) > self.max_batch:
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "batch too large"}}
+        responses = []
+        for method, (call, block) in requests:
+            wallet = call["data"][-2:]
+            if wallet == "ff":
+                responses.append({"jsonrpc": "2.0", "id": 1, "error": {"code": 3, "message": "execution reverted"}})
+                continue
+            values = (True, False, int(wallet, 16), 0, 5000, 0, 0)
+            responses.append({"jsonrpc": "2.0", "id": 1, "result": "0x" + encode(ASSESSMENT_TYPES, values).hex()})
+        return responses
+
+class TestBulkReads(unittest.TestCase):
+    """Test batched getFraudAssessment reads"""
+    
+    def setUp(self):
+        self.node = FakeNode()
+        self.w3 = Mock(codec=Web3().codec, provider=self.node)
+        self.contract = Web3().eth.contract(address=CONTRACT, abi=CONTRACT_ABI)
+    
+    def test_many_reads_per_round_trip(self):
+        """Test 2500 reads take three round trips and decode per address"""
+        addresses = [f"0x{i:040x}" for i in range(1, 2501)]
+        assessments = read_assessments(self.w3, self.contract, addresses, max_batch=1000)
+    
+        self.assertEqual(self.node.batches, [1000, 1000, 500])
+        self.assertEqual(list(assessments), addresses)
+        self.assertEqual(assessments[addresses[41]]["mlConfidence"], 42)
+        self.assertTrue(assessments[addresses[41]]["hasMLPrediction"])
+    
+    def test_duplicate_addresses_are_read_once(self):
+        """Test repeated addresses share one eth_call"""
+        addresses = [f"0x{i % 10 + 1:040x}" for i in range(100)]
+        assessments = read_assessments(self.w3, self.contract, addresses)
+    
+        self.assertEqual(self.node.batches, [10])
+        self.assertEqual(len(assessments), 10)
+    
+    def test_batches_are_sized_by_response_bytes(self):
+        """Test the response byte limit caps the calls per batch"""
+        addresses = [f"0x{i:040x}" for i in range(1, 26)]
+        read_assessments(self.w3, self.contract, addresses, max_batch=1000,
+                         max_response_bytes=10 * RESPONSE_BYTES_PER_CALL)
+    
+        self.assertEqual(self.node.batches, [10, 10, 5])
+    
+    def test_rejected_batches_are_halved(self):
+        """Test a batch the node refuses is split until it is accepted, and failed calls map to None"""
+        self.node.max_batch = 300
+        addresses = [f"0x{i:040x}" for i in range(1, 1001)]
+        assessments = read_assessments(self.w3, self.contract, addresses, max_batch=1000)
+    
+        self.assertEqual(self.node.batches[:3], [1000, 500, 250])
+        self.assertEqual(sum(self.node.batches[2:]), 1000)
+        self.assertEqual(len(assessments), 1000)
+        failed = [a for a, assessment in assessments.items() if assessment is None]
+        self.assertEqual(failed, [a for a in addresses if a.endswith("ff")])
+    
+    def test_unreachable_node_gives_up(self):
+        """Test connection errors map every address to None without one request per address"""
+        self.node.make_batch_request = Mock(side_effect=ConnectionError("refused"))
+        assessments = read_assessments(self.w3, self.contract, [f"0x{i:040x}" for i in range(1, 101)], max_batch=100)
+    
+        self.assertTrue(all(assessment is None for assessment in assessments.values()))
+        self.assertLessEqual(self.node.make_batch_request.call_count, 8)
+    
+    def test_async_reads(self):
+        """Test the AsyncWeb3 variant batches the same way"""
+        node = FakeNode(max_batch=64)
+    
+        async def make_batch_request(requests):
+            return node.make_batch_request(requests)
+    
+        w3 = Mock(codec=Web3().codec, provider=Mock(make_batch_request=make_batch_request))
+        addresses = [f"0x{i:040x}" for i in range(1, 201)]
+        assessments = asyncio.run(read_assessments_async(w3, self.contract, addresses, max_batch=100))
+    
+        self.assertEqual(node.batches, [100, 50, 50, 50, 50])
+        self.assertEqual(assessments[addresses[9]]["mlConfidence"], 10)
+
+if __name__ == '__main__':
+    unittest.main()
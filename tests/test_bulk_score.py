@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import pandas as pd
+import numpy as np
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bulk_score import bulk_score, detect_mode
+
+class TestBulkScore(unittest.TestCase):
+    """Test offline bulk scoring of address lists and feature files"""
+    
+    def setUp(self):
+        """Create a small dataset, model and input files"""
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.RandomState(0)
+        self.df = pd.DataFrame({
+            'full_address': [f"0x{i:040x}" for i in range(60)],
+            'is_fraud': rng.randint(0, 2, 60),
+            'sent_tnx': rng.rand(60),
+            'received_tnx': rng.rand(60),
+            'total_ether_balance': rng.rand(60),
+        })
+        self.data_path = os.path.join(self.temp_dir, 'cleaned_data.csv')
+        self.df.to_csv(self.data_path, index=False)
+        
+        self.features = ['sent_tnx', 'received_tnx', 'total_ether_balance']
+        self.model = RandomForestClassifier(n_estimators=5, random_state=42)
+        self.model.fit(self.df[self.features], self.df['is_fraud'])
+        self.model_path = os.path.join(self.temp_dir, 'model.joblib')
+        joblib.dump(self.model, self.model_path)
+        
+        self.expected = self.model.predict_proba(self.df[self.features])[:, 1]
+    
+    def tearDown(self):
+        """Cleanup"""
+        shutil.rmtree(self.temp_dir)
+    
+    def score(self, input_path, **kwargs):
+        output_path = os.path.join(self.temp_dir, 'scores.csv')
+        summary = bulk_score(input_path, output_path, model_path=self.model_path, chunk_size=7,
+                             data_path=self.data_path,
+                             feature_store_dir=os.path.join(self.temp_dir, 'no_store'), **kwargs)
+        return summary, pd.read_csv(output_path)
+    
+    def test_detect_mode(self):
+        """Test feature files and address lists are told apart"""
+        self.assertEqual(detect_mode(self.data_path, self.features), 'features')
+        self.assertEqual(detect_mode('addresses.txt', self.features), 'addresses')
+    
+    def test_score_feature_csv(self):
+        """Test a feature CSV is scored in input order"""
+        summary, result = self.score(self.data_path, workers=1)
+        
+        self.assertEqual(summary['mode'], 'features')
+        self.assertEqual(summary['rows'], 60)
+        self.assertEqual(result['address'].tolist(), self.df['full_address'].tolist())
+        np.testing.assert_allclose(result['probability'], self.expected)
+    
+    def test_score_address_list(self):
+        """Test addresses are looked up in the dataset and unknown ones are reported"""
+        input_path = os.path.join(self.temp_dir, 'addresses.txt')
+        addresses = [self.df['full_address'][5].upper().replace('0X', '0x'), '0xunknown', self.df['full_address'][2]]
+        with open(input_path, 'w') as handle:
+            handle.write("\n".join(addresses) + "\n")
+        
+        summary, result = self.score(input_path, workers=1)
+        
+        self.assertEqual(summary['mode'], 'addresses')
+        self.assertEqual(summary['not_found'], 1)
+        self.assertEqual(result['address'].tolist(), addresses)
+        self.assertAlmostEqual(result['probability'][0], self.expected[5])
+        self.assertTrue(np.isnan(result['probability'][1]))
+        self.assertEqual(result['error'][1], 'Address not found')
+        self.assertAlmostEqual(result['probability'][2], self.expected[2])
+    
+    def test_process_pool_matches_single_process(self):
+        """Test the process pool gives the same output, in order"""
+        _, single = self.score(self.data_path, workers=1)
+        summary, pooled = self.score(self.data_path, workers=2)
+        
+        self.assertEqual(summary['rows'], 60)
+        pd.testing.assert_frame_equal(single, pooled)
+    
+    def test_parquet_output(self):
+        """Test Parquet output when pyarrow is available"""
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest("pyarrow not installed")
+        output_path = os.path.join(self.temp_dir, 'scores.parquet')
+        
+        bulk_score(self.data_path, output_path, model_path=self.model_path, workers=1, chunk_size=7,
+                   data_path=self.data_path)
+        
+        np.testing.assert_allclose(pd.read_parquet(output_path)['probability'], self.expected)
+        
+        # Chunks without any unknown address must still append to the same file
+        input_path = os.path.join(self.temp_dir, 'addresses.txt')
+        with open(input_path, 'w') as handle:
+            handle.write(self.df['full_address'][0] + "\n0xunknown\n")
+        bulk_score(input_path, output_path, model_path=self.model_path, workers=1, chunk_size=1,
+                   data_path=self.data_path, feature_store_dir=os.path.join(self.temp_dir, 'no_store'))
+        
+        self.assertEqual(pd.read_parquet(output_path)['error'].tolist()[1], 'Address not found')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,7 @@ import tempfile
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from data_cleaning import clean_data
+from data_cleaning import clean_data, clean_data_streaming
 
 class TestDataCleaning(unittest.TestCase):
     """Test data cleaning functions"""
@@ -87,5 +87,64 @@ class TestDataCleaning(unittest.TestCase):
         self.assertNotIn('Unnamed: 0', cleaned_df.columns)
         self.assertNotIn('Index', cleaned_df.columns)
 
+class TestStreamingDataCleaning(unittest.TestCase):
+    """Test the chunked, fixed-schema cleaning mode"""
+    
+    def setUp(self):
+        """Setup test data with token-type columns and gaps"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_data = pd.DataFrame({
+            'Unnamed: 0': range(5),
+            'Index': range(5),
+            'Address': ['0x1', '0x2', None, '0x4', '0x5'],
+            'FLAG': [0, 1, 0, 1, 0],
+            'total ether received': [1.5, np.nan, 3.25, 4.0, 5.0],
+            'Total ERC20 tnxs': [1, 2, np.nan, 4, 5],
+            ' ERC20 most sent token type': ['OMG', None, 'BAT', 'OMG', None]
+        })
+        self.input_path = os.path.join(self.temp_dir, 'test_input.csv')
+        self.output_path = os.path.join(self.temp_dir, 'test_output.csv')
+        self.test_data.to_csv(self.input_path, index=False)
+    
+    def tearDown(self):
+        """Clean up"""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+    
+    def test_streaming_matches_clean_data(self):
+        """Test chunked output has the same columns and values as clean_data"""
+        expected_path = os.path.join(self.temp_dir, 'expected.csv')
+        clean_data(self.input_path, expected_path)
+    
+        rows = clean_data_streaming(self.input_path, self.output_path, chunk_size=2)
+    
+        self.assertEqual(rows, 5)
+        expected, cleaned = pd.read_csv(expected_path), pd.read_csv(self.output_path)
+        self.assertEqual(list(cleaned.columns), list(expected.columns))
+        pd.testing.assert_frame_equal(cleaned, expected, check_dtype=False)
+    
+    def test_streaming_fills_missing_values(self):
+        """Test numeric gaps become 0 and missing addresses and token types become 'Unknown'"""
+        clean_data_streaming(self.input_path, self.output_path, chunk_size=2)
+    
+        cleaned = pd.read_csv(self.output_path)
+        self.assertEqual(cleaned['total_ether_received'].tolist(), [1.5, 0.0, 3.25, 4.0, 5.0])
+        self.assertEqual(cleaned['total_erc20_transactions'].tolist(), [1, 2, 0, 4, 5])
+        self.assertEqual(cleaned['full_address'][2], 'Unknown')
+        self.assertEqual(cleaned['_erc20_most_sent_token_type'].tolist(), ['OMG', 'Unknown', 'BAT', 'OMG', 'Unknown'])
+    
+    def test_streaming_writes_parquet_with_explicit_schema(self):
+        """Test the Parquet output holds every chunk with float32 features, an int8 label and categorical tokens"""
+        parquet_path = os.path.join(self.temp_dir, 'test_output.parquet')
+    
+        clean_data_streaming(self.input_path, self.output_path, parquet_path=parquet_path, chunk_size=2)
+    
+        cleaned = pd.read_parquet(parquet_path)
+        self.assertEqual(len(cleaned), 5)
+        self.assertEqual(cleaned['total_ether_received'].dtype, np.float32)
+        self.assertEqual(cleaned['is_fraud'].dtype, np.int8)
+        self.assertEqual(cleaned['_erc20_most_sent_token_type'].dtype, 'category')
+        self.assertEqual(cleaned['_erc20_most_sent_token_type'].tolist(), ['OMG', 'Unknown', 'BAT', 'OMG', 'Unknown'])
+
 if __name__ == '__main__':
     unittest.main()
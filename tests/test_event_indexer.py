@@ -0,0 +1,144 @@
+import unittest
+import sys
+import os
+import tempfile
+import io
+from contextlib import redirect_stdout
+from unittest.mock import Mock, patch
+
+from eth_abi import encode
+from web3 import Web3
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from event_indexer import (ASSESSMENT_DATA_TYPES, ASSESSMENT_TOPIC, REPUTATION_DATA_TYPES, REPUTATION_TOPIC,
+                           EventIndex, is_oversize_error, main)
+
+CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+def wallet(n):
+    return f"0x{n:040x}"
+
+def assessment_log(block, index, address, is_fraudulent, confidence, risk):
+    return {
+        "blockNumber": block, "logIndex": index, "transactionHash": bytes(32),
+        "topics": [ASSESSMENT_TOPIC, bytes(12) + bytes.fromhex(address[2:])],
+        "data": encode(ASSESSMENT_DATA_TYPES, (True, is_fraudulent, confidence, 1700000000 + block, 5000, 0, risk)),
+    }
+
+def reputation_log(block, index, address, old_score, new_score, reason):
+    return {
+        "blockNumber": block, "logIndex": index, "transactionHash": bytes(32),
+        "topics": [REPUTATION_TOPIC, bytes(12) + bytes.fromhex(address[2:])],
+        "data": encode(REPUTATION_DATA_TYPES, (old_score, new_score, reason)),
+    }
+
+class FakeEth:
+    """eth_getLogs over a fixed list of logs, refusing ranges that return more than max_results"""
+    
+    def __init__(self, logs, head, max_results=None):
+        self.logs = logs
+        self.block_number = head
+        self.max_results = max_results
+        self.ranges = []
+    
+    def get_logs(self, params):
+        self.ranges.append((params["fromBlock"], params["toBlock"]))
+        logs = [log for log in self.logs if params["fromBlock"] <= log["blockNumber"] <= params["toBlock"]]
+        if self.max_results is not None and len(logs) > self.max_results:
+            raise ValueError({"code": -32005, "message": f"query returned more than {self.max_results} results"})
+        return logs
+
+class TestEventIndex(unittest.TestCase):
+    """Test scanning, storing and querying assessment events"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "events.sqlite")
+        self.logs = [
+            assessment_log(10, 0, wallet(1), True, 90, 8000),
+            assessment_log(10, 1, wallet(2), False, 80, 2000),
+            assessment_log(25, 0, wallet(3), True, 70, 7500),
+            reputation_log(40, 0, wallet(2), 5000, 4000, "phishing"),
+            assessment_log(40, 1, wallet(2), False, 80, 7100),
+            assessment_log(60, 0, wallet(1), False, 60, 1000),
+        ]
+        self.eth = FakeEth(self.logs, head=100)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def make_index(self, **kwargs):
+        return EventIndex(Mock(eth=self.eth, codec=Web3().codec), CONTRACT, self.path, **kwargs)
+    
+    def test_queries_use_latest_assessment(self):
+        """Test high-risk wallets, changes since a block and history are answered from the index"""
+        with self.make_index() as index:
+            self.assertEqual(index.sync(), 6)
+    
+            self.assertEqual(len(index), 3)
+            self.assertEqual([a["walletAddress"] for a in index.high_risk_wallets(7000)], [wallet(3), wallet(2)])
+            self.assertEqual(index.latest(wallet(1))["overallRisk"], 1000)
+            self.assertFalse(index.latest(wallet(1))["mlIsFraudulent"])
+            self.assertEqual([(a["walletAddress"], a["blockNumber"]) for a in index.changes_since(40)],
+                             [(wallet(2), 40), (wallet(1), 60)])
+            self.assertEqual([a["overallRisk"] for a in index.history(Web3.to_checksum_address(wallet(2)))],
+                             [2000, 7100])
+            self.assertEqual(index.reputation_changes(wallet(2)), [(40, 5000, 4000, "phishing")])
+            self.assertIsNone(index.latest(wallet(9)))
+    
+    def test_oversize_ranges_are_halved(self):
+        """Test a range the node refuses is halved until it fits and grows back after"""
+        self.eth.max_results = 2
+        with self.make_index(max_range=100) as index:
+            index.sync()
+            self.assertEqual(len(index.changes_since(0)), 5)
+    
+        self.assertEqual(self.eth.ranges[:3], [(0, 99), (0, 49), (0, 24)])
+        self.assertEqual(self.eth.ranges[3], (25, 74))  # Doubled after the first success
+    
+    def test_resumes_from_checkpoint(self):
+        """Test a new index on the same file only scans blocks after the checkpoint and stores no duplicates"""
+        with self.make_index() as index:
+            index.sync(to_block=30)
+            self.assertEqual(index.next_block, 31)
+    
+        self.eth.ranges = []
+        with self.make_index() as index:
+            index.sync()
+            self.assertEqual(self.eth.ranges, [(31, 100)])
+            self.assertEqual(len(index.changes_since(0)), 5)
+            self.assertEqual(index.latest(wallet(1))["overallRisk"], 1000)
+    
+    def test_other_errors_keep_the_checkpoint(self):
+        """Test errors that are not about range size propagate without advancing the checkpoint"""
+        self.eth.get_logs = Mock(side_effect=ConnectionError("connection refused"))
+        with self.make_index(start_block=5) as index:
+            with self.assertRaises(ConnectionError):
+                index.sync()
+            self.assertEqual(index.next_block, 5)
+            self.assertEqual(self.eth.get_logs.call_count, 1)
+    
+    def test_oversize_errors_are_recognised_narrowly(self):
+        """Test only range/result-size errors count as oversize, not other errors mentioning a range or limit"""
+        self.assertTrue(is_oversize_error(ValueError({"code": -32005, "message": "limit exceeded"})))
+        self.assertTrue(is_oversize_error(ValueError("Log response size exceeded. Try a 2K block range")))
+        self.assertTrue(is_oversize_error(ValueError("eth_getLogs is limited to a 10,000 range")))
+        self.assertFalse(is_oversize_error(ValueError("index out of range")))
+        self.assertFalse(is_oversize_error(ValueError("gas required exceeds allowance")))
+        self.assertFalse(is_oversize_error(ValueError({"code": -32000, "message": "header not found"})))
+
+    def test_cli_uses_the_failover_client(self):
+        """Test the CLI accepts a comma-separated RPC_URL through the shared web3_client"""
+        client = Mock(w3=Mock(eth=self.eth, codec=Web3().codec))
+        with patch("event_indexer.get_client", return_value=client) as get_client, redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(main(["--rpc-url", "http://a:8545,http://b:8545", "--contract", CONTRACT,
+                                   "--db", self.path, "--high-risk", "7500"]), 0)
+        
+        get_client.assert_called_once_with("http://a:8545,http://b:8545")
+        self.assertIn("3 wallets indexed", out.getvalue())
+        self.assertIn("1 wallets with risk >= 7500", out.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
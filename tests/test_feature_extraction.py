@@ -0,0 +1,159 @@
+import unittest
+import sys
+import os
+import csv
+import json
+import random
+import tempfile
+import shutil
+import pickle
+import pandas as pd
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from feature_extraction import (extract_features, iter_records, AddressAggregates, TimeSpan,
+                                OUTPUT_COLUMNS)
+
+A = "0x" + "a" * 40
+B = "0x" + "b" * 40
+C = "0x" + "c" * 40
+OMG = "0x" + "1" * 40
+EOS = "0x" + "2" * 40
+ETHER = 10 ** 18
+
+NORMAL_TXS = [
+    {"timeStamp": 0, "from": A, "to": B, "value": 1 * ETHER, "contractAddress": "", "input": "0x", "isError": 0},
+    {"timeStamp": 600, "from": A, "to": C, "value": 2 * ETHER, "contractAddress": "", "input": "0xa9059cbb", "isError": 0},
+    {"timeStamp": 1200, "from": B, "to": A.upper().replace("0X", "0x"), "value": ETHER // 2, "contractAddress": "", "input": "0x", "isError": 0},
+    {"timeStamp": 1800, "from": A, "to": B, "value": 3 * ETHER, "contractAddress": "", "input": "0x", "isError": 0},
+    {"timeStamp": 2400, "from": A, "to": "", "value": 0, "contractAddress": "0x" + "d" * 40, "input": "0x6080", "isError": 0},
+    {"timeStamp": 3000, "from": A, "to": B, "value": 5 * ETHER, "contractAddress": "", "input": "0x", "isError": 1},
+]
+
+ERC20_TXS = [
+    {"timeStamp": 0, "from": A, "to": B, "value": str(100 * ETHER), "tokenDecimal": 18, "tokenName": "OmiseGO", "contractAddress": OMG},
+    {"timeStamp": 120, "from": A, "to": B, "value": str(50 * ETHER), "tokenDecimal": 18, "tokenName": "OmiseGO", "contractAddress": OMG},
+    {"timeStamp": 240, "from": A, "to": C, "value": "7", "tokenDecimal": 0, "tokenName": "EOS", "contractAddress": EOS},
+    {"timeStamp": 300, "from": B, "to": A, "value": str(10 * ETHER), "tokenDecimal": 18, "tokenName": "OmiseGO", "contractAddress": OMG},
+]
+
+class TestFeatureExtraction(unittest.TestCase):
+    """Test per-address features computed from raw transactions"""
+    
+    def setUp(self):
+        """Write the transactions as an unsorted CSV and a JSONL file"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.normal_path = os.path.join(self.temp_dir, 'normal.csv')
+        with open(self.normal_path, 'w', newline='') as handle:
+            writer = csv.DictWriter(handle, fieldnames=list(NORMAL_TXS[0]))
+            writer.writeheader()
+            writer.writerows(reversed(NORMAL_TXS))
+        
+        self.erc20_path = os.path.join(self.temp_dir, 'erc20.jsonl')
+        with open(self.erc20_path, 'w') as handle:
+            for record in [ERC20_TXS[2], ERC20_TXS[0], ERC20_TXS[3], ERC20_TXS[1]]:
+                handle.write(json.dumps(record) + "\n")
+        
+        self.inputs = [("normal", self.normal_path), ("erc20", self.erc20_path)]
+    
+    def tearDown(self):
+        """Cleanup"""
+        shutil.rmtree(self.temp_dir)
+    
+    def features_for(self, address, **kwargs):
+        df = extract_features(self.inputs, **kwargs)
+        return df.set_index('full_address').loc[address]
+    
+    def test_schema_matches_cleaned_data(self):
+        """Test the output columns are the cleaned dataset's, without the label"""
+        cleaned = pd.read_csv(os.path.join(os.path.dirname(__file__), '..', 'data', 'cleaned_data.csv'), nrows=1)
+        expected = [column for column in cleaned.columns if column != 'is_fraud']
+        
+        self.assertEqual(OUTPUT_COLUMNS, expected)
+        self.assertEqual(list(extract_features(self.inputs).columns), expected)
+    
+    def test_normal_transaction_features(self):
+        """Test counts, values, time gaps and unique counterparties"""
+        row = self.features_for(A)
+        
+        self.assertEqual(row['sent_tnx'], 3)
+        self.assertEqual(row['received_tnx'], 1)
+        self.assertEqual(row['number_of_created_contracts'], 1)
+        self.assertEqual(row['total_transactions_(including_tnx_to_create_contract'], 5)
+        self.assertEqual(row['unique_sent_to_addresses'], 2)
+        self.assertEqual(row['unique_received_from_addresses'], 1)
+        self.assertAlmostEqual(row['avg_min_between_sent_tnx'], 15.0)
+        self.assertAlmostEqual(row['time_diff_between_first_and_last_(mins)'], 40.0)
+        self.assertAlmostEqual(row['min_val_sent'], 1.0)
+        self.assertAlmostEqual(row['max_val_sent'], 3.0)
+        self.assertAlmostEqual(row['avg_val_sent'], 2.0)
+        self.assertAlmostEqual(row['avg_value_sent_to_contract'], 2.0)
+        self.assertAlmostEqual(row['total_ether_sent'], 6.0)
+        self.assertAlmostEqual(row['total_ether_balance'], -5.5)
+    
+    def test_erc20_features(self):
+        """Test token values use the token decimals and the main token is found"""
+        row = self.features_for(A)
+        
+        self.assertEqual(row['_total_erc20_tnxs'], 4)
+        self.assertAlmostEqual(row['_erc20_total_ether_sent'], 157.0)
+        self.assertAlmostEqual(row['_erc20_min_val_sent'], 7.0)
+        self.assertEqual(row['_erc20_uniq_sent_addr'], 2)
+        self.assertEqual(row['_erc20_uniq_sent_token_name'], 2)
+        self.assertEqual(row['_erc20_uniq_rec_contract_addr'], 1)
+        self.assertEqual(row['_erc20_most_sent_token_type'], 'OmiseGO')
+        self.assertEqual(row['_erc20_most_rec_token_type'], 'OmiseGO')
+        
+        receiver_only = self.features_for(C)
+        self.assertEqual(receiver_only['_erc20_most_sent_token_type'], 'Unknown')
+        self.assertEqual(receiver_only['_erc20_most_rec_token_type'], 'EOS')
+    
+    def test_erc20_time_columns_match_training_data(self):
+        """Test the ERC20 avg-time columns are 0, as for every address in cleaned_data.csv"""
+        row = self.features_for(A)
+        
+        for column in ('_erc20_avg_time_between_sent_tnx', '_erc20_avg_time_between_rec_tnx',
+                       '_erc20_avg_time_between_rec_2_tnx', '_erc20_avg_time_between_contract_tnx'):
+            self.assertEqual(row[column], 0.0)
+    
+    def test_state_saved_with_removed_fields_still_loads(self):
+        """Test pickled aggregates from before the ERC20 time spans were dropped can be read"""
+        aggregates = AddressAggregates()
+        aggregates.sent.add(1.5)
+        _, slots = aggregates.__getstate__()
+        old = AddressAggregates.__new__(AddressAggregates)
+        old.__setstate__((None, dict(slots, erc20_sent_times=TimeSpan())))
+        
+        restored = pickle.loads(pickle.dumps(old))
+        self.assertEqual(restored.sent.total, 1.5)
+        self.assertFalse(hasattr(restored, 'erc20_sent_times'))
+    
+    def test_parallel_matches_single_process(self):
+        """Test the sharded extraction gives the same rows"""
+        single = extract_features(self.inputs, workers=1)
+        parallel = extract_features(self.inputs, workers=3)
+        
+        pd.testing.assert_frame_equal(single, parallel)
+    
+    def test_byte_ranges_cover_every_record_once(self):
+        """Test any split of a file into byte ranges reads each line exactly once"""
+        path = os.path.join(self.temp_dir, 'many.csv')
+        with open(path, 'w', newline='') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(['timeStamp', 'from'])
+            for i in range(500):
+                writer.writerow([i, f"0x{i:040x}"])
+        size = os.path.getsize(path)
+        
+        rng = random.Random(0)
+        for _ in range(5):
+            cuts = sorted(rng.sample(range(1, size), 6))
+            bounds = [0] + cuts + [size]
+            seen = []
+            for start, end in zip(bounds, bounds[1:]):
+                seen += [int(record['timeStamp']) for record in iter_records(path, start, end)]
+            self.assertEqual(seen, list(range(500)))
+
+if __name__ == '__main__':
+    unittest.main()
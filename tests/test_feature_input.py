@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import base64
+import numpy as np
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from feature_input import parse_feature_values, decode_float32, decode_base64_float32
+
+class TestFeatureInput(unittest.TestCase):
+    """Test validation of raw feature vectors"""
+    
+    def test_single_vector(self):
+        """Test one flat vector becomes a single-row matrix"""
+        matrix, single = parse_feature_values([1, 2.5, 3], 3)
+        
+        self.assertTrue(single)
+        self.assertEqual(matrix.shape, (1, 3))
+        self.assertEqual(matrix.dtype, np.float64)
+    
+    def test_batch(self):
+        """Test a list of rows keeps its shape"""
+        matrix, single = parse_feature_values([[1, 2, 3], [4, 5, 6]], 3)
+        
+        self.assertFalse(single)
+        np.testing.assert_array_equal(matrix, [[1, 2, 3], [4, 5, 6]])
+    
+    def test_rejects_wrong_width(self):
+        """Test rows must have exactly one value per feature"""
+        with self.assertRaises(ValueError):
+            parse_feature_values([1, 2], 3)
+        with self.assertRaises(ValueError):
+            parse_feature_values([[1, 2, 3], [4, 5]], 3)
+    
+    def test_rejects_non_numeric(self):
+        """Test strings (numeric ones too), objects, booleans and nulls are rejected"""
+        for values in (["a", 2, 3], {"x": 1}, "1,2,3", [1, None, 3], None, ["1.5", 2, 3], [["1", "2", "3"]],
+                       [True, False, True], [[1, 2, 3], [4, {"x": 5}, 6]]):
+            with self.assertRaises(ValueError):
+                parse_feature_values(values, 3)
+    
+    def test_reports_non_finite_rows(self):
+        """Test the error names the rows with NaN or infinity"""
+        with self.assertRaises(ValueError) as context:
+            parse_feature_values([[1, 2, 3], [1, float('nan'), 3], [float('inf'), 0, 0]], 3)
+        self.assertIn("rows 1, 2", str(context.exception))
+    
+    def test_max_rows(self):
+        """Test the batch size limit"""
+        with self.assertRaises(ValueError):
+            parse_feature_values([[1, 2]] * 5, 2, max_rows=4)
+    
+    def test_decode_float32(self):
+        """Test packed float32 rows round-trip"""
+        rows = np.arange(6, dtype='<f4').reshape(2, 3)
+        
+        np.testing.assert_array_equal(decode_float32(rows.tobytes(), 3), rows)
+        np.testing.assert_array_equal(decode_base64_float32(base64.b64encode(rows.tobytes()), 3), rows)
+    
+    def test_decode_rejects_bad_length(self):
+        """Test partial rows and bad base64 are rejected"""
+        with self.assertRaises(ValueError):
+            decode_float32(b"\x00" * 10, 3)
+        with self.assertRaises(ValueError):
+            decode_float32(b"", 3)
+        with self.assertRaises(ValueError):
+            decode_base64_float32("not base64!", 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from feature_extraction import extract_features
+from feature_state import FeatureStateStore, rescore, api_score_fn
+
+A = "0x" + "a" * 40
+B = "0x" + "b" * 40
+C = "0x" + "c" * 40
+OMG = "0x" + "1" * 40
+ETHER = 10 ** 18
+
+NORMAL_TXS = [
+    {"timeStamp": 0, "from": A, "to": B, "value": 1 * ETHER, "contractAddress": "", "input": "0x", "isError": 0},
+    {"timeStamp": 600, "from": A, "to": C, "value": 2 * ETHER, "contractAddress": "", "input": "0xa9059cbb", "isError": 0},
+    {"timeStamp": 1200, "from": B, "to": A, "value": ETHER // 2, "contractAddress": "", "input": "0x", "isError": 0},
+    {"timeStamp": 1800, "from": A, "to": B, "value": 3 * ETHER, "contractAddress": "", "input": "0x", "isError": 0},
+]
+
+ERC20_TXS = [
+    {"timeStamp": 0, "from": A, "to": B, "value": str(100 * ETHER), "tokenDecimal": 18, "tokenName": "OmiseGO", "contractAddress": OMG},
+    {"timeStamp": 120, "from": A, "to": B, "value": str(50 * ETHER), "tokenDecimal": 18, "tokenName": "OmiseGO", "contractAddress": OMG},
+    {"timeStamp": 240, "from": A, "to": C, "value": "7", "tokenDecimal": 0, "tokenName": "EOS", "contractAddress": "0x" + "2" * 40},
+    {"timeStamp": 300, "from": B, "to": A, "value": str(10 * ETHER), "tokenDecimal": 18, "tokenName": "OmiseGO", "contractAddress": OMG},
+]
+
+class TestFeatureStateStore(unittest.TestCase):
+    """Test incremental feature updates persisted between runs"""
+    
+    def setUp(self):
+        """Create a state file location"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.temp_dir, 'state.sqlite')
+    
+    def tearDown(self):
+        """Cleanup"""
+        shutil.rmtree(self.temp_dir)
+    
+    def full_extraction(self):
+        normal_path = os.path.join(self.temp_dir, 'normal.csv')
+        erc20_path = os.path.join(self.temp_dir, 'erc20.csv')
+        pd.DataFrame(NORMAL_TXS).to_csv(normal_path, index=False)
+        pd.DataFrame(ERC20_TXS).to_csv(erc20_path, index=False)
+        return extract_features([("normal", normal_path), ("erc20", erc20_path)])
+    
+    def test_incremental_matches_full_extraction(self):
+        """Test applying transactions over several runs gives the full-history features"""
+        with FeatureStateStore(self.state_path) as store:
+            store.apply("normal", NORMAL_TXS[:3])
+            store.apply("erc20", ERC20_TXS[:2])
+        
+        with FeatureStateStore(self.state_path) as store:
+            store.apply("normal", NORMAL_TXS[3:])
+            store.apply("erc20", ERC20_TXS[2:])
+            store.flush()
+            incremental = store.feature_frame([A, B, C])
+        
+        pd.testing.assert_frame_equal(incremental, self.full_extraction())
+    
+    def test_changed_addresses(self):
+        """Test only the addresses in new transactions are reported as changed"""
+        with FeatureStateStore(self.state_path) as store:
+            store.apply("normal", NORMAL_TXS[:2])
+            self.assertEqual(store.drain_changed(), sorted([A, B, C]))
+            
+            store.apply("erc20", [ERC20_TXS[3]])
+            self.assertEqual(store.drain_changed(), sorted([A, B]))
+            self.assertEqual(store.drain_changed(), [])
+            self.assertEqual(len(store), 3)
+    
+    def test_working_set_is_flushed_during_apply(self):
+        """Test a large apply writes aggregates back instead of holding every address"""
+        records = [dict(NORMAL_TXS[0], **{"from": f"0x{i:040x}", "to": B}) for i in range(1, 2501)]
+        with FeatureStateStore(self.state_path, max_working=100) as store:
+            store.apply("normal", records)
+            # Every APPLY_BATCH of records touches over 100 addresses, so each was written back
+            self.assertEqual(store._conn.execute("SELECT COUNT(*) FROM address_state").fetchone()[0], 2501)
+            self.assertFalse(store._working.addresses)
+            self.assertEqual(len(store), 2501)
+            self.assertEqual(store.get(B).received.count, 2500)
+    
+    def test_len_does_not_write(self):
+        """Test len() counts pending addresses without flushing them"""
+        with FeatureStateStore(self.state_path) as store:
+            store.apply("normal", NORMAL_TXS[:1])
+            store.flush()
+            store.apply("normal", NORMAL_TXS[1:])
+            self.assertEqual(len(store), 3)
+            self.assertEqual(store._conn.execute("SELECT COUNT(*) FROM address_state").fetchone()[0], 2)
+            self.assertTrue(store._dirty)
+    
+    def test_unknown_address(self):
+        """Test addresses without transactions have no state"""
+        with FeatureStateStore(self.state_path) as store:
+            store.apply("normal", NORMAL_TXS[:1])
+            self.assertIsNone(store.get("0x" + "9" * 40))
+            self.assertEqual(store.get(A.upper().replace('0X', '0x')).sent.count, 1)
+            self.assertEqual(len(store.feature_frame(["0x" + "9" * 40])), 0)
+    
+    def test_rescore_passes_features_in_order(self):
+        """Test the scorer gets the requested columns for each changed address"""
+        columns = ['sent_tnx', 'received_tnx']
+        seen = []
+        
+        def score_fn(features):
+            seen.append(features)
+            return np.zeros(len(features), dtype=int), features[:, 0] / 10
+        
+        with FeatureStateStore(self.state_path) as store:
+            store.apply("normal", NORMAL_TXS)
+            result = rescore(store, store.drain_changed(), score_fn, columns)
+        
+        self.assertEqual(result['address'].tolist(), sorted([A, B, C]))
+        np.testing.assert_array_equal(seen[0], [[3, 1], [1, 2], [0, 1]])
+        np.testing.assert_allclose(result['probability'], [0.3, 0.1, 0.0])
+    
+    def test_api_score_fn_sends_float32_rows(self):
+        """Test the API scorer posts packed float32 batches to /predict_features"""
+        session = MagicMock()
+        session.post.return_value.json.side_effect = [
+            {"predictions": [0, 1], "probabilities": [0.1, 0.9]},
+            {"predictions": [0], "probabilities": [0.2]},
+        ]
+        features = np.arange(6, dtype=np.float64).reshape(3, 2)
+        
+        predictions, probabilities = api_score_fn("http://api", session, batch_size=2)(features)
+        
+        self.assertEqual(session.post.call_count, 2)
+        url = session.post.call_args_list[0][0][0]
+        body = session.post.call_args_list[0][1]['data']
+        self.assertEqual(url, "http://api/predict_features")
+        np.testing.assert_array_equal(np.frombuffer(body, dtype='<f4'), [0, 1, 2, 3])
+        np.testing.assert_array_equal(predictions, [0, 1, 0])
+        np.testing.assert_allclose(probabilities, [0.1, 0.9, 0.2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import time
+import pandas as pd
+import numpy as np
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from feature_store import FeatureStore, build_feature_store, is_store_current, load_feature_store
+
+class TestFeatureStore(unittest.TestCase):
+    """Test the binary feature store"""
+    
+    def setUp(self):
+        """Setup a small cleaned dataset"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.temp_dir, 'cleaned_data.csv')
+        self.store_dir = os.path.join(self.temp_dir, 'feature_store')
+        
+        pd.DataFrame({
+            'full_address': ['0xAAA1', '0xbbb2', '0xccc3', '0xaaa1'],
+            'is_fraud': [0, 1, 0, 1],
+            'sent_tnx': [1, 2, 3, 4],
+            'avg_val_sent': [0.5, np.nan, 2.5, 3.5],
+            '_erc20_most_sent_token_type': ['EOS', 'Unknown', 'OMG', 'EOS']
+        }).to_csv(self.csv_path, index=False)
+    
+    def tearDown(self):
+        """Clean up"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_store_matches_csv(self):
+        """Test the store holds the same data as parsing the CSV"""
+        build_feature_store(self.csv_path, self.store_dir)
+        store = load_feature_store(self.store_dir)
+        from_csv = FeatureStore.from_csv(self.csv_path)
+        
+        self.assertEqual(store.feature_columns, ['sent_tnx', 'avg_val_sent'])
+        np.testing.assert_array_equal(store.features, from_csv.features)
+        np.testing.assert_array_equal(store.labels, from_csv.labels)
+        self.assertEqual(store.fingerprint, from_csv.fingerprint)
+        self.assertEqual(store.address_at(1), '0xbbb2')
+    
+    def test_store_is_memory_mapped(self):
+        """Test arrays are memory-mapped read-only"""
+        build_feature_store(self.csv_path, self.store_dir)
+        store = load_feature_store(self.store_dir)
+        
+        self.assertIsInstance(store.features, np.memmap)
+        self.assertFalse(store.features.flags['WRITEABLE'])
+    
+    def test_store_index_lookups(self):
+        """Test the persisted index finds rows like the in-memory index"""
+        build_feature_store(self.csv_path, self.store_dir)
+        store = load_feature_store(self.store_dir)
+        
+        self.assertEqual(store.index.get('0xAAA1'), 0)
+        self.assertEqual(store.index.get('0xccc3'), 2)
+        self.assertIsNone(store.index.get('0xddd4'))
+        np.testing.assert_array_equal(store.index.get_many(['0xccc3', '0xnope', '0xbbb2']), [2, -1, 1])
+    
+    def test_store_goes_stale_when_csv_changes(self):
+        """Test a rewritten CSV is detected"""
+        self.assertFalse(is_store_current(self.store_dir, self.csv_path))
+        build_feature_store(self.csv_path, self.store_dir)
+        self.assertTrue(is_store_current(self.store_dir, self.csv_path))
+        
+        time.sleep(0.01)
+        with open(self.csv_path, 'a') as handle:
+            handle.write('0xeee5,0,5,1.0,EOS\n')
+        self.assertFalse(is_store_current(self.store_dir, self.csv_path))
+    
+    def test_rebuild_replaces_store(self):
+        """Test building twice leaves one complete store"""
+        build_feature_store(self.csv_path, self.store_dir)
+        build_feature_store(self.csv_path, self.store_dir)
+        
+        self.assertFalse(os.path.exists(self.store_dir + '.tmp'))
+        self.assertEqual(len(load_feature_store(self.store_dir)), 4)
+
+if __name__ == '__main__':
+    unittest.main()
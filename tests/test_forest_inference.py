@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forest_inference import CompiledForest
+
+class TestCompiledForest(unittest.TestCase):
+    """Test the flat-array forest against sklearn"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Train small forests to compile"""
+        rng = np.random.RandomState(42)
+        cls.X = rng.randn(400, 8) * 100
+        cls.y = (cls.X[:, 0] + cls.X[:, 3] * 0.5 + rng.randn(400) * 20 > 0).astype(int)
+        
+        cls.model = RandomForestClassifier(n_estimators=15, random_state=42, class_weight='balanced')
+        cls.model.fit(cls.X, cls.y)
+        cls.compiled = CompiledForest.from_model(cls.model)
+    
+    def test_probabilities_identical_to_sklearn(self):
+        """Test predict_proba is bit-for-bit identical"""
+        X_test = np.random.RandomState(1).randn(250, 8) * 100
+        
+        np.testing.assert_array_equal(self.compiled.predict_proba(X_test),
+                                      self.model.predict_proba(X_test))
+    
+    def test_single_row_and_chunked_batches(self):
+        """Test batch size does not change results"""
+        expected = self.model.predict_proba(self.X)
+        
+        np.testing.assert_array_equal(self.compiled.predict_proba(self.X[5:6]), expected[5:6])
+        leaves = self.compiled.apply(self.X, chunk_size=7)
+        np.testing.assert_array_equal(leaves, self.compiled.apply(self.X))
+    
+    def test_predict_matches_sklearn(self):
+        """Test labels match"""
+        np.testing.assert_array_equal(self.compiled.predict(self.X), self.model.predict(self.X))
+    
+    def test_missing_values_follow_sklearn(self):
+        """Test NaN inputs take the same branch as sklearn"""
+        X_nan = self.X.copy()
+        X_nan[::4, 0] = np.nan
+        X_nan[::7, 3] = np.nan
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X_nan, self.y)
+        
+        np.testing.assert_array_equal(CompiledForest.from_model(model).predict_proba(X_nan),
+                                      model.predict_proba(X_nan))
+    
+    def test_other_tree_ensembles(self):
+        """Test extra trees and multiclass targets compile too"""
+        y_multi = np.digitize(self.X[:, 1], [-50, 50])
+        model = ExtraTreesClassifier(n_estimators=5, random_state=0).fit(self.X, y_multi)
+        
+        np.testing.assert_array_equal(CompiledForest.from_model(model).predict_proba(self.X),
+                                      model.predict_proba(self.X))
+    
+    def test_wrong_feature_count(self):
+        """Test feature count mismatch raises like sklearn"""
+        with self.assertRaises(ValueError):
+            self.compiled.predict_proba(self.X[:, :5])
+    
+    def test_unfitted_model_rejected(self):
+        """Test models without trees cannot be compiled"""
+        with self.assertRaises(TypeError):
+            CompiledForest.from_model(RandomForestClassifier())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+import unittest
+import sys
+import os
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+
+import rlp
+from aiohttp import web
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from oracle_async import AsyncFraudDetectionOracle
+from oracle_service import BATCH_BASE_GAS, FraudDetectionOracle
+from tx_submitter import TransactionSubmitter
+
+# Hardhat's first default account
+PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+class FakeEth:
+    """A node that mines everything sent so far when mine() is called"""
+    
+    def __init__(self):
+        self.block_number = 0
+        self.chain_id = 1337
+        self.gas_price = 10
+        self.mined_nonce = 0
+        self.pool = {}
+        self.receipts = {}
+        self.sent = []
+        self.nonce_lookups = 0
+        self.lock = threading.Lock()
+    
+    def get_transaction_count(self, address, block_identifier="latest"):
+        self.nonce_lookups += 1
+        with self.lock:
+            return self.mined_nonce + len(self.pool)
+    
+    def send_raw_transaction(self, raw):
+        nonce = int.from_bytes(rlp.decode(bytes(raw))[0], "big")
+        tx_hash = Web3.keccak(bytes(raw))
+        with self.lock:
+            self.pool[nonce] = tx_hash
+            self.sent.append(nonce)
+        return tx_hash
+    
+    def get_transaction_receipt(self, tx_hash):
+        with self.lock:
+            if tx_hash not in self.receipts:
+                raise TransactionNotFound("not mined")
+            return self.receipts[tx_hash]
+    
+    def mine(self):
+        with self.lock:
+            while self.mined_nonce in self.pool:
+                self.receipts[self.pool.pop(self.mined_nonce)] = Mock(status=1, gasUsed=100000)
+                self.mined_nonce += 1
+            self.block_number += 1
+
+def contract_call(*args):
+    call = Mock(args=args)
+    call.build_transaction.side_effect = lambda params: dict(params, to=CONTRACT, value=0, data="0x1234")
+    call.estimate_gas.return_value = 100000
+    return call
+
+class TestAsyncOracle(unittest.TestCase):
+    """Test the staged asyncio oracle against a local ML API and a fake node"""
+    
+    def setUp(self):
+        self.eth = FakeEth()
+        self.batch_sizes = []
+    
+    async def start_api(self):
+        async def batch_predict(request):
+            addresses = (await request.json())["addresses"]
+            self.batch_sizes.append(len(addresses))
+            return web.json_response({"results": [
+                {"address": a, "prediction": None, "probability": None, "error": "Address not found"}
+                if a.endswith("ff") else {"address": a, "prediction": int(a[-1], 16) % 2, "probability": 0.9}
+                for a in addresses
+            ]})
+    
+        app = web.Application()
+        app.router.add_post("/batch_predict", batch_predict)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        host, port = self.runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+    
+    def make_oracle(self, api_url, max_pending=64, **kwargs):
+        # The writer is a threaded oracle with a real TransactionSubmitter over the fake node
+        with patch.object(FraudDetectionOracle, "_test_api_connection"):
+            writer = FraudDetectionOracle(api_url, contract_address=CONTRACT, private_key=PRIVATE_KEY)
+        writer.w3 = Mock(eth=self.eth)
+        writer.contract = Mock()
+        writer.contract.functions.updateFraudAssessment.side_effect = contract_call
+        writer.contract.functions.batchUpdateFraudAssessments.side_effect = contract_call
+        writer._submitter = TransactionSubmitter(writer.w3, PRIVATE_KEY, max_pending=max_pending, poll_interval=0.01)
+        oracle = AsyncFraudDetectionOracle(api_url, contract_address=CONTRACT, writer=writer, **kwargs)
+        oracle.w3 = Mock(codec=Web3().codec)
+        # Batched getFraudAssessment reads: no wallet has a prediction on chain
+        oracle.w3.provider.make_batch_request = AsyncMock(
+            side_effect=lambda requests: [{"result": "0x" + "00" * 224} for _ in requests])
+        oracle.w3.provider.disconnect = AsyncMock()
+        return oracle
+    
+    async def mine_until(self, task):
+        while not task.done():
+            self.eth.mine()
+            await asyncio.sleep(0.02)
+        return task.result()
+    
+    def test_pipeline_scores_writes_and_confirms_in_order(self):
+        """Test results come back in input order with chunked scoring and one nonce lookup"""
+        addresses = [f"0x{i:040x}" for i in range(1, 10)] + ["0x" + "f" * 40]
+    
+        async def run():
+            oracle = self.make_oracle(await self.start_api(), batch_size=4)
+            try:
+                task = asyncio.ensure_future(oracle.process_addresses(addresses))
+                return await self.mine_until(task)
+            finally:
+                await oracle.close()
+                await self.runner.cleanup()
+    
+        results = asyncio.run(run())
+    
+        self.assertEqual([r["address"] for r in results], addresses)
+        self.assertEqual(self.batch_sizes, [4, 4, 2])
+        self.assertTrue(all(r["blockchain_updated"] for r in results[:-1]))
+        self.assertEqual(results[-1]["error"], "Address not found")
+        self.assertEqual(sorted(self.eth.sent), list(range(9)))
+        self.assertEqual(self.eth.nonce_lookups, 1)
+    
+    def test_unconfirmed_transactions_are_bounded(self):
+        """Test the shared submitter stops sending while max_pending transactions are unconfirmed"""
+        addresses = [f"0x{i:040x}" for i in range(1, 21)]
+    
+        async def run():
+            oracle = self.make_oracle(await self.start_api(), max_pending=3)
+            try:
+                task = asyncio.ensure_future(oracle.process_addresses(addresses))
+                await asyncio.sleep(0.3)
+                sent_before_mining = len(self.eth.sent)
+                results = await self.mine_until(task)
+                return sent_before_mining, results
+            finally:
+                await oracle.close()
+                await self.runner.cleanup()
+    
+        sent_before_mining, results = asyncio.run(run())
+    
+        self.assertEqual(sent_before_mining, 3)
+        self.assertTrue(all(r["blockchain_updated"] for r in results))
+    
+    def test_unchanged_assessments_are_skipped(self):
+        """Test results matching the mirrored on-chain state are not written"""
+        addresses = [f"0x{i:040x}" for i in range(1, 5)]
+    
+        async def run():
+            oracle = self.make_oracle(await self.start_api())
+            oracle.mirror.record(addresses[0], True, 90)   # Same as the new result
+            oracle.mirror.record(addresses[1], True, 90)   # Label flips to 0
+            try:
+                task = asyncio.ensure_future(oracle.process_addresses(addresses))
+                return oracle, await self.mine_until(task)
+            finally:
+                await oracle.close()
+                await self.runner.cleanup()
+    
+        oracle, results = asyncio.run(run())
+    
+        self.assertTrue(results[0]["unchanged"])
+        self.assertEqual(oracle.writes_avoided, 1)
+        self.assertEqual(len(self.eth.sent), 3)
+        self.assertEqual(oracle.mirror.get(addresses[1]), (False, 90))
+        # Only the two unmirrored wallets were read, through batched calls
+        self.assertEqual(sum(len(call.args[0]) for call in oracle.w3.provider.make_batch_request.call_args_list), 2)
+    
+    def test_batch_writes_use_the_writer_batches(self):
+        """Test ORACLE_BATCH_WRITES packing and gas sizing come from the threaded oracle"""
+        addresses = [f"0x{i:040x}" for i in range(1, 11)]
+    
+        async def run():
+            oracle = self.make_oracle(await self.start_api(), batch_size=10)
+            oracle.writer.batch_writes = True
+            oracle.writer.batch_gas_limit = BATCH_BASE_GAS + 4 * oracle.writer.gas_per_assessment
+            oracle.writer._block_gas_limit = 30000000
+            try:
+                task = asyncio.ensure_future(oracle.process_addresses(addresses))
+                return oracle, await self.mine_until(task)
+            finally:
+                await oracle.close()
+                await self.runner.cleanup()
+    
+        oracle, results = asyncio.run(run())
+    
+        self.assertTrue(all(r["blockchain_updated"] for r in results))
+        batches = oracle.writer.contract.functions.batchUpdateFraudAssessments.call_args_list
+        self.assertEqual([len(call.args[0]) for call in batches], [4, 4, 2])
+        self.assertEqual(len(self.eth.sent), 3)
+        oracle.writer.contract.functions.updateFraudAssessment.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
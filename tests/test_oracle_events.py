@@ -0,0 +1,189 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import shutil
+from unittest.mock import Mock
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from oracle_events import (QueueSource, FileTailSource, BlockScannerSource, DedupWindow,
+                           OracleMetrics, EventDrivenOracle)
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+class TestWorkSources(unittest.TestCase):
+    """Test the sources of changed addresses"""
+    
+    def setUp(self):
+        """Create a temp directory"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Cleanup"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_queue_source_drains_everything(self):
+        """Test a poll returns all queued items"""
+        source = QueueSource(clock=FakeClock(5.0))
+        source.put("0xa")
+        source.put("0xb", seen_at=1.0)
+        
+        self.assertEqual(source.poll(timeout=0.01), [("0xa", 5.0), ("0xb", 1.0)])
+        self.assertEqual(source.poll(timeout=0.01), [])
+    
+    def test_file_tail_follows_appends(self):
+        """Test only new complete lines are read, and a truncated file restarts"""
+        path = os.path.join(self.temp_dir, 'work.txt')
+        with open(path, 'w') as handle:
+            handle.write("0xold\n")
+        source = FileTailSource(path, clock=FakeClock(7.0))
+        self.assertEqual(source.poll(timeout=0), [])
+        
+        with open(path, 'a') as handle:
+            handle.write("0xnew\n" + json.dumps({"address": "0xjson", "seen_at": 3}) + "\n0xpart")
+        self.assertEqual(source.poll(timeout=0), [("0xnew", 7.0), ("0xjson", 3.0)])
+        
+        with open(path, 'a') as handle:
+            handle.write("ial\n")
+        self.assertEqual(source.poll(timeout=0), [("0xpartial", 7.0)])
+        
+        with open(path, 'w') as handle:
+            handle.write("0xrotated\n")
+        self.assertEqual(source.poll(timeout=0), [("0xrotated", 7.0)])
+    
+    def test_block_scanner(self):
+        """Test senders, recipients and created contracts of new blocks are emitted"""
+        w3 = Mock()
+        w3.eth.block_number = 10
+        source = BlockScannerSource(w3)
+        self.assertEqual(source.poll(timeout=0), [])
+        
+        w3.eth.block_number = 12
+        w3.eth.get_block.side_effect = lambda number, full_transactions: {
+            11: {"timestamp": 100, "transactions": [{"from": "0xa", "to": "0xb"}]},
+            12: {"timestamp": 112, "transactions": [{"from": "0xc", "to": None, "creates": "0xd"}]},
+        }[number]
+        
+        self.assertEqual(source.poll(timeout=0),
+                         [("0xa", 100.0), ("0xb", 100.0), ("0xc", 112.0), ("0xd", 112.0)])
+        self.assertEqual(source.next_block, 13)
+
+class TestDedupWindow(unittest.TestCase):
+    """Test repeated addresses are merged within the window"""
+    
+    def test_window_releases_unique_addresses(self):
+        """Test the batch is released once, after the window, with the earliest seen time"""
+        clock = FakeClock()
+        window = DedupWindow(window_seconds=5, clock=clock)
+        window.add("0xA", 10.0)
+        window.add("0xb", 11.0)
+        window.add("0xa", 9.0)
+        
+        self.assertFalse(window.ready())
+        self.assertEqual(window.seconds_until_ready(), 5)
+        clock.now += 5
+        self.assertTrue(window.ready())
+        self.assertEqual(window.take(), [("0xa", 9.0), ("0xb", 11.0)])
+        self.assertEqual(window.duplicates, 1)
+        self.assertFalse(window.ready())
+    
+    def test_full_window_is_released_early(self):
+        """Test max_batch releases a batch before the window ends"""
+        window = DedupWindow(window_seconds=60, max_batch=2, clock=FakeClock())
+        for i in range(3):
+            window.add(f"0x{i}", float(i))
+        
+        self.assertTrue(window.ready())
+        self.assertEqual(len(window.take()), 2)
+        self.assertEqual(len(window), 1)
+
+class TestEventDrivenOracle(unittest.TestCase):
+    """Test the poll -> dedupe -> process loop"""
+    
+    def test_processes_each_address_once_and_reports_freshness(self):
+        """Test duplicates are scored once and freshness is measured from first sight"""
+        oracle = Mock()
+        oracle.process_addresses.side_effect = lambda addresses: [
+            {"address": address, "blockchain_updated": True} for address in addresses
+        ]
+        source = QueueSource()
+        for address, seen_at in (("0xa", 100.0), ("0xb", 101.0), ("0xA", 102.0)):
+            source.put(address, seen_at)
+        
+        runner = EventDrivenOracle(oracle, source, window_seconds=0,
+                                   metrics=OracleMetrics(clock=FakeClock(110.0)))
+        results = runner.run_once(poll_timeout=0.01)
+        
+        self.assertEqual(sorted(r["address"] for r in results), ["0xa", "0xb"])
+        self.assertEqual(oracle.process_addresses.call_count, 1)
+        stats = runner.metrics.stats()
+        self.assertEqual(stats["events"], 3)
+        self.assertEqual(stats["written"], 2)
+        self.assertEqual(stats["freshness_max_seconds"], 10.0)
+        self.assertEqual(stats["freshness_p50_seconds"], 9.5)
+    
+    def test_failures_are_counted(self):
+        """Test addresses the API cannot score are counted as failed"""
+        oracle = Mock()
+        oracle.process_addresses.return_value = [{"address": "0xa", "error": "Address not found"}]
+        source = QueueSource()
+        source.put("0xa", 1.0)
+        
+        runner = EventDrivenOracle(oracle, source, window_seconds=0)
+        runner.run_once(poll_timeout=0.01)
+        
+        stats = runner.metrics.stats()
+        self.assertEqual(stats["failed"], 1)
+        self.assertIsNone(stats["freshness_p50_seconds"])
+    
+    def test_unchanged_results_count_as_avoided_writes(self):
+        """Test skipped writes are counted separately from written and failed"""
+        metrics = OracleMetrics()
+        metrics.record_batch([{"address": "0xa", "blockchain_updated": False, "unchanged": True}], {"0xa": 1.0})
+        
+        stats = metrics.stats()
+        self.assertEqual((stats["written"], stats["unchanged"], stats["failed"]), (0, 1, 0))
+    
+    def test_run_survives_source_and_processing_errors(self):
+        """Test a failing poll or batch is logged and retried instead of ending the loop"""
+        class FlakySource:
+            def __init__(self):
+                self.polls = 0
+    
+            def poll(self, timeout=1.0):
+                self.polls += 1
+                if self.polls == 1:
+                    raise ConnectionError("node unavailable")
+                return [("0xa", 1.0)] if self.polls == 2 else []
+    
+        processed = []
+    
+        def process_addresses(addresses):
+            if not processed:
+                processed.append(None)
+                raise ConnectionError("API unavailable")
+            processed.append(addresses)
+            runner.stop()
+            return [{"address": address, "blockchain_updated": True} for address in addresses]
+    
+        oracle = Mock()
+        oracle.process_addresses.side_effect = process_addresses
+        runner = EventDrivenOracle(oracle, FlakySource(), window_seconds=0, retry_delay=0.0)
+    
+        with self.assertLogs("oracle_events", level="ERROR") as logs:
+            runner.run()
+    
+        self.assertEqual(processed[1:], [["0xa"]])  # The failed batch was kept and retried
+        self.assertEqual(runner.metrics.stats()["written"], 1)
+        self.assertEqual(len(logs.records), 2)
+
+if __name__ == '__main__':
+    unittest.main()
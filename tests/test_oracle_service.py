@@ -3,6 +3,7 @@ import sys
 import os
 import tempfile
 import shutil
+from concurrent.futures import Future
 from unittest.mock import Mock, patch
 
 # Add src directory to path
@@ -87,5 +88,225 @@ class TestOracleService(unittest.TestCase):
         self.assertTrue(hasattr(self.oracle, 'contract_abi'))
         self.assertIsInstance(self.oracle.contract_abi, list)
 
+    def test_get_ml_predictions_chunks_over_one_session(self):
+        """Test batch predictions use /batch_predict in chunks and map results back per address"""
+        oracle = FraudDetectionOracle(batch_size=2)
+        addresses = ["0xA", "0xb", "0xc"]
+        
+        def batch_response(url, json, timeout):
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {"results": [
+                {"address": a, "prediction": None, "probability": None, "error": "Address not found"}
+                if a == "0xc" else {"address": a, "prediction": 1, "probability": 0.9}
+                for a in json["addresses"]
+            ]}
+            return response
+        
+        oracle.session = Mock()
+        oracle.session.post.side_effect = batch_response
+        results = oracle.get_ml_predictions(addresses)
+        
+        self.assertEqual(oracle.session.post.call_count, 2)
+        self.assertTrue(oracle.session.post.call_args_list[0].args[0].endswith("/batch_predict"))
+        self.assertEqual(oracle.session.post.call_args_list[0].kwargs["json"], {"addresses": ["0xa", "0xb"]})
+        self.assertEqual(results["0xA"], {"prediction": 1, "probability": 0.9, "status": "success"})
+        self.assertEqual(results["0xc"]["status"], "error")
+    
+    def test_process_addresses_writes_successful_predictions(self):
+        """Test the batch counterpart of process_address"""
+        self.oracle.get_ml_predictions = Mock(return_value={
+            "0xa": {"prediction": 0, "probability": 0.1, "status": "success"},
+            "0xb": {"status": "error", "message": "Address not found"},
+        })
+        receipt = Future()
+        receipt.set_result(Mock(status=1))
+        self.oracle.submit_blockchain_prediction = Mock(return_value=receipt)
+        
+        results = self.oracle.process_addresses(["0xa", "0xb"])
+        
+        self.assertEqual(results[0], {"address": "0xa", "ml_prediction": 0, "ml_confidence": 0.1,
+                                      "blockchain_updated": True})
+        self.assertEqual(results[1], {"address": "0xb", "error": "Address not found"})
+        self.oracle.submit_blockchain_prediction.assert_called_once_with("0xa", 0, 0.1)
+    
+    def test_process_addresses_sends_all_updates_before_waiting(self):
+        """Test updates are pipelined: every transaction is sent before any receipt is awaited"""
+        self.oracle.get_ml_predictions = Mock(return_value={
+            address: {"prediction": 1, "probability": 0.9, "status": "success"} for address in ("0xa", "0xb")
+        })
+        events = []
+        
+        def submit(address, prediction, confidence):
+            events.append(("sent", address))
+            future = Mock()
+            future.result.side_effect = lambda: events.append(("waited", address)) or Mock(status=1)
+            return future
+        
+        self.oracle.submit_blockchain_prediction = submit
+        results = self.oracle.process_addresses(["0xa", "0xb"])
+        
+        self.assertEqual([e[0] for e in events], ["sent", "sent", "waited", "waited"])
+        self.assertTrue(all(r["blockchain_updated"] for r in results))
+    
+    def test_update_without_contract_is_skipped(self):
+        """Test writes are skipped when no contract or key is configured"""
+        self.assertIsNone(self.oracle.submit_blockchain_prediction(self.test_address, 1, 0.9))
+        self.assertFalse(self.oracle.update_blockchain_prediction(self.test_address, 1, 0.9))
+    
+    def test_batch_api_failure_marks_whole_chunk(self):
+        """Test a failed batch call reports an error for every address in the chunk"""
+        self.oracle.session = Mock()
+        self.oracle.session.post.return_value = Mock(status_code=500, text="Internal server error")
+        
+        results = self.oracle.get_ml_predictions(["0xa", "0xb"])
+        
+        self.assertEqual({r["status"] for r in results.values()}, {"error"})
+
+    def test_pack_write_batches_respects_gas_limit(self):
+        """Test assessments are packed into batches that fit the gas limit"""
+        self.oracle.batch_gas_limit = 1050000
+        self.oracle.gas_per_assessment = 200000
+        
+        batches = self.oracle.pack_write_batches(list(range(12)))
+        
+        self.assertEqual([len(batch) for batch in batches], [5, 5, 2])
+        self.assertEqual(sum(batches, []), list(range(12)))
+    
+    def test_batch_writes_map_receipts_to_addresses(self):
+        """Test batch mode sends one transaction per batch and marks each address from its receipt"""
+        self.oracle.batch_writes = True
+        self.oracle.batch_gas_limit = 450000  # Two assessments per batch
+        self.oracle.get_ml_predictions = Mock(return_value={
+            address: {"prediction": 1, "probability": 0.9, "status": "success"} for address in ("0xa", "0xb", "0xc")
+        })
+        receipts = [Mock(status=1, gasUsed=100000), Mock(status=0, gasUsed=50000)]
+        futures = []
+        for receipt in receipts:
+            future = Future()
+            future.set_result(receipt)
+            futures.append(future)
+        self.oracle.submit_blockchain_batch = Mock(side_effect=futures)
+        
+        results = self.oracle.process_addresses(["0xa", "0xb", "0xc"])
+        
+        self.assertEqual(self.oracle.submit_blockchain_batch.call_count, 2)
+        self.assertEqual(self.oracle.submit_blockchain_batch.call_args_list[0].args[0],
+                         [("0xa", 1, 0.9), ("0xb", 1, 0.9)])
+        self.assertEqual([r["blockchain_updated"] for r in results], [True, True, False])
+    
+    @patch('web3.contract.contract.ContractFunction.estimate_gas', return_value=300000)
+    def test_submit_blockchain_batch_encodes_call(self, estimate_gas):
+        """Test the batch call matches the contract ABI and is sent with the node's gas estimate plus headroom"""
+        oracle = FraudDetectionOracle(contract_address="0x5FbDB2315678afecb367f032d93F642f64180aa3",
+                                      private_key="0x" + "11" * 32)
+        oracle._submitter = Mock()
+        oracle._block_gas_limit = 30000000
+        
+        oracle.submit_blockchain_batch([(self.test_address, 1, 0.9), ("0x" + "ab" * 20, 0, 0.2)])
+        
+        call = oracle._submitter.submit.call_args.args[0]
+        self.assertEqual(call.fn_name, "batchUpdateFraudAssessments")
+        self.assertEqual(call.args[1], [(True, True, 90, 5000, 0, 36), (True, False, 20, 5000, 0, 8)])
+        self.assertTrue(call._encode_transaction_data().startswith("0x"))
+        self.assertEqual(oracle._submitter.submit.call_args.kwargs["gas"], 360000)
+    
+    def test_batches_fit_the_block_gas_limit(self):
+        """Test batches are capped by the block gas limit, and a batch estimated over it is not sent"""
+        oracle = FraudDetectionOracle(contract_address="0x5FbDB2315678afecb367f032d93F642f64180aa3",
+                                      private_key="0x" + "11" * 32)
+        oracle._submitter = Mock()
+        oracle._block_gas_limit = 450000  # Below ORACLE_BATCH_GAS_LIMIT: two assessments per batch
+        
+        self.assertEqual([len(batch) for batch in oracle.pack_write_batches(list(range(5)))], [2, 2, 1])
+        with patch('web3.contract.contract.ContractFunction.estimate_gas', return_value=500000):
+            self.assertIsNone(oracle.submit_blockchain_batch([(self.test_address, 1, 0.9)]))
+        oracle._submitter.submit.assert_not_called()
+
+    def test_mirror_warms_from_events_in_shrinking_ranges(self):
+        """Test the startup event scan splits a range the node refuses instead of failing"""
+        oracle = FraudDetectionOracle(contract_address="0x5FbDB2315678afecb367f032d93F642f64180aa3")
+        oracle.w3 = Mock()
+        oracle.w3.eth.block_number = 99
+        oversize = ValueError({"code": -32005, "message": "query returned more than 10000 results"})
+        oracle.w3.eth.get_logs.side_effect = [oversize, [], []]
+        
+        self.assertEqual(oracle.warm_mirror_from_events(0), 0)
+        self.assertEqual(oracle.w3.eth.get_logs.call_count, 3)
+        self.assertEqual(oracle.w3.eth.get_logs.call_args.args[0]["toBlock"], 99)
+    
+    def test_mirror_warm_failure_falls_back_to_reads(self):
+        """Test a failing startup event scan is logged and leaves the mirror to fill from reads"""
+        oracle = FraudDetectionOracle(contract_address="0x5FbDB2315678afecb367f032d93F642f64180aa3")
+        oracle.w3 = Mock()
+        oracle.w3.eth.block_number = 99
+        oracle.w3.eth.get_logs.side_effect = ConnectionError("connection refused")
+        
+        with self.assertLogs("oracle_service", level="WARNING"):
+            self.assertEqual(oracle.warm_mirror_from_events(0), 0)
+        self.assertEqual(len(oracle.mirror), 0)
+    
+    def test_unchanged_assessments_are_not_written(self):
+        """Test results matching the on-chain assessment are skipped and counted as avoided writes"""
+        oracle = FraudDetectionOracle(contract_address="0x5FbDB2315678afecb367f032d93F642f64180aa3")
+        oracle.get_ml_predictions = Mock(return_value={
+            "0xa": {"prediction": 1, "probability": 0.91, "status": "success"},  # Within threshold
+            "0xb": {"prediction": 0, "probability": 0.91, "status": "success"},  # Label flipped
+            "0xc": {"prediction": 0, "probability": 0.2, "status": "success"},   # Not on chain yet
+        })
+        on_chain = {"hasMLPrediction": True, "mlIsFraudulent": True, "mlConfidence": 90}
+        oracle.get_blockchain_assessments = Mock(return_value={"0xa": on_chain, "0xb": on_chain, "0xc": None})
+        receipt = Future()
+        receipt.set_result(Mock(status=1))
+        oracle.submit_blockchain_prediction = Mock(return_value=receipt)
+        
+        results = oracle.process_addresses(["0xa", "0xb", "0xc"])
+        
+        self.assertTrue(results[0]["unchanged"])
+        self.assertFalse(results[0]["blockchain_updated"])
+        self.assertEqual([call.args[0] for call in oracle.submit_blockchain_prediction.call_args_list], ["0xb", "0xc"])
+        self.assertEqual(oracle.writes_avoided, 1)
+        self.assertEqual(oracle.mirror.get("0xb"), (False, 91))
+        
+        # The next cycle with the same results writes nothing and reads nothing new
+        oracle.process_addresses(["0xa", "0xb", "0xc"])
+        self.assertEqual(oracle.submit_blockchain_prediction.call_count, 2)
+        self.assertEqual(oracle.writes_avoided, 4)
+        self.assertEqual(oracle.get_blockchain_assessments.call_count, 1)
+
+    @patch.dict(os.environ, {"ORACLE_SOURCE": "kafka"})
+    def test_event_mode_rejects_unknown_source(self):
+        """Test an unknown ORACLE_SOURCE fails fast"""
+        from oracle_service import run_event_driven
+        with self.assertRaises(ValueError):
+            run_event_driven(self.oracle)
+
+    @patch.dict(os.environ, {"ORACLE_MODE": "events", "ORACLE_ASYNC": "1"})
+    def test_event_mode_rejects_async_oracle(self):
+        """Test ORACLE_ASYNC=1 with ORACLE_MODE=events fails fast instead of being ignored"""
+        from oracle_service import main
+        with patch("oracle_service.FraudDetectionOracle") as oracle_class:
+            with self.assertRaises(ValueError):
+                main()
+        oracle_class.assert_not_called()
+
+    @patch.dict(os.environ, {"ORACLE_MODE": "loop", "ORACLE_ASYNC": "0"})
+    def test_service_loop_reads_assessments_in_one_batch(self):
+        """Test a service cycle reads the on-chain assessments with one batched call, not one per address"""
+        from oracle_service import main
+        with patch("oracle_service.FraudDetectionOracle") as oracle_class, \
+                patch("oracle_service.time.sleep", side_effect=KeyboardInterrupt), \
+                patch("builtins.print"):
+            oracle = oracle_class.return_value
+            oracle.writes_avoided = 0
+            oracle.process_addresses.side_effect = lambda addresses: [{"address": a} for a in addresses]
+            oracle.get_blockchain_assessments.side_effect = lambda addresses: {a: None for a in addresses}
+            with self.assertRaises(KeyboardInterrupt):
+                main()
+        
+        oracle.get_blockchain_assessments.assert_called_once()
+        self.assertEqual(len(oracle.get_blockchain_assessments.call_args.args[0]), 3)
+        oracle.get_blockchain_assessment.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import threading
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from prediction_cache import PredictionCache
+
+class FakeClock:
+    """Manually advanced clock for TTL tests"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+class TestPredictionCache(unittest.TestCase):
+    """Test the LRU/TTL prediction cache"""
+    
+    def setUp(self):
+        """Setup test data"""
+        self.address = "0x00009277775ac7d0d59eaad8fee3d10ac6c805e8"
+        self.cache = PredictionCache(max_size=2)
+    
+    def test_hit_after_put(self):
+        """Test cached values are returned, case-insensitively"""
+        self.assertIsNone(self.cache.get(self.address, 'model-a'))
+        self.cache.put(self.address, 'model-a', (1, 0.9))
+        
+        self.assertEqual(self.cache.get(self.address.upper().replace('0X', '0x'), 'model-a'), (1, 0.9))
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+    
+    def test_model_fingerprint_is_part_of_key(self):
+        """Test a different model never sees the old entry"""
+        self.cache.put(self.address, 'model-a', (1, 0.9))
+        self.assertIsNone(self.cache.get(self.address, 'model-b'))
+    
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted"""
+        self.cache.put('0xa', 'm', (0, 0.1))
+        self.cache.put('0xb', 'm', (0, 0.2))
+        self.cache.get('0xa', 'm')  # 0xb is now least recently used
+        self.cache.put('0xc', 'm', (1, 0.7))
+        
+        self.assertIsNone(self.cache.get('0xb', 'm'))
+        self.assertEqual(self.cache.get('0xa', 'm'), (0, 0.1))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertEqual(len(self.cache), 2)
+    
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL"""
+        clock = FakeClock()
+        cache = PredictionCache(max_size=10, ttl_seconds=5, clock=clock)
+        cache.put(self.address, 'm', (1, 0.8))
+        
+        clock.now = 4.9
+        self.assertEqual(cache.get(self.address, 'm'), (1, 0.8))
+        clock.now = 5.0
+        self.assertIsNone(cache.get(self.address, 'm'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+    
+    def test_invalidate(self):
+        """Test invalidate drops everything"""
+        self.cache.put(self.address, 'm', (1, 0.8))
+        self.cache.invalidate()
+        
+        self.assertIsNone(self.cache.get(self.address, 'm'))
+        self.assertEqual(self.cache.stats()['invalidations'], 1)
+    
+    def test_concurrent_access(self):
+        """Test the cache stays bounded under concurrent writers"""
+        cache = PredictionCache(max_size=50)
+        
+        def worker(offset):
+            for i in range(200):
+                cache.put(f'0x{offset}{i}', 'm', (0, 0.0))
+                cache.get(f'0x{offset}{i // 2}', 'm')
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertLessEqual(len(cache), 50)
+        self.assertEqual(cache.stats()['evictions'], 800 - len(cache))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import numpy as np
+from unittest.mock import Mock
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from prediction_table import (
+    PredictionTable,
+    file_fingerprint,
+    load_or_build_prediction_table,
+    prediction_table_path,
+)
+
+def fake_score(features):
+    """Simple deterministic scorer: probability is the first feature"""
+    probabilities = features[:, 0]
+    return (probabilities > 0.5).astype(int), probabilities
+
+class TestPredictionTable(unittest.TestCase):
+    """Test the precomputed prediction table"""
+    
+    def setUp(self):
+        """Setup test data"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.features = np.random.RandomState(42).rand(10, 3)
+    
+    def tearDown(self):
+        """Clean up"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_file_fingerprint_changes_with_content(self):
+        """Test fingerprint follows file contents"""
+        path = os.path.join(self.temp_dir, 'artifact.bin')
+        with open(path, 'wb') as handle:
+            handle.write(b'model-v1')
+        first = file_fingerprint(path)
+        with open(path, 'wb') as handle:
+            handle.write(b'model-v2')
+        
+        self.assertNotEqual(first, file_fingerprint(path))
+    
+    def test_build_matches_live_scoring(self):
+        """Test table lookups equal scoring the rows directly"""
+        table = PredictionTable.build(self.features, fake_score, 'm', 'd', chunk_size=3)
+        rows = np.array([7, 0, 4])
+        predictions, probabilities = table.lookup(rows)
+        expected_predictions, expected_probabilities = fake_score(self.features[rows])
+        
+        np.testing.assert_array_equal(predictions, expected_predictions)
+        np.testing.assert_array_equal(probabilities, expected_probabilities)
+    
+    def test_save_and_load_round_trip(self):
+        """Test persisted table loads back unchanged"""
+        table = PredictionTable.build(self.features, fake_score, 'model-hash', 'data-hash')
+        path = os.path.join(self.temp_dir, 'table.npz')
+        table.save(path)
+        loaded = PredictionTable.load(path)
+        
+        self.assertTrue(loaded.matches('model-hash', 'data-hash'))
+        np.testing.assert_array_equal(loaded.probabilities, table.probabilities)
+    
+    def test_model_without_probabilities(self):
+        """Test tables for models that only predict labels"""
+        table = PredictionTable.build(self.features, lambda X: (np.ones(len(X)), None), 'm', 'd')
+        path = os.path.join(self.temp_dir, 'table.npz')
+        table.save(path)
+        
+        self.assertIsNone(PredictionTable.load(path).probabilities)
+    
+    def test_load_or_build_reuses_persisted_table(self):
+        """Test second start loads from disk instead of scoring"""
+        load_or_build_prediction_table(self.features, fake_score, 'm1', 'd1', self.temp_dir)
+        score = Mock(side_effect=fake_score)
+        table = load_or_build_prediction_table(self.features, score, 'm1', 'd1', self.temp_dir)
+        
+        score.assert_not_called()
+        self.assertEqual(len(table), 10)
+    
+    def test_load_or_build_rescores_when_model_changes(self):
+        """Test a new model fingerprint triggers a fresh table"""
+        load_or_build_prediction_table(self.features, fake_score, 'm1', 'd1', self.temp_dir)
+        score = Mock(side_effect=fake_score)
+        table = load_or_build_prediction_table(self.features, score, 'm2', 'd1', self.temp_dir)
+        
+        self.assertTrue(score.called)
+        self.assertTrue(table.matches('m2', 'd1'))
+        self.assertTrue(os.path.exists(prediction_table_path(self.temp_dir, 'm2', 'd1')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+import threading
+import numpy as np
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from request_coalescer import RequestCoalescer
+
+class TestRequestCoalescer(unittest.TestCase):
+    """Test micro-batching of single predictions"""
+    
+    def setUp(self):
+        """Setup a scorer that records every batch it sees"""
+        self.batches = []
+        
+        def score(rows):
+            self.batches.append(len(rows))
+            return rows % 2, rows / 100.0
+        
+        self.score = score
+    
+    def run_concurrently(self, coalescer, rows):
+        """Submit rows from separate threads and collect the results"""
+        results = {}
+        barrier = threading.Barrier(len(rows))
+        
+        def worker(row):
+            barrier.wait()
+            results[row] = coalescer.score(row)
+        
+        threads = [threading.Thread(target=worker, args=(row,)) for row in rows]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+    
+    def test_each_caller_gets_its_own_result(self):
+        """Test results fan back out to the right request"""
+        coalescer = RequestCoalescer(self.score, window_ms=50, max_batch=64)
+        results = self.run_concurrently(coalescer, list(range(20)))
+        coalescer.close()
+        
+        for row, (prediction, probability) in results.items():
+            self.assertEqual(prediction, row % 2)
+            self.assertAlmostEqual(probability, row / 100.0)
+    
+    def test_concurrent_requests_share_batches(self):
+        """Test concurrent requests are scored in fewer model calls"""
+        coalescer = RequestCoalescer(self.score, window_ms=50, max_batch=64)
+        self.run_concurrently(coalescer, list(range(32)))
+        stats = coalescer.stats()
+        coalescer.close()
+        
+        self.assertEqual(stats['requests'], 32)
+        self.assertLess(stats['batches'], 32)
+        self.assertGreater(stats['mean_batch_size'], 1)
+        self.assertEqual(sum(self.batches), 32)
+    
+    def test_max_batch_is_respected(self):
+        """Test no batch is larger than max_batch"""
+        coalescer = RequestCoalescer(self.score, window_ms=50, max_batch=4)
+        self.run_concurrently(coalescer, list(range(17)))
+        stats = coalescer.stats()
+        coalescer.close()
+        
+        self.assertLessEqual(max(self.batches), 4)
+        self.assertLessEqual(stats['max_batch_size_seen'], 4)
+    
+    def test_single_request_completes_after_window(self):
+        """Test a lone request is not held longer than the window"""
+        coalescer = RequestCoalescer(self.score, window_ms=1, max_batch=64)
+        prediction, probability = coalescer.score(3, timeout=1.0)
+        coalescer.close()
+        
+        self.assertEqual(prediction, 1)
+        self.assertEqual(self.batches, [1])
+    
+    def test_errors_reach_every_caller(self):
+        """Test a scoring failure is raised in each waiting request"""
+        def failing(rows):
+            raise ValueError("model exploded")
+        
+        coalescer = RequestCoalescer(failing, window_ms=1)
+        with self.assertRaises(ValueError):
+            coalescer.score(0, timeout=1.0)
+        coalescer.close()
+    
+    def test_model_without_probabilities(self):
+        """Test None probabilities pass through"""
+        coalescer = RequestCoalescer(lambda rows: (np.zeros(len(rows)), None), window_ms=1)
+        self.assertEqual(coalescer.score(1, timeout=1.0), (0, None))
+        coalescer.close()
+    
+    def test_closed_coalescer_rejects_requests(self):
+        """Test submitting after close fails fast"""
+        coalescer = RequestCoalescer(self.score)
+        coalescer.close()
+        with self.assertRaises(RuntimeError):
+            coalescer.submit(1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,224 @@
+import unittest
+import sys
+import os
+import signal
+import socket
+import subprocess
+import time
+import tempfile
+import textwrap
+import requests
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from serve import create_listen_socket
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Tiny stand-in app so the test does not depend on the real model
+SERVER_SCRIPT = textwrap.dedent("""
+    import os, sys
+    sys.path.insert(0, {src!r})
+    from flask import Flask
+    from serve import PreforkServer
+
+    app = Flask(__name__)
+
+    @app.route('/pid')
+    def pid():
+        return str(os.getpid())
+
+    server = PreforkServer(app, host='127.0.0.1', port=0, workers=2)
+    server.start()
+    print(server.port, flush=True)
+    server.run()
+""")
+
+@unittest.skipUnless(hasattr(os, 'fork') and os.path.exists('/proc'), "pre-forking needs a POSIX system with /proc")
+class TestPreforkServer(unittest.TestCase):
+    """Test the multi-process API server"""
+    
+    def setUp(self):
+        """Start a pre-forked server with two workers"""
+        self.process = subprocess.Popen(
+            [sys.executable, '-c', SERVER_SCRIPT.format(src=SRC_DIR)],
+            stdout=subprocess.PIPE, text=True
+        )
+        self.port = int(self.process.stdout.readline())
+        self.url = f'http://127.0.0.1:{self.port}'
+    
+    def tearDown(self):
+        """Stop the server"""
+        self.process.terminate()
+        self.process.wait(timeout=10)
+    
+    def workers(self):
+        with open(f'/proc/{self.process.pid}/task/{self.process.pid}/children') as handle:
+            return {int(pid) for pid in handle.read().split()}
+    
+    def wait_for_workers(self, count, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if len(self.workers()) == count:
+                return True
+            time.sleep(0.05)
+        return False
+    
+    def test_requests_are_served_by_workers(self):
+        """Test requests are answered by the forked workers, not the parent"""
+        self.assertTrue(self.wait_for_workers(2))
+        pids = {int(requests.get(f'{self.url}/pid', timeout=5).text) for _ in range(10)}
+        
+        self.assertNotIn(self.process.pid, pids)
+        self.assertTrue(pids <= self.workers())
+    
+    def test_dead_worker_is_replaced(self):
+        """Test the parent restarts a worker that exits"""
+        self.assertTrue(self.wait_for_workers(2))
+        victim = next(iter(self.workers()))
+        os.kill(victim, signal.SIGKILL)
+        
+        deadline = time.time() + 5
+        while time.time() < deadline and victim in self.workers():
+            time.sleep(0.05)
+        self.assertTrue(self.wait_for_workers(2))
+        self.assertNotIn(victim, self.workers())
+        self.assertEqual(requests.get(f'{self.url}/pid', timeout=5).status_code, 200)
+    
+    def test_terminate_stops_all_workers(self):
+        """Test SIGTERM on the parent shuts the workers down"""
+        self.assertTrue(self.wait_for_workers(2))
+        workers = self.workers()
+        self.process.terminate()
+        self.assertEqual(self.process.wait(timeout=10), 0)
+        
+        for pid in workers:
+            with self.assertRaises(ProcessLookupError):
+                os.kill(pid, 0)
+
+# Workers that fail on startup, as with a missing model file
+CRASHING_SERVER_SCRIPT = textwrap.dedent("""
+    import sys
+    sys.path.insert(0, {src!r})
+    from flask import Flask
+    from serve import PreforkServer
+
+    def broken_start():
+        raise RuntimeError("model not found")
+
+    server = PreforkServer(Flask(__name__), host='127.0.0.1', port=0, workers=2, on_worker_start=broken_start,
+                           restart_delay=0.01, max_crashes=5, crash_window=30)
+    server.start()
+    sys.exit(server.run())
+""")
+
+@unittest.skipUnless(hasattr(os, 'fork'), "pre-forking needs a POSIX system")
+class TestCrashingWorkers(unittest.TestCase):
+    """Test workers that crash on startup are not restarted forever"""
+    
+    def test_server_gives_up_with_backoff(self):
+        """Test restarts back off and the server exits non-zero after too many crashes"""
+        result = subprocess.run([sys.executable, '-c', CRASHING_SERVER_SCRIPT.format(src=SRC_DIR)],
+                                capture_output=True, text=True, timeout=30)
+        
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("giving up", result.stdout)
+        delays = [float(line.rsplit(" ", 1)[1].rstrip("s")) for line in result.stdout.splitlines()
+                  if "restarting it in" in line]
+        self.assertEqual(len(delays), 4)
+        self.assertEqual(delays, sorted(delays))
+        self.assertGreater(delays[-1], delays[0])
+
+# Workers report the model version the process loaded; SIGHUP reloads it from a file
+RELOADING_SERVER_SCRIPT = textwrap.dedent("""
+    import os, signal, sys
+    sys.path.insert(0, {src!r})
+    from flask import Flask
+    from serve import PreforkServer
+
+    app = Flask(__name__)
+    model = {{"version": open({version_path!r}).read()}}
+
+    def reload_model():
+        model["version"] = open({version_path!r}).read()
+
+    def install_reload_signal():
+        signal.signal(signal.SIGHUP, lambda *_: reload_model())
+
+    @app.route('/version')
+    def version():
+        return f"{{os.getpid()}} {{model['version']}}"
+
+    server = PreforkServer(app, host='127.0.0.1', port=0, workers=1, on_worker_start=install_reload_signal,
+                           on_reload=reload_model, restart_delay=0.01)
+    server.start()
+    print(server.port, flush=True)
+    server.run()
+""")
+
+@unittest.skipUnless(hasattr(os, 'fork') and hasattr(signal, 'SIGHUP'), "pre-forking needs a POSIX system")
+class TestReload(unittest.TestCase):
+    """Test SIGHUP reloads reach workers started after the reload"""
+    
+    def setUp(self):
+        """Start a one-worker server on model version 1"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.version_path = os.path.join(self.tmp.name, 'version')
+        with open(self.version_path, 'w') as handle:
+            handle.write('1')
+        self.process = subprocess.Popen(
+            [sys.executable, '-c', RELOADING_SERVER_SCRIPT.format(src=SRC_DIR, version_path=self.version_path)],
+            stdout=subprocess.PIPE, text=True
+        )
+        self.url = f'http://127.0.0.1:{int(self.process.stdout.readline())}'
+    
+    def tearDown(self):
+        """Stop the server"""
+        self.process.terminate()
+        self.process.wait(timeout=10)
+        self.tmp.cleanup()
+    
+    def version(self):
+        pid, version = requests.get(f'{self.url}/version', timeout=5).text.split()
+        return int(pid), version
+    
+    def wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                result = self.version()
+                if condition(*result):
+                    return result
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.05)
+        self.fail("condition not reached")
+    
+    def test_restarted_worker_serves_the_reloaded_model(self):
+        """Test a worker forked after SIGHUP starts on the new model, not the one loaded at startup"""
+        worker, _ = self.wait_for(lambda pid, version: version == '1')
+        with open(self.version_path, 'w') as handle:
+            handle.write('2')
+        self.process.send_signal(signal.SIGHUP)
+        self.wait_for(lambda pid, version: version == '2')
+        
+        os.kill(worker, signal.SIGKILL)
+        replacement, version = self.wait_for(lambda pid, version: pid != worker)
+        self.assertEqual(version, '2')
+
+class TestListenSocket(unittest.TestCase):
+    """Test the shared listening socket"""
+    
+    def test_socket_is_inheritable(self):
+        """Test the socket survives fork/exec into workers"""
+        sock = create_listen_socket('127.0.0.1', 0)
+        try:
+            self.assertTrue(sock.get_inheritable())
+            self.assertGreater(sock.getsockname()[1], 0)
+            self.assertEqual(sock.type, socket.SOCK_STREAM)
+        finally:
+            sock.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sketches import DistinctCounter, HeavyHitters, EXACT_LIMIT
+
+class TestDistinctCounter(unittest.TestCase):
+    """Test exact-then-HyperLogLog distinct counting"""
+    
+    def test_exact_below_limit(self):
+        """Test small sets are counted exactly"""
+        counter = DistinctCounter()
+        for i in range(100):
+            counter.add(f"0x{i % 40:040x}")
+        
+        self.assertTrue(counter.is_exact)
+        self.assertEqual(len(counter), 40)
+    
+    def test_sketch_above_limit(self):
+        """Test large sets switch to the sketch and stay within a few percent"""
+        counter = DistinctCounter()
+        for i in range(50000):
+            counter.add(f"0x{i:040x}")
+        
+        self.assertFalse(counter.is_exact)
+        self.assertAlmostEqual(len(counter) / 50000, 1.0, delta=0.05)
+    
+    def test_estimate_near_limit(self):
+        """Test the switch does not cause a jump in the count"""
+        counter = DistinctCounter()
+        for i in range(EXACT_LIMIT + 10):
+            counter.add(str(i))
+        
+        self.assertAlmostEqual(len(counter) / (EXACT_LIMIT + 10), 1.0, delta=0.05)
+    
+    def test_merge_is_union(self):
+        """Test merging counts the union, for both exact and sketched counters"""
+        for size in (300, 5000):
+            left, right = DistinctCounter(), DistinctCounter()
+            for i in range(size):
+                left.add(str(i))
+                right.add(str(i + size // 2))
+            
+            merged = left.merge(right)
+            
+            self.assertAlmostEqual(len(merged) / (size + size // 2), 1.0, delta=0.05)
+        
+        exact_left, exact_right = DistinctCounter(), DistinctCounter()
+        exact_left.add("a")
+        exact_right.add("a")
+        exact_right.add("b")
+        self.assertEqual(len(exact_left.merge(exact_right)), 2)
+
+class TestHeavyHitters(unittest.TestCase):
+    """Test the Misra-Gries most-frequent summary"""
+    
+    def test_most_common(self):
+        """Test the dominant value is found in a long tail of others"""
+        summary = HeavyHitters(slots=4)
+        for i in range(1000):
+            summary.add("OmiseGO" if i % 3 == 0 else f"token{i}")
+        
+        self.assertEqual(summary.most_common(), "OmiseGO")
+        self.assertLessEqual(len(summary.counts), 4)
+    
+    def test_ties_are_alphabetical(self):
+        """Test ties resolve the same way regardless of arrival order"""
+        summary = HeavyHitters()
+        for value in ("b", "a", "b", "a"):
+            summary.add(value)
+        
+        self.assertEqual(summary.most_common(), "a")
+        self.assertIsNone(HeavyHitters().most_common())
+    
+    def test_merge(self):
+        """Test merged summaries keep the overall most common value and stay bounded"""
+        left, right = HeavyHitters(slots=3), HeavyHitters(slots=3)
+        for i in range(30):
+            left.add("EOS" if i % 2 else f"l{i}")
+            right.add("EOS" if i % 2 else f"r{i}")
+        
+        merged = left.merge(right)
+        
+        self.assertEqual(merged.most_common(), "EOS")
+        self.assertLessEqual(len(merged.counts), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+import sys
+import os
+from unittest.mock import Mock
+
+import rlp
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from tx_submitter import GasPriceCache, NonceManager, TransactionSubmitter
+
+# Hardhat's first default account
+PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+CONTRACT = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+class FakeEth:
+    """A node that mines only when told to, keeping the highest-priced transaction per nonce"""
+    
+    def __init__(self, gas_price=10):
+        self.block_number = 0
+        self.gas_price_value = gas_price
+        self.chain_id = 1337
+        self.confirmed_nonce = 0
+        self.pool = {}       # nonce -> (gas_price, hash)
+        self.receipts = {}
+        self.sent = []
+        self.calls = {"get_transaction_count": 0, "gas_price": 0}
+    
+    @property
+    def gas_price(self):
+        self.calls["gas_price"] += 1
+        return self.gas_price_value
+    
+    def get_transaction_count(self, address, block_identifier="latest"):
+        self.calls["get_transaction_count"] += 1
+        return self.confirmed_nonce + (len(self.pool) if block_identifier == "pending" else 0)
+    
+    def send_raw_transaction(self, raw):
+        fields = rlp.decode(bytes(raw))
+        nonce, gas_price = int.from_bytes(fields[0], "big"), int.from_bytes(fields[1], "big")
+        if nonce < self.confirmed_nonce:
+            raise ValueError("nonce too low")
+        if nonce in self.pool and gas_price < self.pool[nonce][0] * 1.1:
+            raise ValueError("replacement transaction underpriced")
+        tx_hash = Web3.keccak(bytes(raw))
+        self.pool[nonce] = (gas_price, tx_hash)
+        self.sent.append((nonce, gas_price))
+        return tx_hash
+    
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(f"{tx_hash.hex()} not found")
+        return self.receipts[tx_hash]
+    
+    def mine(self, limit=None):
+        """Mine pool transactions in nonce order"""
+        mined = 0
+        while self.confirmed_nonce in self.pool and (limit is None or mined < limit):
+            _, tx_hash = self.pool.pop(self.confirmed_nonce)
+            self.receipts[tx_hash] = Mock(status=1, transactionHash=tx_hash)
+            self.confirmed_nonce += 1
+            mined += 1
+        self.block_number += 1
+
+def contract_call():
+    call = Mock()
+    call.build_transaction.side_effect = lambda params: dict(params, to=CONTRACT, value=0, data="0x1234")
+    return call
+
+class TestNonceManager(unittest.TestCase):
+    """Test local nonce tracking"""
+    
+    def test_counts_locally_after_one_node_call(self):
+        """Test nonces come from the node once and are then counted locally"""
+        w3 = Mock()
+        w3.eth = FakeEth()
+        w3.eth.confirmed_nonce = 7
+        nonces = NonceManager(w3, "0xabc")
+    
+        self.assertEqual([nonces.next() for _ in range(3)], [7, 8, 9])
+        self.assertEqual(w3.eth.calls["get_transaction_count"], 1)
+    
+        nonces.resync()
+        self.assertEqual(nonces.next(), 7)
+        self.assertEqual(w3.eth.calls["get_transaction_count"], 2)
+
+class TestGasPriceCache(unittest.TestCase):
+    """Test the per-block gas price cache"""
+    
+    def test_refetches_only_on_new_block(self):
+        """Test the gas price is fetched again only after the block number changes"""
+        w3 = Mock()
+        w3.eth = FakeEth(gas_price=10)
+        cache = GasPriceCache(w3, poll_interval=0)
+    
+        self.assertEqual(cache.price(), 10)
+        w3.eth.gas_price_value = 20
+        self.assertEqual(cache.price(), 10)
+        w3.eth.block_number += 1
+        self.assertEqual(cache.price(), 20)
+        self.assertEqual(w3.eth.calls["gas_price"], 2)
+
+class TestTransactionSubmitter(unittest.TestCase):
+    """Test pipelined sending, confirmation and replacement"""
+    
+    def setUp(self):
+        self.w3 = Mock()
+        self.w3.eth = FakeEth()
+        self.clock = FakeClock()
+        self.submitter = TransactionSubmitter(self.w3, PRIVATE_KEY, replace_after=30, poll_interval=0.01,
+                                              clock=self.clock)
+    
+    def tearDown(self):
+        self.submitter.close(timeout=1)
+    
+    def test_sends_back_to_back_and_confirms_async(self):
+        """Test many transactions go out before any is mined, with one nonce and gas lookup"""
+        futures = [self.submitter.submit(contract_call(), label=f"0x{i}") for i in range(5)]
+    
+        self.assertEqual([nonce for nonce, _ in self.w3.eth.sent], [0, 1, 2, 3, 4])
+        self.assertEqual(self.w3.eth.calls["get_transaction_count"], 1)
+        self.assertEqual(self.w3.eth.calls["gas_price"], 1)
+        self.assertFalse(any(future.done() for future in futures))
+    
+        self.w3.eth.mine()
+        self.assertTrue(self.submitter.flush(timeout=5))
+        self.assertTrue(all(future.result().status == 1 for future in futures))
+        self.assertEqual(self.submitter.stats()["confirmed"], 5)
+    
+    def test_stuck_transaction_is_replaced_with_higher_gas(self):
+        """Test an unmined transaction is re-sent with the same nonce and a bumped gas price"""
+        future = self.submitter.submit(contract_call())
+        self.clock.now += 31
+        self.submitter.check_pending()
+    
+        self.assertEqual(self.w3.eth.sent, [(0, 10), (0, 12)])
+        self.w3.eth.mine()
+        self.assertEqual(future.result(timeout=5).status, 1)
+        self.assertEqual(self.submitter.stats()["replaced"], 1)
+    
+    def test_gives_up_after_max_replacements(self):
+        """Test a transaction that never mines fails its future instead of hanging"""
+        self.submitter.max_replacements = 1
+        future = self.submitter.submit(contract_call())
+        for _ in range(2):
+            self.clock.now += 31
+            self.submitter.check_pending()
+    
+        with self.assertRaises(TimeoutError):
+            future.result(timeout=5)
+        self.assertEqual(self.submitter.pending_count(), 0)
+    
+    def test_nonce_rejected_by_node_is_resynced(self):
+        """Test a nonce used by another sender is replaced with the node's count"""
+        self.submitter.nonces.next()  # Local count is now 1
+        self.w3.eth.confirmed_nonce = 3  # Another sender used nonces 0-2
+    
+        self.submitter.submit(contract_call())
+    
+        self.assertEqual(self.w3.eth.sent, [(3, 10)])
+
+if __name__ == '__main__':
+    unittest.main()
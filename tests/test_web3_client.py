@@ -0,0 +1,195 @@
+import unittest
+import sys
+import os
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from web3.exceptions import ProviderConnectionError
+
+# Add src directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from oracle_service import CONTRACT_ABI
+from web3_client import FailoverHTTPProvider, Web3Client, get_client, sort_by_response_id
+
+class FakeRpcServer:
+    """A JSON-RPC endpoint on a free port that answers with its own name after an optional delay"""
+    
+    def __init__(self, name, delay=0.0, status=200):
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.hits = 0
+        server = self
+    
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                server.hits += 1
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(server.delay)
+                if isinstance(body, list):
+                    payload = [{"jsonrpc": "2.0", "id": request["id"], "result": f"{server.name}:{request['method']}"}
+                               for request in reversed(body)]
+                elif body["method"] == "eth_fail":
+                    payload = {"jsonrpc": "2.0", "id": body["id"], "error": {"code": 3, "message": "execution reverted"}}
+                else:
+                    payload = {"jsonrpc": "2.0", "id": body["id"], "result": server.name}
+                data = json.dumps(payload).encode()
+                self.send_response(server.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+    
+            def log_message(self, *args):
+                pass
+    
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+class TestFailoverProvider(unittest.TestCase):
+    """Test endpoint selection, failover and batching of the shared provider"""
+    
+    def setUp(self):
+        self.servers = []
+    
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+    
+    def server(self, *args, **kwargs):
+        server = FakeRpcServer(*args, **kwargs)
+        self.servers.append(server)
+        return server
+    
+    def test_fastest_endpoint_is_preferred(self):
+        """Test requests settle on the endpoint with the lowest measured latency"""
+        slow, fast = self.server("slow", delay=0.05), self.server("fast")
+        provider = FailoverHTTPProvider([slow.url, fast.url])
+    
+        answers = [provider.make_request("eth_blockNumber", [])["result"] for _ in range(10)]
+    
+        self.assertEqual(answers[:2], ["slow", "fast"])  # Each endpoint is measured once
+        self.assertEqual(set(answers[2:]), {"fast"})
+        self.assertEqual(slow.hits, 1)
+    
+    def test_failed_endpoint_is_skipped_during_cooldown(self):
+        """Test a down endpoint fails over to the next and is not retried until its cooldown ends"""
+        down, up = self.server("down", status=503), self.server("up")
+        clock = FakeClock()
+        provider = FailoverHTTPProvider([down.url, up.url], cooldown=30, clock=clock)
+    
+        self.assertEqual(provider.make_request("eth_blockNumber", [])["result"], "up")
+        self.assertEqual(provider.make_request("eth_blockNumber", [])["result"], "up")
+        self.assertEqual(down.hits, 1)
+    
+        clock.now += 31
+        down.status = 200
+        self.assertEqual(provider.make_request("eth_blockNumber", [])["result"], "down")
+        self.assertEqual(provider.stats()[0]["failures"], 1)
+    
+    def test_rpc_errors_do_not_fail_over(self):
+        """Test a JSON-RPC error is returned from the endpoint that answered"""
+        first, second = self.server("first"), self.server("second")
+        provider = FailoverHTTPProvider([first.url, second.url])
+    
+        response = provider.make_request("eth_fail", [])
+    
+        self.assertEqual(response["error"]["message"], "execution reverted")
+        self.assertEqual((first.hits, second.hits), (1, 0))
+    
+    def test_all_endpoints_down(self):
+        """Test a connection error is raised once every endpoint has failed"""
+        down = self.server("down", status=502)
+        provider = FailoverHTTPProvider([down.url, "http://127.0.0.1:1"], timeout=1)
+    
+        with self.assertRaises(ProviderConnectionError):
+            provider.make_request("eth_blockNumber", [])
+    
+    def test_batch_responses_are_ordered_by_id(self):
+        """Test batched responses come back in request order"""
+        node = self.server("node")
+        provider = FailoverHTTPProvider(node.url)
+    
+        responses = provider.make_batch_request([("eth_call", []), ("eth_chainId", []), ("eth_blockNumber", [])])
+    
+        self.assertEqual([r["result"] for r in responses], ["node:eth_call", "node:eth_chainId", "node:eth_blockNumber"])
+        self.assertEqual(node.hits, 1)
+    
+    def test_responses_without_ids_keep_the_node_order(self):
+        """Test a batch with an id-less error response is returned as the node sent it"""
+        responses = [{"id": 2, "result": "b"}, {"id": None, "error": {"code": -32600}}, {"id": 0, "result": "a"}]
+        
+        self.assertEqual(sort_by_response_id(responses), responses)
+        self.assertEqual([r["id"] for r in sort_by_response_id([responses[0], responses[2]])], [0, 2])
+    
+    def test_state_dependent_methods_stay_on_the_primary(self):
+        """Test sends and nonce reads go to the first endpoint even when another is faster"""
+        slow, fast = self.server("slow", delay=0.05), self.server("fast")
+        provider = FailoverHTTPProvider([slow.url, fast.url])
+        for _ in range(3):
+            provider.make_request("eth_blockNumber", [])
+    
+        answers = [provider.make_request(method, [])["result"]
+                   for method in ("eth_getTransactionCount", "eth_sendRawTransaction", "eth_getTransactionReceipt")]
+    
+        self.assertEqual(answers, ["slow", "slow", "slow"])
+        self.assertEqual(provider.make_request("eth_blockNumber", [])["result"], "fast")
+    
+    def test_timed_out_send_is_not_retried_on_another_endpoint(self):
+        """Test a send that may have reached the primary is not sent again elsewhere"""
+        primary, other = self.server("primary", delay=0.5), self.server("other")
+        provider = FailoverHTTPProvider([primary.url, other.url], timeout=0.1)
+    
+        with self.assertRaises(ProviderConnectionError):
+            provider.make_request("eth_sendRawTransaction", ["0x00"])
+    
+        self.assertEqual(other.hits, 0)
+        self.assertIs(provider.primary, provider.endpoints[0])
+    
+    def test_unreachable_primary_fails_over(self):
+        """Test sticky methods move to the next endpoint when the primary refuses connections"""
+        backup = self.server("backup")
+        provider = FailoverHTTPProvider(["http://127.0.0.1:1", backup.url])
+    
+        self.assertEqual(provider.make_request("eth_sendRawTransaction", ["0x00"])["result"], "backup")
+        self.assertEqual(provider.make_request("eth_getTransactionCount", [])["result"], "backup")
+        self.assertEqual(provider.primary.url, backup.url)
+
+class TestWeb3Client(unittest.TestCase):
+    """Test client sharing and the contract cache"""
+    
+    def test_clients_are_shared_per_url_list(self):
+        """Test the same URLs give the same client, and a comma-separated list means failover"""
+        client = get_client("http://127.0.0.1:8545,http://127.0.0.1:8546")
+    
+        self.assertIs(get_client(["http://127.0.0.1:8545", "http://127.0.0.1:8546"]), client)
+        self.assertIsNot(get_client("http://127.0.0.1:8545"), client)
+        self.assertEqual(len(client.provider.endpoints), 2)
+    
+    def test_contracts_are_cached_by_address_and_abi(self):
+        """Test contract objects are built once per address and ABI"""
+        client = Web3Client("http://127.0.0.1:8545")
+        address = "0x5fbdb2315678afecb367f032d93f642f64180aa3"
+    
+        contract = client.contract(address, CONTRACT_ABI)
+    
+        self.assertIs(client.contract(address.upper().replace("0X", "0x"), list(CONTRACT_ABI)), contract)
+        self.assertIsNot(client.contract(address, CONTRACT_ABI[:1]), contract)
+
+if __name__ == '__main__':
+    unittest.main()